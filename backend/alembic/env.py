@@ -11,6 +11,7 @@ from sqlmodel import SQLModel
 # Import all models so Alembic can detect them
 from app.models import *  # noqa
 from app.config import get_settings
+from app.partitions import PARTITION_NAME
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -29,6 +30,20 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = SQLModel.metadata
 
+
+def include_name(name, type_, parent_names):
+    # Yearly log partitions are created at runtime, not by migrations
+    if type_ == "table" and name and PARTITION_NAME.match(name):
+        return False
+    return True
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Postgres clones a partitioned foreign key once per referenced partition
+    if type_ == "foreign_key_constraint" and reflected and PARTITION_NAME.match(object.referred_table.name):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -53,6 +68,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -60,7 +77,12 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,287 @@
+"""partition practice logs by year
+
+Revision ID: 0c5e9a7f3b21
+Revises: f2b86c41d9e3
+Create Date: 2026-10-18 17:36:05.447912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0c5e9a7f3b21'
+down_revision = 'f2b86c41d9e3'
+branch_labels = None
+depends_on = None
+
+
+# Creates the practice_logs and practice_log_details partitions for one
+# year if they do not exist yet. Called by the application before writing
+# logs for a year it has not seen (app/partitions.py).
+ENSURE_PARTITION_FUNCTION = """
+CREATE FUNCTION ensure_practice_log_partition(p_year integer) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    low date := make_date(p_year, 1, 1);
+    high date := make_date(p_year + 1, 1, 1);
+BEGIN
+    -- Serialize concurrent callers so IF NOT EXISTS cannot race
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_practice_log_partition'));
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF practice_logs FOR VALUES FROM (%L) TO (%L)',
+        'practice_logs_y' || p_year, low, high
+    );
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF practice_log_details FOR VALUES FROM (%L) TO (%L)',
+        'practice_log_details_y' || p_year, low, high
+    );
+END
+$$
+"""
+
+
+def _create_search_triggers(document_args: str, log_columns: str, detail_columns: str) -> None:
+    """(Re)create the search_vector triggers from the practice_log_search migration.
+
+    `document_args` are the practice_log_search_document() arguments as
+    columns of practice_logs; `log_columns` and `detail_columns` match a
+    detail row to its log.
+    """
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION practice_logs_search_vector_update() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_vector := practice_log_search_document({', '.join('NEW.' + arg for arg in document_args.split(', '))});
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER practice_logs_search_vector
+        BEFORE INSERT OR UPDATE OF notes ON practice_logs
+        FOR EACH ROW EXECUTE FUNCTION practice_logs_search_vector_update()
+        """
+    )
+
+    def refresh(rows: str) -> str:
+        return (
+            f"UPDATE practice_logs SET search_vector = practice_log_search_document({document_args}) "
+            f"WHERE ({log_columns}) IN (SELECT {detail_columns} FROM {rows})"
+        )
+
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION practice_log_details_search_vector_update() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {refresh('new_details')};
+            ELSIF TG_OP = 'UPDATE' THEN
+                {refresh('(SELECT * FROM new_details UNION ALL SELECT * FROM old_details) AS changed')};
+            ELSE
+                {refresh('old_details')};
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER practice_log_details_search_insert
+        AFTER INSERT ON practice_log_details
+        REFERENCING NEW TABLE AS new_details
+        FOR EACH STATEMENT EXECUTE FUNCTION practice_log_details_search_vector_update()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER practice_log_details_search_update
+        AFTER UPDATE ON practice_log_details
+        REFERENCING OLD TABLE AS old_details NEW TABLE AS new_details
+        FOR EACH STATEMENT EXECUTE FUNCTION practice_log_details_search_vector_update()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER practice_log_details_search_delete
+        AFTER DELETE ON practice_log_details
+        REFERENCING OLD TABLE AS old_details
+        FOR EACH STATEMENT EXECUTE FUNCTION practice_log_details_search_vector_update()
+        """
+    )
+
+
+def _set_aside(table: str) -> None:
+    """Rename a table out of the way and free its schema-wide names for the replacement."""
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT")
+    op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_pkey TO {table}_old_pkey")
+    op.rename_table(table, f'{table}_old')
+
+
+def _adopt_sequence(table: str) -> None:
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+
+def upgrade() -> None:
+    op.drop_constraint('practice_log_details_log_id_fkey', 'practice_log_details', type_='foreignkey')
+    op.drop_index('ix_practice_log_details_log_id', table_name='practice_log_details')
+    op.drop_index('ix_practice_logs_template_date_id', table_name='practice_logs')
+    op.drop_index('ix_practice_logs_date_id', table_name='practice_logs')
+    op.drop_index('ix_practice_logs_search_vector', table_name='practice_logs', postgresql_using='gin')
+    _set_aside('practice_log_details')
+    _set_aside('practice_logs')
+
+    op.create_table('practice_logs',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('practice_logs_id_seq'::regclass)"), nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('day_number', sa.Integer(), nullable=False),
+    sa.Column('practice_date', sa.Date(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True),
+    sa.ForeignKeyConstraint(['template_id'], ['practice_templates.id'], ),
+    sa.PrimaryKeyConstraint('id', 'practice_date'),
+    postgresql_partition_by='RANGE (practice_date)'
+    )
+    _adopt_sequence('practice_logs')
+    op.create_index('ix_practice_logs_template_date_id', 'practice_logs', ['template_id', sa.text('practice_date DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_practice_logs_date_id', 'practice_logs', [sa.text('practice_date DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_practice_logs_search_vector', 'practice_logs', ['search_vector'], unique=False, postgresql_using='gin')
+
+    op.create_table('practice_log_details',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('practice_log_details_id_seq'::regclass)"), nullable=False),
+    sa.Column('log_id', sa.Integer(), nullable=False),
+    sa.Column('practice_date', sa.Date(), nullable=False),
+    sa.Column('section_type', sa.String(), nullable=False),
+    sa.Column('content', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['log_id', 'practice_date'], ['practice_logs.id', 'practice_logs.practice_date'], onupdate='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'practice_date'),
+    postgresql_partition_by='RANGE (practice_date)'
+    )
+    _adopt_sequence('practice_log_details')
+    op.create_index('ix_practice_log_details_log_id', 'practice_log_details', ['log_id', 'practice_date'], unique=False)
+
+    # One partition per year of existing history, plus this year and next
+    op.execute(ENSURE_PARTITION_FUNCTION)
+    op.execute(
+        """
+        SELECT ensure_practice_log_partition(year)
+        FROM (
+            SELECT DISTINCT extract(year FROM practice_date)::int AS year FROM practice_logs_old
+            UNION SELECT extract(year FROM current_date)::int
+            UNION SELECT extract(year FROM current_date)::int + 1
+        ) AS years
+        ORDER BY year
+        """
+    )
+
+    # Copy history over; the search documents come along as they are
+    op.execute(
+        """
+        INSERT INTO practice_logs (id, template_id, day_number, practice_date, duration_minutes, notes, created_at, search_vector)
+        SELECT id, template_id, day_number, practice_date, duration_minutes, notes, created_at, search_vector
+        FROM practice_logs_old
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO practice_log_details (id, log_id, practice_date, section_type, content)
+        SELECT d.id, d.log_id, l.practice_date, d.section_type, d.content
+        FROM practice_log_details_old AS d JOIN practice_logs_old AS l ON l.id = d.log_id
+        """
+    )
+    op.drop_table('practice_log_details_old')
+    op.drop_table('practice_logs_old')
+
+    # Search documents now look up details within the log's own partition
+    op.execute("DROP FUNCTION practice_log_search_document(integer, text)")
+    op.execute(
+        """
+        CREATE FUNCTION practice_log_search_document(p_log_id integer, p_practice_date date, p_notes text)
+        RETURNS tsvector LANGUAGE sql STABLE AS $$
+            SELECT setweight(to_tsvector('english', coalesce(p_notes, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(
+                       (SELECT string_agg(content, ' ' ORDER BY id)
+                        FROM practice_log_details
+                        WHERE log_id = p_log_id AND practice_date = p_practice_date), '')), 'B')
+        $$
+        """
+    )
+    _create_search_triggers("id, practice_date, notes", "id, practice_date", "log_id, practice_date")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_practice_log_details_log_id', table_name='practice_log_details')
+    op.drop_index('ix_practice_logs_template_date_id', table_name='practice_logs')
+    op.drop_index('ix_practice_logs_date_id', table_name='practice_logs')
+    op.drop_index('ix_practice_logs_search_vector', table_name='practice_logs', postgresql_using='gin')
+    _set_aside('practice_log_details')
+    _set_aside('practice_logs')
+
+    op.create_table('practice_logs',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('practice_logs_id_seq'::regclass)"), nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('day_number', sa.Integer(), nullable=False),
+    sa.Column('practice_date', sa.Date(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True),
+    sa.ForeignKeyConstraint(['template_id'], ['practice_templates.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _adopt_sequence('practice_logs')
+    op.create_table('practice_log_details',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('practice_log_details_id_seq'::regclass)"), nullable=False),
+    sa.Column('log_id', sa.Integer(), nullable=False),
+    sa.Column('section_type', sa.String(), nullable=False),
+    sa.Column('content', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['log_id'], ['practice_logs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _adopt_sequence('practice_log_details')
+
+    op.execute(
+        """
+        INSERT INTO practice_logs (id, template_id, day_number, practice_date, duration_minutes, notes, created_at, search_vector)
+        SELECT id, template_id, day_number, practice_date, duration_minutes, notes, created_at, search_vector
+        FROM practice_logs_old
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO practice_log_details (id, log_id, section_type, content)
+        SELECT id, log_id, section_type, content FROM practice_log_details_old
+        """
+    )
+    # Dropping the partitioned parents drops every partition with them
+    op.drop_table('practice_log_details_old')
+    op.drop_table('practice_logs_old')
+    op.execute("DROP FUNCTION ensure_practice_log_partition(integer)")
+
+    op.create_index('ix_practice_logs_template_date_id', 'practice_logs', ['template_id', sa.text('practice_date DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_practice_logs_date_id', 'practice_logs', [sa.text('practice_date DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_practice_logs_search_vector', 'practice_logs', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_practice_log_details_log_id', 'practice_log_details', ['log_id'], unique=False)
+
+    op.execute("DROP FUNCTION practice_log_search_document(integer, date, text)")
+    op.execute(
+        """
+        CREATE FUNCTION practice_log_search_document(p_log_id integer, p_notes text)
+        RETURNS tsvector LANGUAGE sql STABLE AS $$
+            SELECT setweight(to_tsvector('english', coalesce(p_notes, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(
+                       (SELECT string_agg(content, ' ' ORDER BY id)
+                        FROM practice_log_details WHERE log_id = p_log_id), '')), 'B')
+        $$
+        """
+    )
+    _create_search_triggers("id, notes", "id", "log_id")
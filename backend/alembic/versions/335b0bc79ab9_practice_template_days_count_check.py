@@ -0,0 +1,37 @@
+"""practice template days count check
+
+Revision ID: 335b0bc79ab9
+Revises: 8d687db24b14
+Create Date: 2026-10-18 23:14:05.527193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '335b0bc79ab9'
+down_revision = '8d687db24b14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The next rotation day wraps around days_count, so it must be positive.
+    # Templates saved without one fall back to their number of days, or 1.
+    op.execute(
+        """
+        UPDATE practice_templates
+        SET days_count = GREATEST(
+            (SELECT count(*) FROM practice_days WHERE practice_days.template_id = practice_templates.id), 1
+        )
+        WHERE days_count < 1
+        """
+    )
+    op.create_check_constraint(
+        'ck_practice_templates_days_count_positive', 'practice_templates', sa.text('days_count > 0')
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('ck_practice_templates_days_count_positive', 'practice_templates', type_='check')
@@ -0,0 +1,29 @@
+"""practice log keyset indexes
+
+Revision ID: 43475e43a964
+Revises: 5d25529cb739
+Create Date: 2026-10-18 10:03:17.540926
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '43475e43a964'
+down_revision = '5d25529cb739'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_practice_logs_template_date_id', 'practice_logs', ['template_id', sa.text('practice_date DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_practice_logs_date_id', 'practice_logs', [sa.text('practice_date DESC'), sa.text('id DESC')], unique=False)
+    # Covered by the leading column of ix_practice_logs_template_date_id
+    op.drop_index('ix_practice_logs_template_id', table_name='practice_logs')
+
+
+def downgrade() -> None:
+    op.create_index('ix_practice_logs_template_id', 'practice_logs', ['template_id'], unique=False)
+    op.drop_index('ix_practice_logs_date_id', table_name='practice_logs')
+    op.drop_index('ix_practice_logs_template_date_id', table_name='practice_logs')
@@ -0,0 +1,44 @@
+"""practice log rollups
+
+Revision ID: 5d25529cb739
+Revises: 743b48d944ba
+Create Date: 2026-10-18 09:12:41.208113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d25529cb739'
+down_revision = '743b48d944ba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('practice_log_rollups',
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('day_number', sa.Integer(), nullable=False),
+    sa.Column('practice_date', sa.Date(), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('total_minutes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['template_id'], ['practice_templates.id'], ),
+    sa.PrimaryKeyConstraint('template_id', 'day_number', 'practice_date')
+    )
+    op.create_index(op.f('ix_practice_logs_template_id'), 'practice_logs', ['template_id'], unique=False)
+
+    # Backfill from existing history
+    op.execute(
+        """
+        INSERT INTO practice_log_rollups (template_id, day_number, practice_date, sessions, total_minutes)
+        SELECT template_id, day_number, practice_date, count(id), sum(duration_minutes)
+        FROM practice_logs
+        GROUP BY template_id, day_number, practice_date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_practice_logs_template_id'), table_name='practice_logs')
+    op.drop_table('practice_log_rollups')
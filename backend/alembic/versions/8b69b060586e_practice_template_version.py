@@ -0,0 +1,24 @@
+"""practice template version
+
+Revision ID: 8b69b060586e
+Revises: 43475e43a964
+Create Date: 2026-10-18 11:26:54.771390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b69b060586e'
+down_revision = '43475e43a964'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('practice_templates', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('practice_templates', 'version')
@@ -0,0 +1,67 @@
+"""practice log change xid
+
+Revision ID: 8d687db24b14
+Revises: b6e13f9a2d47
+Create Date: 2026-10-18 21:02:41.318407
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d687db24b14'
+down_revision = 'b6e13f9a2d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The change feed (GET /api/logs/changes) is ordered by the id of the
+    # transaction that last wrote each log. Every transaction with an id
+    # below the oldest one still running has finished, so the feed can hand
+    # out everything below that watermark without a late commit ever landing
+    # behind a token. Stored as bigint; xid8 values fit.
+    op.add_column('practice_logs', sa.Column('change_xid', sa.BigInteger(), nullable=True))
+    # Rows already written all committed long ago; any finished xid orders them
+    op.execute("UPDATE practice_logs SET change_xid = 0")
+    op.alter_column('practice_logs', 'change_xid', nullable=False)
+
+    op.execute(
+        """
+        CREATE FUNCTION practice_logs_stamp_change() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.updated_at := timezone('UTC', clock_timestamp());
+            NEW.change_xid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute("DROP TRIGGER practice_logs_updated_at ON practice_logs")
+    op.execute(
+        """
+        CREATE TRIGGER practice_logs_updated_at
+        BEFORE INSERT OR UPDATE ON practice_logs
+        FOR EACH ROW EXECUTE FUNCTION practice_logs_stamp_change()
+        """
+    )
+
+    op.drop_index('ix_practice_logs_updated_at_id', table_name='practice_logs')
+    op.create_index('ix_practice_logs_change_xid_id', 'practice_logs', ['change_xid', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_practice_logs_change_xid_id', table_name='practice_logs')
+    op.create_index('ix_practice_logs_updated_at_id', 'practice_logs', ['updated_at', 'id'], unique=False)
+    op.execute("DROP TRIGGER practice_logs_updated_at ON practice_logs")
+    op.execute(
+        """
+        CREATE TRIGGER practice_logs_updated_at
+        BEFORE INSERT OR UPDATE ON practice_logs
+        FOR EACH ROW EXECUTE FUNCTION practice_log_stamp_updated_at()
+        """
+    )
+    op.execute("DROP FUNCTION practice_logs_stamp_change()")
+    op.drop_column('practice_logs', 'change_xid')
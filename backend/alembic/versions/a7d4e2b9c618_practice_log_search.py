@@ -0,0 +1,116 @@
+"""practice log search
+
+Revision ID: a7d4e2b9c618
+Revises: c3a1f5d27b80
+Create Date: 2026-10-18 16:04:12.871530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d4e2b9c618'
+down_revision = 'c3a1f5d27b80'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('practice_logs', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Notes weigh more than section details; the text search configuration
+    # must match SEARCH_CONFIG in app/api/logs.py
+    op.execute(
+        """
+        CREATE FUNCTION practice_log_search_document(p_log_id integer, p_notes text)
+        RETURNS tsvector LANGUAGE sql STABLE AS $$
+            SELECT setweight(to_tsvector('english', coalesce(p_notes, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(
+                       (SELECT string_agg(content, ' ' ORDER BY id)
+                        FROM practice_log_details WHERE log_id = p_log_id), '')), 'B')
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION practice_logs_search_vector_update() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_vector := practice_log_search_document(NEW.id, NEW.notes);
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER practice_logs_search_vector
+        BEFORE INSERT OR UPDATE OF notes ON practice_logs
+        FOR EACH ROW EXECUTE FUNCTION practice_logs_search_vector_update()
+        """
+    )
+
+    # Details change in batches (a log's details, a bulk import), so refresh
+    # the affected logs once per statement from the transition tables
+    op.execute(
+        """
+        CREATE FUNCTION practice_log_details_search_vector_update() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE practice_logs SET search_vector = practice_log_search_document(id, notes)
+                WHERE id IN (SELECT log_id FROM new_details);
+            ELSIF TG_OP = 'UPDATE' THEN
+                UPDATE practice_logs SET search_vector = practice_log_search_document(id, notes)
+                WHERE id IN (SELECT log_id FROM new_details UNION SELECT log_id FROM old_details);
+            ELSE
+                UPDATE practice_logs SET search_vector = practice_log_search_document(id, notes)
+                WHERE id IN (SELECT log_id FROM old_details);
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER practice_log_details_search_insert
+        AFTER INSERT ON practice_log_details
+        REFERENCING NEW TABLE AS new_details
+        FOR EACH STATEMENT EXECUTE FUNCTION practice_log_details_search_vector_update()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER practice_log_details_search_update
+        AFTER UPDATE ON practice_log_details
+        REFERENCING OLD TABLE AS old_details NEW TABLE AS new_details
+        FOR EACH STATEMENT EXECUTE FUNCTION practice_log_details_search_vector_update()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER practice_log_details_search_delete
+        AFTER DELETE ON practice_log_details
+        REFERENCING OLD TABLE AS old_details
+        FOR EACH STATEMENT EXECUTE FUNCTION practice_log_details_search_vector_update()
+        """
+    )
+
+    # Backfill existing history
+    op.execute("UPDATE practice_logs SET search_vector = practice_log_search_document(id, notes)")
+    op.create_index('ix_practice_logs_search_vector', 'practice_logs', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_practice_logs_search_vector', table_name='practice_logs', postgresql_using='gin')
+    op.execute("DROP TRIGGER practice_log_details_search_delete ON practice_log_details")
+    op.execute("DROP TRIGGER practice_log_details_search_update ON practice_log_details")
+    op.execute("DROP TRIGGER practice_log_details_search_insert ON practice_log_details")
+    op.execute("DROP FUNCTION practice_log_details_search_vector_update()")
+    op.execute("DROP TRIGGER practice_logs_search_vector ON practice_logs")
+    op.execute("DROP FUNCTION practice_logs_search_vector_update()")
+    op.execute("DROP FUNCTION practice_log_search_document(integer, text)")
+    op.drop_column('practice_logs', 'search_vector')
@@ -0,0 +1,74 @@
+"""practice log changes
+
+Revision ID: b6e13f9a2d47
+Revises: d4f7a2c91e58
+Create Date: 2026-10-18 20:14:33.582061
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e13f9a2d47'
+down_revision = 'd4f7a2c91e58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for table in ('practice_logs', 'practice_log_details'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.add_column(table, sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    # Backfill without refreshing every search_vector along the way
+    op.execute("UPDATE practice_logs SET updated_at = created_at")
+    op.execute("ALTER TABLE practice_log_details DISABLE TRIGGER practice_log_details_search_update")
+    op.execute(
+        """
+        UPDATE practice_log_details SET updated_at = practice_logs.created_at
+        FROM practice_logs
+        WHERE practice_logs.id = practice_log_details.log_id
+          AND practice_logs.practice_date = practice_log_details.practice_date
+        """
+    )
+    op.execute("ALTER TABLE practice_log_details ENABLE TRIGGER practice_log_details_search_update")
+    for table in ('practice_logs', 'practice_log_details'):
+        op.alter_column(table, 'updated_at', nullable=False)
+
+    # Every write stamps the row with the time it was written, not when its
+    # transaction started, so a long transaction cannot slip a change in
+    # behind a sync token already handed out (GET /api/logs/changes). A
+    # change to a log's details also restamps the log, through the
+    # search_vector refresh the details triggers run.
+    op.execute(
+        """
+        CREATE FUNCTION practice_log_stamp_updated_at() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.updated_at := timezone('UTC', clock_timestamp());
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    for table in ('practice_logs', 'practice_log_details'):
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_updated_at
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION practice_log_stamp_updated_at()
+            """
+        )
+
+    op.create_index('ix_practice_logs_updated_at_id', 'practice_logs', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_practice_logs_updated_at_id', table_name='practice_logs')
+    for table in ('practice_log_details', 'practice_logs'):
+        op.execute(f"DROP TRIGGER {table}_updated_at ON {table}")
+    op.execute("DROP FUNCTION practice_log_stamp_updated_at()")
+    for table in ('practice_log_details', 'practice_logs'):
+        op.drop_column(table, 'deleted_at')
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,23 @@
+"""practice log rollups template date index
+
+Revision ID: c3a1f5d27b80
+Revises: e919cb37c647
+Create Date: 2026-10-18 15:21:47.602318
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a1f5d27b80'
+down_revision = 'e919cb37c647'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_practice_log_rollups_template_date', 'practice_log_rollups', ['template_id', 'practice_date'], unique=False, postgresql_include=['sessions', 'total_minutes'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_practice_log_rollups_template_date', table_name='practice_log_rollups', postgresql_include=['sessions', 'total_minutes'])
@@ -0,0 +1,84 @@
+"""practice template snapshot
+
+Revision ID: d4f7a2c91e58
+Revises: 0c5e9a7f3b21
+Create Date: 2026-10-18 19:02:47.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f7a2c91e58'
+down_revision = '0c5e9a7f3b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('practice_templates', sa.Column('snapshot', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.create_index(op.f('ix_practice_days_template_id'), 'practice_days', ['template_id'], unique=False)
+    op.create_index(op.f('ix_exercise_blocks_practice_day_id'), 'exercise_blocks', ['practice_day_id'], unique=False)
+    op.create_index(op.f('ix_exercises_block_id'), 'exercises', ['block_id'], unique=False)
+
+    # The template tree in the shape get_template returns, each level ordered
+    # the way the API always has: days by day_number, blocks and exercises by
+    # display_order
+    op.execute(
+        """
+        CREATE FUNCTION practice_template_snapshot(p_template_id integer)
+        RETURNS jsonb LANGUAGE sql STABLE AS $$
+            SELECT jsonb_build_object(
+                'id', t.id,
+                'instrument_id', t.instrument_id,
+                'name', t.name,
+                'days_count', t.days_count,
+                'description', t.description,
+                'is_active', t.is_active,
+                'practice_days', coalesce((
+                    SELECT jsonb_agg(jsonb_build_object(
+                        'id', d.id,
+                        'template_id', d.template_id,
+                        'day_number', d.day_number,
+                        'title', d.title,
+                        'warmup', d.warmup,
+                        'scales', d.scales,
+                        'repertoire', d.repertoire,
+                        'exercise_blocks', coalesce((
+                            SELECT jsonb_agg(jsonb_build_object(
+                                'id', b.id,
+                                'practice_day_id', b.practice_day_id,
+                                'block_type', b.block_type,
+                                'display_order', b.display_order,
+                                'exercises', coalesce((
+                                    SELECT jsonb_agg(jsonb_build_object(
+                                        'id', e.id,
+                                        'block_id', e.block_id,
+                                        'exercise_text', e.exercise_text,
+                                        'display_order', e.display_order
+                                    ) ORDER BY e.display_order, e.id)
+                                    FROM exercises e WHERE e.block_id = b.id
+                                ), '[]'::jsonb)
+                            ) ORDER BY b.display_order, b.id)
+                            FROM exercise_blocks b WHERE b.practice_day_id = d.id
+                        ), '[]'::jsonb)
+                    ) ORDER BY d.day_number, d.id)
+                    FROM practice_days d WHERE d.template_id = t.id
+                ), '[]'::jsonb)
+            )
+            FROM practice_templates t
+            WHERE t.id = p_template_id
+        $$
+        """
+    )
+    op.execute("UPDATE practice_templates SET snapshot = practice_template_snapshot(id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION practice_template_snapshot(integer)")
+    op.drop_index(op.f('ix_exercises_block_id'), table_name='exercises')
+    op.drop_index(op.f('ix_exercise_blocks_practice_day_id'), table_name='exercise_blocks')
+    op.drop_index(op.f('ix_practice_days_template_id'), table_name='practice_days')
+    op.drop_column('practice_templates', 'snapshot')
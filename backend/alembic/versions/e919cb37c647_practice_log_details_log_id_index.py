@@ -0,0 +1,23 @@
+"""practice log details log_id index
+
+Revision ID: e919cb37c647
+Revises: 8b69b060586e
+Create Date: 2026-10-18 13:02:09.318745
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e919cb37c647'
+down_revision = '8b69b060586e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_practice_log_details_log_id'), 'practice_log_details', ['log_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_practice_log_details_log_id'), table_name='practice_log_details')
@@ -0,0 +1,40 @@
+"""practice template cursors
+
+Revision ID: f2b86c41d9e3
+Revises: a7d4e2b9c618
+Create Date: 2026-10-18 16:48:30.114592
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b86c41d9e3'
+down_revision = 'a7d4e2b9c618'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('practice_template_cursors',
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('last_day_number', sa.Integer(), nullable=False),
+    sa.Column('last_practice_date', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['template_id'], ['practice_templates.id'], ),
+    sa.PrimaryKeyConstraint('template_id')
+    )
+
+    # Backfill from existing history: the latest log of each template
+    op.execute(
+        """
+        INSERT INTO practice_template_cursors (template_id, last_day_number, last_practice_date)
+        SELECT DISTINCT ON (template_id) template_id, day_number, practice_date
+        FROM practice_logs
+        ORDER BY template_id, practice_date DESC, id DESC
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('practice_template_cursors')
@@ -1,10 +1,15 @@
+from datetime import date, timedelta
 from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import ColumnElement, Date, DateTime, Integer, cast, literal, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlmodel import select, func
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import Optional
+from typing import Literal, Optional
 
-from app.database import get_session
-from app.models import PracticeLog, AnalyticsSummary
+from app.database import get_read_session
+from app.invalidation import cached_response
+from app.models import PracticeLogRollup, AnalyticsSummary, AnalyticsTimeseries
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -12,49 +17,218 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 @router.get("/", response_model=AnalyticsSummary)
 async def get_analytics(
     template_id: Optional[int] = None,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
-    """Get practice statistics and analytics."""
-    # Base query
-    statement = select(PracticeLog)
-    if template_id:
-        statement = statement.where(PracticeLog.template_id == template_id)
-    
-    # Get total sessions
-    count_statement = select(func.count(PracticeLog.id))
-    if template_id:
-        count_statement = count_statement.where(PracticeLog.template_id == template_id)
-    
-    result = await session.execute(count_statement)
-    total_sessions = result.scalar() or 0
-    
-    # Get total minutes
-    sum_statement = select(func.sum(PracticeLog.duration_minutes))
-    if template_id:
-        sum_statement = sum_statement.where(PracticeLog.template_id == template_id)
-    
-    result = await session.execute(sum_statement)
-    total_minutes = result.scalar() or 0
-    
-    # Calculate average duration
-    average_duration = total_minutes / total_sessions if total_sessions > 0 else 0
-    
-    # Get sessions by day number
-    sessions_by_day = {}
-    day_statement = (
-        select(PracticeLog.day_number, func.count(PracticeLog.id).label('count'))
-        .group_by(PracticeLog.day_number)
+    """Get practice statistics and analytics.
+
+    Cached per worker until a log is written for the template.
+    """
+    return await analytics_summary(session, template_id)
+
+
+async def analytics_summary(session: AsyncSession, template_id: Optional[int]) -> AnalyticsSummary:
+    return await cached_response(
+        session, ("analytics", template_id or None), lambda: _summary(session, template_id)
+    )
+
+
+async def _summary(session: AsyncSession, template_id: Optional[int]) -> AnalyticsSummary:
+    # Single pass over the rollup table: per-day counts, totals summed below
+    statement = (
+        select(
+            PracticeLogRollup.day_number,
+            func.sum(PracticeLogRollup.sessions).label('sessions'),
+            func.sum(PracticeLogRollup.total_minutes).label('minutes')
+        )
+        .group_by(PracticeLogRollup.day_number)  # type: ignore[arg-type]
+        .order_by(PracticeLogRollup.day_number)  # type: ignore[arg-type]
     )
     if template_id:
-        day_statement = day_statement.where(PracticeLog.template_id == template_id)
-    
-    result = await session.execute(day_statement)
+        statement = statement.where(PracticeLogRollup.template_id == template_id)
+
+    result = await session.execute(statement)
+
+    total_sessions = 0
+    total_minutes = 0
+    sessions_by_day = {}
     for row in result:
-        sessions_by_day[str(row.day_number)] = row.count
-    
+        total_sessions += row.sessions
+        total_minutes += row.minutes
+        sessions_by_day[str(row.day_number)] = int(row.sessions)
+
+    # Calculate average duration
+    average_duration = total_minutes / total_sessions if total_sessions > 0 else 0
+
     return AnalyticsSummary(
         total_sessions=total_sessions,
         total_minutes=int(total_minutes),
         average_duration=round(average_duration, 1),
         sessions_by_day=sessions_by_day
     )
+
+
+# date_trunc field names; rendered inline so the same expression can be
+# selected and grouped by
+_BUCKET_FIELDS = {bucket: literal_column(f"'{bucket}'") for bucket in ("week", "month")}
+
+
+# Trailing windows of the rolling averages, in days
+_ROLLING_DAYS = (7, 30)
+
+
+def _period_start(bucket: str, day: ColumnElement[date]) -> ColumnElement[date]:
+    if bucket == "day":
+        return day
+    return cast(func.date_trunc(_BUCKET_FIELDS[bucket], cast(day, DateTime)), Date)
+
+
+def _series_statement(bucket: str, template_id: Optional[int], start: Optional[date], end: Optional[date]):
+    """Sessions and minutes per bucket, with the rolling averages as of each bucket's last day.
+
+    The averages come from a spine of every calendar day, so days off count
+    as zero, and it reaches back far enough before the first bucket that the
+    earliest windows are full.
+    """
+    rollup = PracticeLogRollup.__table__.c  # type: ignore[attr-defined]
+    lookback = max(_ROLLING_DAYS) - 1
+    daily = select(
+        rollup.practice_date.label("day"),
+        func.sum(rollup.sessions).label("sessions"),
+        func.sum(rollup.total_minutes).label("minutes"),
+    ).group_by(rollup.practice_date)
+    if template_id:
+        daily = daily.where(rollup.template_id == template_id)
+    if start:
+        daily = daily.where(rollup.practice_date >= start - timedelta(days=lookback))
+    if end:
+        daily = daily.where(rollup.practice_date <= end)
+    daily = daily.cte("daily")
+
+    bounds = select(
+        (literal(start, Date) if start else func.min(daily.c.day)).label("first_day"),
+        (literal(end, Date) if end else func.max(daily.c.day)).label("last_day"),
+    ).cte("bounds")
+    spine_day = func.generate_series(
+        bounds.c.first_day - lookback, bounds.c.last_day, literal_column("interval '1 day'")
+    ).column_valued("day")
+    spine = select(cast(spine_day, Date).label("day"), bounds.c.first_day).select_from(bounds).cte("spine")
+
+    minutes = func.coalesce(daily.c.minutes, 0)
+    rolling = (
+        select(
+            spine.c.day,
+            spine.c.first_day,
+            func.coalesce(daily.c.sessions, 0).label("sessions"),
+            minutes.label("minutes"),
+            *(
+                func.avg(minutes).over(order_by=spine.c.day, rows=(1 - days, 0)).label(f"rolling_{days}")
+                for days in _ROLLING_DAYS
+            ),
+        )
+        .select_from(spine.outerjoin(daily, daily.c.day == spine.c.day))
+        .cte("rolling")
+    )
+
+    def as_of_last_day(column):
+        return func.array_agg(aggregate_order_by(column, rolling.c.day.desc()))[1]
+
+    period_start = _period_start(bucket, rolling.c.day).label("period_start")
+    return (
+        select(  # type: ignore[call-overload]
+            period_start,
+            cast(func.sum(rolling.c.sessions), Integer).label("sessions"),
+            cast(func.sum(rolling.c.minutes), Integer).label("minutes"),
+            *(as_of_last_day(rolling.c[f"rolling_{days}"]).label(f"rolling_{days}") for days in _ROLLING_DAYS),
+        )
+        .where(rolling.c.day >= rolling.c.first_day)
+        .group_by(period_start)
+        .having(func.sum(rolling.c.sessions) > 0)
+        .order_by(period_start)
+    )
+
+
+def _template_trends_statement(template_id: Optional[int]):
+    """Streaks (gaps and islands over practice dates), per template."""
+    rollup = PracticeLogRollup.__table__.c  # type: ignore[attr-defined]
+    # Consecutive dates share the same date minus dense rank; dense_rank
+    # rather than row_number because a date has one rollup row per day_number
+    islands = select(
+        rollup.template_id,
+        rollup.practice_date,
+        (
+            rollup.practice_date
+            - cast(
+                func.dense_rank().over(partition_by=rollup.template_id, order_by=rollup.practice_date),
+                Integer,
+            )
+        ).label("island"),
+    )
+    if template_id:
+        islands = islands.where(rollup.template_id == template_id)
+    islands = islands.cte("islands")
+
+    today = func.current_date()
+
+    streaks = (
+        select(  # type: ignore[call-overload]
+            islands.c.template_id,
+            func.min(islands.c.practice_date).label("first_day"),
+            func.max(islands.c.practice_date).label("last_day"),
+        )
+        .group_by(islands.c.template_id, islands.c.island)
+        .cte("streaks")
+    )
+    length = streaks.c.last_day - streaks.c.first_day + 1
+
+    return (
+        select(  # type: ignore[call-overload]
+            streaks.c.template_id,
+            func.coalesce(func.max(length).filter(streaks.c.last_day >= today - 1), 0).label("current_streak"),
+            func.max(length).label("longest_streak"),
+            func.max(streaks.c.last_day).label("last_practice_date"),
+        )
+        .group_by(streaks.c.template_id)
+        .order_by(streaks.c.template_id)
+    )
+
+
+@router.get("/timeseries", response_model=AnalyticsTimeseries)
+async def get_timeseries(
+    template_id: Optional[int] = None,
+    bucket: Literal["day", "week", "month"] = "week",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Minutes and sessions per day, week or month, with 7 and 30 day rolling
+    averages, plus streaks per template.
+
+    `start` and `end` (inclusive) limit the series; a bucket's rolling
+    averages are those of its last day and still count days before `start`.
+    Streaks always cover the full history. Weeks start on Monday.
+    """
+    series_result = await session.execute(_series_statement(bucket, template_id, start, end))
+    buckets = [
+        {
+            "period_start": row.period_start,
+            "sessions": row.sessions,
+            "minutes": row.minutes,
+            "rolling_7_day_minutes": round(float(row.rolling_7), 1),
+            "rolling_30_day_minutes": round(float(row.rolling_30), 1),
+        }
+        for row in series_result
+    ]
+
+    trends_result = await session.execute(_template_trends_statement(template_id))
+    templates = [
+        {
+            "template_id": row.template_id,
+            "current_streak": row.current_streak,
+            "longest_streak": row.longest_streak,
+            "last_practice_date": row.last_practice_date,
+        }
+        for row in trends_result
+    ]
+
+    # A daily series over years of history is large; encode it directly
+    return ORJSONResponse({"bucket": bucket, "series": buckets, "templates": templates})
@@ -1,26 +1,110 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import select
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlmodel import and_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import List
+from typing import List, Optional
 
-from app.database import get_session
-from app.models import Instrument
+from app.api.analytics import analytics_summary
+from app.api.logs import log_page
+from app.api.templates import next_practice_day, next_practice_day_json
+from app.database import gather_sessions, get_read_session, read_session_factory
+from app.etags import content_etag, json_response, not_modified
+from app.invalidation import cached_response
+from app.models import Instrument, InstrumentDashboard, PracticeTemplate, PracticeTemplateSummary
 
 router = APIRouter(prefix="/instruments", tags=["instruments"])
 
 
+def _conditional(request: Request, body: bytes) -> Response:
+    """Instruments carry no version, so the ETag is a hash of the encoded body."""
+    etag = content_etag(body)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    return json_response(body, etag)
+
+
 @router.get("/", response_model=List[Instrument])
-async def list_instruments(session: AsyncSession = Depends(get_session)):
-    """Get all available instruments."""
-    result = await session.execute(select(Instrument))
-    instruments = result.scalars().all()
-    return instruments
+async def list_instruments(request: Request, session: AsyncSession = Depends(get_read_session)):
+    """Get all available instruments. Supports If-None-Match."""
+    async def load() -> bytes:
+        result = await session.execute(select(Instrument).order_by(Instrument.id))  # type: ignore[arg-type]
+        return orjson.dumps([instrument.model_dump() for instrument in result.scalars()])
+
+    return _conditional(request, await cached_response(session, ("instruments",), load))
 
 
 @router.get("/{instrument_id}", response_model=Instrument)
-async def get_instrument(instrument_id: int, session: AsyncSession = Depends(get_session)):
-    """Get a specific instrument by ID."""
-    instrument = await session.get(Instrument, instrument_id)
-    if not instrument:
+async def get_instrument(instrument_id: int, request: Request, session: AsyncSession = Depends(get_read_session)):
+    """Get a specific instrument by ID. Supports If-None-Match."""
+    async def load() -> Optional[bytes]:
+        instrument = await session.get(Instrument, instrument_id)
+        return orjson.dumps(instrument.model_dump()) if instrument else None
+
+    body = await cached_response(session, ("instrument", instrument_id), load)
+    if body is None:
         raise HTTPException(status_code=404, detail="Instrument not found")
-    return instrument
+    return _conditional(request, body)
+
+
+async def _next_day(session: AsyncSession, template_id: int) -> Optional[orjson.Fragment]:
+    try:
+        row, day_number, body = await next_practice_day(session, template_id)
+    except HTTPException:
+        return None
+    return orjson.Fragment(next_practice_day_json(row, day_number, body))
+
+
+@router.get("/{instrument_id}/dashboard", response_model=InstrumentDashboard)
+async def get_instrument_dashboard(
+    instrument_id: int,
+    request: Request,
+    log_limit: int = Query(10, ge=1, le=50)
+):
+    """Everything an instrument page shows in one response: the instrument, its
+    active templates (as /api/templates/ lists them) and, for the first of them, the day due next, the latest logs
+    (pass recent_logs.next_cursor to /api/logs/ for more) and analytics.
+
+    The three queries about the active template are independent, so they run
+    concurrently, each on a connection of its own; the response waits for the
+    slowest of them instead of all of them in turn.
+    """
+    sessionmaker = read_session_factory(request)
+    async with sessionmaker() as session:
+        result = await session.execute(
+            select(Instrument, PracticeTemplate)
+            .outerjoin(
+                PracticeTemplate,
+                and_(
+                    PracticeTemplate.instrument_id == Instrument.id,  # type: ignore[arg-type]
+                    PracticeTemplate.is_active == True,  # type: ignore[arg-type]
+                )
+            )
+            .where(Instrument.id == instrument_id)
+            .order_by(PracticeTemplate.id)  # type: ignore[arg-type]
+        )
+        rows = result.all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Instrument not found")
+
+    templates = [template for _, template in rows if template is not None]
+    active = templates[0] if templates else None
+    content = {
+        "instrument": rows[0][0].model_dump(),
+        "templates": [PracticeTemplateSummary.model_validate(template).model_dump() for template in templates],
+        "active_template_id": active.id if active else None,
+        "next_day": None,
+        "recent_logs": None,
+        "analytics": None,
+    }
+    if active is not None:
+        template_id = active.id
+        content["next_day"], content["recent_logs"], summary = await gather_sessions(
+            sessionmaker,
+            lambda session: _next_day(session, template_id),
+            lambda session: log_page(session, template_id, log_limit),
+            lambda session: analytics_summary(session, template_id),
+        )
+        content["analytics"] = summary.model_dump()
+    return ORJSONResponse(content)
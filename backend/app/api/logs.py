@@ -1,84 +1,548 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import binascii
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
-from sqlalchemy import desc
-from typing import List, Optional
+from sqlalchemy import ARRAY, BigInteger, Select, String, Text, bindparam, desc, func, insert, literal, true, tuple_, update
+from typing import List, Literal, Optional, Tuple
 
-from app.database import get_session
-from app.models import PracticeLog, PracticeLogDetail, PracticeLogCreate
+from app import bulk_logs, columnar, exports
+from app.config import get_settings
+from app.database import get_read_session, get_session, read_session_factory
+from app.notifications import notify_from
+from app.partitions import ensure_partitions
+from app.models import (
+    BulkLogResult,
+    PracticeLog,
+    PracticeLogChanges,
+    PracticeLogCreate,
+    PracticeLogDetail,
+    PracticeLogRead,
+    PracticeLogSearchPage,
+)
+from app.rollups import prune_rollups, rollup_upsert_from
+from app.template_cursors import cursor_upsert_from, rebuild_cursors
 
 router = APIRouter(prefix="/logs", tags=["logs"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
-@router.post("/", response_model=PracticeLog, status_code=201)
+
+def _encode_token(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_token(token: str) -> List[str]:
+    padded = token + "=" * (-len(token) % 4)
+    return base64.urlsafe_b64decode(padded).decode().split("|")
+
+
+def _encode_cursor(log: PracticeLog) -> str:
+    """Opaque cursor pointing just past the given log in list order."""
+    return _encode_token(f"{log.practice_date.isoformat()}|{log.id}")
+
+
+def _decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        practice_date, log_id = _decode_token(cursor)
+        return date.fromisoformat(practice_date), int(log_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _encode_search_cursor(rank: float, log_id: int) -> str:
+    """Opaque cursor pointing just past a search hit; repr keeps the rank exact."""
+    return _encode_token(f"{rank!r}|{log_id}")
+
+
+def _decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        rank, log_id = _decode_token(cursor)
+        return float(rank), int(log_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _encode_change_token(change_xid: int, log_id: int) -> str:
+    """Opaque sync token: the position in change feed order a client has reached."""
+    return _encode_token(f"{change_xid}|{log_id}")
+
+
+def _decode_change_token(token: str) -> Tuple[int, int]:
+    try:
+        change_xid, log_id = _decode_token(token)
+        return int(change_xid), int(log_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid token")
+
+
+_LOG_FIELDS = ("id", "template_id", "day_number", "practice_date", "duration_minutes", "notes", "created_at")
+
+# Deleted logs and details stay in the tables as tombstones for delta sync
+LIVE_LOGS = PracticeLog.deleted_at.is_(None)  # type: ignore[union-attr]
+LIVE_DETAILS = selectinload(
+    PracticeLog.log_details.and_(PracticeLogDetail.deleted_at.is_(None))  # type: ignore[attr-defined,union-attr]
+)
+
+
+def practice_log_dict(log: PracticeLog) -> dict:
+    """Plain dict of a log and its (eagerly loaded) details, shaped like PracticeLogRead.
+
+    Responses are built from these and encoded with orjson directly, which
+    skips FastAPI's validate-then-encode pass over the response model.
+    """
+    content = {name: getattr(log, name) for name in _LOG_FIELDS}
+    content["log_details"] = [
+        {"id": detail.id, "section_type": detail.section_type, "content": detail.content}
+        for detail in log.log_details
+    ]
+    return content
+
+
+def _create_log_statement() -> Select:
+    """One statement that inserts a log, its details and its rollup,
+    advances the template's rotation cursor and notifies other workers.
+
+    Data-modifying CTEs chain the inserts: the details pick up the new log id
+    from the first CTE, and the final SELECT returns the log joined with its
+    details (one row per detail, or a single row when there are none).
+    Details arrive as parallel arrays, so the statement has the same shape for
+    any number of details and is compiled and prepared only once.
+    """
+    log_table = PracticeLog.__table__  # type: ignore[attr-defined]
+    detail_table = PracticeLogDetail.__table__  # type: ignore[attr-defined]
+
+    new_log = (
+        insert(log_table)
+        .values(
+            template_id=bindparam("template_id"),
+            day_number=bindparam("day_number"),
+            practice_date=bindparam("practice_date"),
+            duration_minutes=bindparam("duration_minutes"),
+            notes=bindparam("notes"),
+            created_at=bindparam("created_at")
+        )
+        .returning(*(log_table.c[name] for name in _LOG_FIELDS))
+        .cte("new_log")
+    )
+
+    rollup = rollup_upsert_from(
+        select(  # type: ignore[call-overload]
+            new_log.c.template_id,
+            new_log.c.day_number,
+            new_log.c.practice_date,
+            literal(1),
+            new_log.c.duration_minutes
+        )
+    ).cte("rollup")
+
+    template_cursor = cursor_upsert_from(
+        select(new_log.c.template_id, new_log.c.day_number, new_log.c.practice_date)
+    ).cte("template_cursor")
+
+    notified = notify_from(
+        "logs",
+        select(  # type: ignore[call-overload]
+            new_log.c.template_id.label("id"),
+            new_log.c.id.label("log_id"),
+            new_log.c.day_number,
+            new_log.c.practice_date,
+            new_log.c.duration_minutes
+        )
+    ).cte("notified")
+
+    details = func.unnest(
+        bindparam("section_types", type_=ARRAY(String)),
+        bindparam("contents", type_=ARRAY(String))
+    ).table_valued("section_type", "content", with_ordinality="position").render_derived(name="details")
+    new_details = (
+        insert(detail_table)
+        .from_select(
+            ["log_id", "practice_date", "section_type", "content"],
+            select(new_log.c.id, new_log.c.practice_date, details.c.section_type, details.c.content)
+            .select_from(new_log.join(details, true()))
+            .order_by(details.c.position)
+        )
+        .returning(detail_table.c.id, detail_table.c.section_type, detail_table.c.content)
+        .cte("new_details")
+    )
+
+    return (
+        select(  # type: ignore[call-overload]
+            new_log,  # type: ignore[arg-type]
+            new_details.c.id.label("detail_id"),
+            new_details.c.section_type.label("detail_section_type"),
+            new_details.c.content.label("detail_content")
+        )
+        .select_from(new_log.join(notified, true()).outerjoin(new_details, true()))
+        .order_by(new_details.c.id)
+        .add_cte(rollup, template_cursor)
+    )
+
+
+CREATE_LOG = _create_log_statement()
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def _missing_template(error: IntegrityError) -> bool:
+    """Whether a write failed on a template_id foreign key, i.e. there is no such template.
+
+    The log, its rollup and its rotation cursor each reference the template,
+    and partitions name their copy of the constraint with a numeric suffix.
+    """
+    cause = getattr(error.orig, "__cause__", None)
+    constraint = getattr(cause, "constraint_name", None) or ""
+    return getattr(error.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION and "_template_id_fkey" in constraint
+
+
+def _delete_log_statement() -> Select:
+    """One statement that marks a log and its details deleted, takes the log
+    back out of its rollup and notifies other workers.
+
+    Returns the log's template_id, or no row if there is no such live log.
+    """
+    log_table = PracticeLog.__table__  # type: ignore[attr-defined]
+    detail_table = PracticeLogDetail.__table__  # type: ignore[attr-defined]
+
+    deleted_log = (
+        update(log_table)
+        .where(log_table.c.id == bindparam("target_id"), log_table.c.deleted_at.is_(None))
+        .values(deleted_at=bindparam("deleted_at"))
+        .returning(
+            log_table.c.template_id,
+            log_table.c.day_number,
+            log_table.c.practice_date,
+            log_table.c.duration_minutes,
+            log_table.c.id
+        )
+        .cte("deleted_log")
+    )
+
+    deleted_details = (
+        update(detail_table)
+        .where(
+            detail_table.c.log_id == deleted_log.c.id,
+            detail_table.c.practice_date == deleted_log.c.practice_date,
+            detail_table.c.deleted_at.is_(None)
+        )
+        .values(deleted_at=bindparam("deleted_at"))
+        .cte("deleted_details")
+    )
+
+    rollup = rollup_upsert_from(
+        select(  # type: ignore[call-overload]
+            deleted_log.c.template_id,
+            deleted_log.c.day_number,
+            deleted_log.c.practice_date,
+            literal(-1),
+            -deleted_log.c.duration_minutes
+        )
+    ).cte("rollup")
+
+    notified = notify_from("logs", select(deleted_log.c.template_id.label("id"))).cte("notified")
+
+    return (
+        select(deleted_log.c.template_id)
+        .select_from(deleted_log.join(notified, true()))
+        .add_cte(deleted_details, rollup)
+    )
+
+
+DELETE_LOG = _delete_log_statement()
+
+
+@router.post("/", response_model=PracticeLogRead, status_code=201)
 async def create_practice_log(
     log_data: PracticeLogCreate,
     session: AsyncSession = Depends(get_session)
 ):
     """Create a new practice log entry."""
-    # Create the main log entry
-    practice_log = PracticeLog(
-        template_id=log_data.template_id,
-        day_number=log_data.day_number,
-        practice_date=log_data.practice_date,
-        duration_minutes=log_data.duration_minutes,
-        notes=log_data.notes
-    )
-    session.add(practice_log)
-    await session.flush()  # Get the log ID
-    
-    # Create log details
-    for detail in log_data.log_details:
-        log_detail = PracticeLogDetail(
-            log_id=practice_log.id,
-            section_type=detail.section_type,
-            content=detail.content
-        )
-        session.add(log_detail)
-    
+    await ensure_partitions(session, [log_data.practice_date])
+
+    # Log, details and analytics rollup go in as a single statement
+    try:
+        result = await session.execute(CREATE_LOG, {
+            "template_id": log_data.template_id,
+            "day_number": log_data.day_number,
+            "practice_date": log_data.practice_date,
+            "duration_minutes": log_data.duration_minutes,
+            "notes": log_data.notes,
+            "created_at": datetime.utcnow(),
+            "section_types": [detail.section_type for detail in log_data.log_details],
+            "contents": [detail.content for detail in log_data.log_details]
+        })
+    except IntegrityError as e:
+        if _missing_template(e):
+            raise HTTPException(status_code=404, detail="Template not found")
+        raise
+    rows = result.mappings().all()
     await session.commit()
-    await session.refresh(practice_log)
     
-    # Load the log with details
-    statement = (
-        select(PracticeLog)
-        .where(PracticeLog.id == practice_log.id)
-        .options(selectinload(PracticeLog.log_details))
-    )
-    result = await session.execute(statement)
-    return result.scalar_one()
+    # Build the response from the returned rows instead of re-reading them
+    first = rows[0]
+    content = {name: first[name] for name in _LOG_FIELDS}
+    content["log_details"] = [
+        {
+            "id": row["detail_id"],
+            "section_type": row["detail_section_type"],
+            "content": row["detail_content"]
+        }
+        for row in rows
+        if row["detail_id"] is not None
+    ]
+    return ORJSONResponse(content, status_code=201)
+
+
+@router.post("/bulk", response_model=BulkLogResult)
+async def bulk_create_practice_logs(
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+):
+    """Import many practice logs at once.
+
+    Accepts a JSON array of PracticeLogCreate payloads, or the same payloads as
+    newline-delimited JSON (Content-Type: application/x-ndjson). Logs are
+    inserted in batched transactions; rows that fail validation or are
+    rejected by the database are listed in `errors` by their input position.
+    """
+    try:
+        return await bulk_logs.ingest(
+            session,
+            bulk_logs.iter_payloads(request),
+            batch_size=get_settings().bulk_insert_batch_size
+        )
+    except bulk_logs.BulkPayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[PracticeLog])
+@router.get("/", response_model=List[PracticeLogRead])
 async def list_practice_logs(
     template_id: Optional[int] = None,
-    limit: int = 50,
-    session: AsyncSession = Depends(get_session)
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session)
 ):
-    """Get practice logs, optionally filtered by template."""
+    """Get practice logs newest first, optionally filtered by template.
+
+    Pages are keyed on (practice_date, id) rather than an offset, so every page
+    is a single index range scan no matter how deep into history it is. The
+    body stays a plain list; the cursor for the next page, if there is one,
+    comes in the X-Next-Cursor header.
+    """
+    page = await log_page(session, template_id, limit, cursor)
+    headers = {NEXT_CURSOR_HEADER: page["next_cursor"]} if page["next_cursor"] else None
+    return ORJSONResponse(page["items"], headers=headers)
+
+
+async def log_page(
+    session: AsyncSession, template_id: Optional[int], limit: int, cursor: Optional[str] = None
+) -> dict:
+    """One page of logs, newest first, shaped like PracticeLogPage."""
     statement = (
         select(PracticeLog)
-        .order_by(desc(PracticeLog.practice_date))
-        .options(selectinload(PracticeLog.log_details))
-        .limit(limit)
+        .where(LIVE_LOGS)
+        .order_by(desc(PracticeLog.practice_date), desc(PracticeLog.id))  # type: ignore[arg-type]
+        .options(LIVE_DETAILS)
+        .limit(limit + 1)
     )
     
     if template_id:
         statement = statement.where(PracticeLog.template_id == template_id)
     
+    if cursor:
+        cursor_date, cursor_id = _decode_cursor(cursor)
+        # The plain date bound is implied by the row comparison, but only it
+        # lets the planner skip partitions for later years
+        statement = statement.where(
+            tuple_(PracticeLog.practice_date, PracticeLog.id) < tuple_(cursor_date, cursor_id),  # type: ignore[arg-type]
+            PracticeLog.practice_date <= cursor_date
+        )
+    
+    result = await session.execute(statement)
+    logs = list(result.scalars().all())
+    
+    # The extra row only tells us whether another page exists
+    next_cursor = None
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_cursor = _encode_cursor(logs[-1])
+    
+    return {
+        "items": [practice_log_dict(log) for log in logs],
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/export")
+async def export_practice_logs(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    template_id: Optional[int] = None
+):
+    """Stream the full log history, details inlined, as NDJSON or CSV."""
+    sessionmaker = read_session_factory(request)
+    if format == "csv":
+        body, media_type = exports.csv_lines(template_id, sessionmaker), "text/csv"
+    else:
+        body, media_type = exports.ndjson_lines(template_id, sessionmaker), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="practice_logs.{format}"'}
+    )
+
+
+@router.get("/snapshot")
+async def snapshot_practice_logs(
+    request: Request,
+    table: columnar.SnapshotTable = "logs",
+    format: columnar.SnapshotFormat = "parquet",
+    template_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None
+):
+    """Stream logs or their details as one Parquet or Arrow IPC file, for offline analysis.
+
+    Rows are encoded in fixed-size record batches as they come off the
+    database, so memory use stays flat however much history is exported.
+    `start` and `end` are inclusive practice dates.
+    """
+    filename = columnar.snapshot_filename(table, format)
+    return StreamingResponse(
+        columnar.snapshot_chunks(table, format, template_id, start, end, read_session_factory(request)),
+        media_type=columnar.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+# Must match the configuration the search_vector triggers were created with
+SEARCH_CONFIG = "english"
+
+_SEARCH_VECTOR = PracticeLog.__table__.c.search_vector  # type: ignore[attr-defined]
+
+
+@router.get("/search", response_model=PracticeLogSearchPage)
+async def search_practice_logs(
+    q: str = Query(..., min_length=1, max_length=200),
+    template_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Full-text search over log notes and section details, best match first.
+
+    `q` accepts web search syntax: quoted phrases, `or`, and `-word` to
+    exclude. Notes rank above details. Matching uses the GIN index on
+    search_vector; pages are keyed on (rank, id).
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank(_SEARCH_VECTOR, query)
+    statement = (
+        select(PracticeLog, rank.label("rank"))
+        .where(_SEARCH_VECTOR.op("@@")(query), LIVE_LOGS)
+        .order_by(desc("rank"), desc(PracticeLog.id))  # type: ignore[arg-type]
+        .options(LIVE_DETAILS)
+        .limit(limit + 1)
+    )
+
+    if template_id:
+        statement = statement.where(PracticeLog.template_id == template_id)
+
+    if cursor:
+        statement = statement.where(
+            tuple_(rank, PracticeLog.id) < tuple_(*_decode_search_cursor(cursor))  # type: ignore[arg-type]
+        )
+
+    result = await session.execute(statement)
+    hits = result.all()
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        last = hits[-1]
+        next_cursor = _encode_search_cursor(last.rank, last.PracticeLog.id)
+
+    return ORJSONResponse({
+        "items": [{**practice_log_dict(log), "rank": hit_rank} for log, hit_rank in hits],
+        "next_cursor": next_cursor
+    })
+
+
+# Transaction that last wrote the log, stamped by a trigger (see the
+# practice_log_change_xid migration); not mapped on the model
+_CHANGE_XID = PracticeLog.__table__.c.change_xid  # type: ignore[attr-defined]
+
+# Every transaction below this id has committed or rolled back
+_CHANGE_WATERMARK = func.pg_snapshot_xmin(func.pg_current_snapshot()).cast(Text).cast(BigInteger)
+
+
+@router.get("/changes", response_model=PracticeLogChanges)
+async def practice_log_changes(
+    since: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=500),
+    session: AsyncSession = Depends(get_session)
+):
+    """Logs created or deleted since a sync token, oldest change first.
+
+    Start without `since` to download the full history, then pass each
+    `next_token` back as `since`; while `has_more` is true the next page is
+    ready right away. Items and deletions are keyed by log id, so applying one
+    twice is harmless. Logs are never edited in place, so creations and
+    deletions (with the details they carry) are all the feed has to cover.
+
+    The feed is ordered by the id of the transaction that wrote each log, and
+    only goes up to the oldest transaction still running: everything below
+    that has finished, so a write that commits late can never land behind a
+    token already handed out. A long-running write holds the feed back until
+    it commits. For the same reason this reads from the primary; a lagging
+    replica could hide changes a token has already moved past.
+    """
+    watermark = (await session.execute(select(_CHANGE_WATERMARK))).scalar_one()
+
+    statement = (
+        select(PracticeLog, _CHANGE_XID)
+        .where(_CHANGE_XID < watermark)
+        .order_by(_CHANGE_XID, PracticeLog.id)  # type: ignore[arg-type]
+        .options(LIVE_DETAILS)
+        .limit(limit + 1)
+    )
+    position = _decode_change_token(since) if since else (0, 0)
+    if since:
+        statement = statement.where(tuple_(_CHANGE_XID, PracticeLog.id) > tuple_(*position))  # type: ignore[arg-type]
+
     result = await session.execute(statement)
-    logs = result.scalars().all()
-    return logs
+    changes = list(result.all())
 
+    has_more = len(changes) > limit
+    if has_more:
+        changes = changes[:limit]
+        last_log, last_xid = changes[-1]
+        next_token = _encode_change_token(last_xid, last_log.id)
+    else:
+        # Caught up: every change below the watermark has been sent
+        next_token = _encode_change_token(*max(position, (watermark, 0)))
 
-@router.get("/{log_id}", response_model=PracticeLog)
-async def get_practice_log(log_id: int, session: AsyncSession = Depends(get_session)):
+    logs = [log for log, _ in changes]
+    return ORJSONResponse({
+        "items": [practice_log_dict(log) for log in logs if log.deleted_at is None],
+        "deleted": [log.id for log in logs if log.deleted_at is not None],
+        "next_token": next_token,
+        "has_more": has_more
+    })
+
+
+@router.get("/{log_id}", response_model=PracticeLogRead)
+async def get_practice_log(log_id: int, session: AsyncSession = Depends(get_read_session)):
     """Get a specific practice log."""
     statement = (
         select(PracticeLog)
-        .where(PracticeLog.id == log_id)
-        .options(selectinload(PracticeLog.log_details))
+        .where(PracticeLog.id == log_id, LIVE_LOGS)
+        .options(LIVE_DETAILS)
     )
     
     result = await session.execute(statement)
@@ -87,4 +551,25 @@ async def get_practice_log(log_id: int, session: AsyncSession = Depends(get_sess
     if not log:
         raise HTTPException(status_code=404, detail="Practice log not found")
     
-    return log
+    return ORJSONResponse(practice_log_dict(log))
+
+
+@router.delete("/{log_id}", status_code=204)
+async def delete_practice_log(log_id: int, session: AsyncSession = Depends(get_session)):
+    """Delete a practice log.
+
+    The log and its details are kept as tombstones so that clients syncing
+    through /changes hear about the deletion; every other endpoint stops
+    returning them right away.
+    """
+    result = await session.execute(DELETE_LOG, {"target_id": log_id, "deleted_at": datetime.utcnow()})
+    template_id = result.scalar_one_or_none()
+    if template_id is None:
+        raise HTTPException(status_code=404, detail="Practice log not found")
+
+    # Rollup rows the log leaves empty would still count as practiced days,
+    # and the rotation may have to step back to the previous log
+    await prune_rollups(session, template_id)
+    await rebuild_cursors(session, template_id)
+    await session.commit()
+    return Response(status_code=204)
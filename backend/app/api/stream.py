@@ -0,0 +1,43 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+
+from app.broadcast import broadcaster
+from app.config import get_settings
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+
+async def _events(template_id: Optional[int]) -> AsyncIterator[bytes]:
+    keepalive = get_settings().stream_keepalive_seconds
+    subscription = broadcaster.subscribe(template_id)
+    try:
+        # Opens the stream right away and sets how long clients wait before reconnecting
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                yield await asyncio.wait_for(subscription.events.get(), keepalive)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                yield b": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get("/")
+async def stream_events(template_id: Optional[int] = None):
+    """Server-sent events for new practice logs and the analytics changes they make.
+
+    `log` events carry a new log, `analytics` events what it adds to its
+    template's summary, and `reset` events mean updates were missed and the
+    client should re-fetch. Filter to one template with template_id. Open the
+    stream before fetching the initial state so no update falls in between.
+    """
+    if not get_settings().cache_invalidation:
+        raise HTTPException(status_code=503, detail="Live updates are disabled")
+    return StreamingResponse(
+        _events(template_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
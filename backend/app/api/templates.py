@@ -1,19 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import Row
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import Hashable, List, Optional, Tuple
 
-from app.database import get_session
-from app.models import PracticeTemplate, PracticeDay, ExerciseBlock, Exercise
+from app.cache import known_versions, template_cache
+from app import template_import
+from app.database import get_read_session, get_session
+from app.etags import json_response, not_modified, version_etag
+from app.invalidation import listener
+from app.models import (
+    NextPracticeDay,
+    PracticeDayRead,
+    PracticeTemplate,
+    PracticeTemplateCursor,
+    PracticeTemplateRead,
+    PracticeTemplateSummary,
+    TemplateImportResult,
+)
+from app.template_cursors import next_day_number
+from app.template_snapshots import practice_day_json, template_json
 
 router = APIRouter(prefix="/templates", tags=["templates"])
 
 
-@router.get("/", response_model=List[PracticeTemplate])
+async def _template_version(session: AsyncSession, template_id: int) -> int:
+    """Current version of a template; cache keys are only valid for this version.
+
+    While this worker hears about every version bump, the last one it heard
+    of is current and no query is needed.
+    """
+    token = listener.fill_token(session)
+    if token is not None:
+        known = known_versions.get(template_id)
+        if known is not None:
+            return known
+
+    result = await session.execute(
+        select(PracticeTemplate.version).where(PracticeTemplate.id == template_id)
+    )
+    version = result.scalar_one_or_none()
+    if version is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    if listener.still_current(token):
+        known_versions.observe(template_id, version)
+    return version
+
+
+def _cache_body(key: Hashable, template_id: int, version: int, body: bytes) -> bytes:
+    """Cache a serialized body and drop entries left from older versions."""
+    template_cache.evict(lambda k: k[1] == template_id and k[2] != version)  # type: ignore[index]
+    template_cache.set(key, body)
+    return body
+
+
+async def _practice_day_body(
+    session: AsyncSession, template_id: int, version: int, day_number: int
+) -> Optional[bytes]:
+    """Serialized practice day from the cache, loading it on a miss; None if there is no such day."""
+    cache_key = ("day", template_id, version, day_number)
+    cached = template_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Picked out of the template snapshot by a JSON path, already serialized
+    result = await session.execute(
+        select(practice_day_json(day_number)).where(PracticeTemplate.id == template_id)
+    )
+    day = result.scalar_one_or_none()
+    
+    if day is None:
+        return None
+    
+    return _cache_body(cache_key, template_id, version, day.encode())
+
+
+@router.get("/", response_model=List[PracticeTemplateSummary])
 async def list_templates(
     instrument_id: Optional[int] = None,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get all practice templates, optionally filtered by instrument."""
     statement = select(PracticeTemplate).where(PracticeTemplate.is_active == True)
@@ -26,134 +92,136 @@ async def list_templates(
     return templates
 
 
-@router.get("/{template_id}")
-async def get_template(template_id: int, session: AsyncSession = Depends(get_session)):
-    """Get a complete practice template with all days and exercises."""
-    # Load template with all nested relationships
-    statement = (
-        select(PracticeTemplate)
-        .where(PracticeTemplate.id == template_id)
-        .options(
-            selectinload(PracticeTemplate.practice_days)
-            .selectinload(PracticeDay.exercise_blocks)
-            .selectinload(ExerciseBlock.exercises)
+@router.post("/import", response_model=TemplateImportResult)
+async def import_templates(
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+):
+    """Import template trees, with their instruments, from a JSON or YAML body.
+
+    The body is one template document or a list of them (YAML bodies, sent as
+    application/yaml, may also use `---` separated documents). Nothing is
+    imported unless every document is valid; invalid ones are listed by
+    position. Templates whose name already exists for the instrument are
+    skipped.
+    """
+    format = template_import.format_for_media_type(request.headers.get("content-type", ""))
+    try:
+        documents = template_import.validate_documents(
+            template_import.parse_documents(await request.body(), format)
         )
-    )
+    except template_import.TemplateDocumentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except template_import.TemplateImportError as e:
+        raise HTTPException(status_code=422, detail=[error.model_dump() for error in e.errors])
+
+    result = await template_import.import_templates(session, documents)
+    await session.commit()
+    return result
+
+
+@router.get("/{template_id}", response_model=PracticeTemplateRead)
+async def get_template(template_id: int, request: Request, session: AsyncSession = Depends(get_read_session)):
+    """Get a complete practice template with all days and exercises.
+
+    Supports If-None-Match; the ETag changes whenever the template version does.
+    """
+    version = await _template_version(session, template_id)
+    etag = version_etag("template", template_id, "v" + str(version))
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key = ("template", template_id, version)
+    cached = template_cache.get(cache_key)
+    if cached is not None:
+        return json_response(cached, etag)
     
-    result = await session.execute(statement)
-    template = result.scalar_one_or_none()
+    # The snapshot column is the whole response body
+    result = await session.execute(
+        select(template_json()).where(PracticeTemplate.id == template_id)
+    )
+    body = result.scalar_one_or_none()
     
-    if not template:
+    if body is None:
         raise HTTPException(status_code=404, detail="Template not found")
     
-    # Access relationships to ensure they're loaded
-    _ = template.practice_days
-    
-    # Manually build response with relationships
-    response = {
-        "id": template.id,
-        "instrument_id": template.instrument_id,
-        "name": template.name,
-        "days_count": template.days_count,
-        "description": template.description,
-        "is_active": template.is_active,
-        "practice_days": []
-    }
-    
-    # Build practice_days manually to avoid lazy loading issues
-    for day in sorted(template.practice_days, key=lambda x: x.day_number):
-        day_data = {
-            "id": day.id,
-            "template_id": day.template_id,
-            "day_number": day.day_number,
-            "title": day.title,
-            "warmup": day.warmup,
-            "scales": day.scales,
-            "repertoire": day.repertoire,
-            "exercise_blocks": []
-        }
-        
-        for block in sorted(day.exercise_blocks, key=lambda x: x.display_order):
-            block_data = {
-                "id": block.id,
-                "practice_day_id": block.practice_day_id,
-                "block_type": block.block_type,
-                "display_order": block.display_order,
-                "exercises": []
-            }
-            
-            for ex in sorted(block.exercises, key=lambda x: x.display_order):
-                block_data["exercises"].append({
-                    "id": ex.id,
-                    "block_id": ex.block_id,
-                    "exercise_text": ex.exercise_text,
-                    "display_order": ex.display_order
-                })
-            
-            day_data["exercise_blocks"].append(block_data)
-        
-        response["practice_days"].append(day_data)
-    
-    return response
+    return json_response(_cache_body(cache_key, template_id, version, body.encode()), etag)
 
 
-@router.get("/{template_id}/days/{day_number}")
+@router.get("/{template_id}/days/{day_number}", response_model=PracticeDayRead)
 async def get_practice_day(
     template_id: int,
     day_number: int,
-    session: AsyncSession = Depends(get_session)
+    request: Request,
+    session: AsyncSession = Depends(get_read_session)
 ):
-    """Get a specific day from a practice template."""
-    statement = (
-        select(PracticeDay)
-        .where(
-            PracticeDay.template_id == template_id,
-            PracticeDay.day_number == day_number
-        )
-        .options(
-            selectinload(PracticeDay.exercise_blocks)
-            .selectinload(ExerciseBlock.exercises)
+    """Get a specific day from a practice template. Supports If-None-Match."""
+    version = await _template_version(session, template_id)
+    etag = version_etag("template", template_id, "v" + str(version), "day", day_number)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    body = await _practice_day_body(session, template_id, version, day_number)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Practice day not found")
+    return json_response(body, etag)
+
+
+@router.get("/{template_id}/next", response_model=NextPracticeDay)
+async def get_next_practice_day(
+    template_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Get the rotation day due next: the one after the most recently practiced
+    day, wrapping around, or day 1 for a template with no logs yet.
+
+    Answered from the template's rotation cursor and the day cache, so the
+    cost does not depend on history size. Supports If-None-Match.
+    """
+    row, day_number, body = await next_practice_day(session, template_id)
+    etag = version_etag(
+        "template", template_id, "v" + str(row.version), "next", day_number, row.last_practice_date
+    )
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    return json_response(next_practice_day_json(row, day_number, body), etag)
+
+
+async def next_practice_day(session: AsyncSession, template_id: int) -> Tuple[Row, int, bytes]:
+    """The template's version and cursor, the day due next and its serialized body.
+
+    Raises 404 for a missing template or day.
+    """
+    result = await session.execute(
+        select(  # type: ignore[call-overload]
+            PracticeTemplate.version,
+            PracticeTemplate.days_count,
+            PracticeTemplateCursor.last_day_number,
+            PracticeTemplateCursor.last_practice_date  # type: ignore[arg-type]
         )
+        .outerjoin(PracticeTemplateCursor, PracticeTemplateCursor.template_id == PracticeTemplate.id)
+        .where(PracticeTemplate.id == template_id)
     )
-    
-    result = await session.execute(statement)
-    practice_day = result.scalar_one_or_none()
-    
-    if not practice_day:
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+
+    day_number = next_day_number(row.last_day_number, row.days_count)
+    body = await _practice_day_body(session, template_id, row.version, day_number)
+    if body is None:
         raise HTTPException(status_code=404, detail="Practice day not found")
-    
-    # Access relationships to ensure they're loaded
-    _ = practice_day.exercise_blocks
-    
-    # Manually build response with relationships
-    response = {
-        "id": practice_day.id,
-        "template_id": practice_day.template_id,
-        "day_number": practice_day.day_number,
-        "title": practice_day.title,
-        "warmup": practice_day.warmup,
-        "scales": practice_day.scales,
-        "repertoire": practice_day.repertoire,
-        "exercise_blocks": []
-    }
-    
-    for block in sorted(practice_day.exercise_blocks, key=lambda x: x.display_order):
-        block_data = {
-            "id": block.id,
-            "practice_day_id": block.practice_day_id,
-            "block_type": block.block_type,
-            "display_order": block.display_order,
-            "exercises": []
-        }
-        
-        for ex in sorted(block.exercises, key=lambda x: x.display_order):
-            block_data["exercises"].append({
-                "id": ex.id,
-                "block_id": ex.block_id,
-                "exercise_text": ex.exercise_text,
-                "display_order": ex.display_order
-            })
-        
-        response["exercise_blocks"].append(block_data)
-    
-    return response
+    return row, day_number, body
+
+
+def next_practice_day_json(row: Row, day_number: int, body: bytes) -> bytes:
+    """NextPracticeDay as JSON, with the cached day body spliced in as is."""
+    return orjson.dumps({
+        "day_number": day_number,
+        "last_day_number": row.last_day_number,
+        "last_practice_date": row.last_practice_date,
+        "practice_day": orjson.Fragment(body)
+    })
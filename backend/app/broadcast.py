@@ -0,0 +1,163 @@
+"""
+Fanning live practice log events out to server-sent event streams
+
+The invalidation listener (app/invalidation.py) already hears about every
+committed log write, on every worker. The broadcaster turns those
+notifications into events and copies each one to every stream open on this
+worker, so a dashboard with a stream open never polls: an idle one costs the
+database nothing, and each new log costs one query per worker however many
+streams are open.
+
+Events, by SSE event name:
+
+    log        a newly created log, shaped like PracticeLogRead
+    analytics  what that log adds to its template's analytics summary:
+               {"template_id", "day_number", "sessions": 1, "minutes": N}
+    reset      events may have been missed (a bulk import, a deleted log, a
+               lost listener connection, or a stream too slow to keep up);
+               re-fetch
+"""
+import asyncio
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Set
+
+import orjson
+from sqlalchemy import tuple_
+from sqlmodel import select
+
+from app.api.logs import LIVE_DETAILS, LIVE_LOGS, practice_log_dict
+from app.config import get_settings
+from app.database import async_session
+from app.invalidation import listener
+from app.models import PracticeLog
+
+logger = logging.getLogger(__name__)
+
+
+def server_event(name: str, content: Any) -> bytes:
+    return b"event: " + name.encode() + b"\ndata: " + orjson.dumps(content) + b"\n\n"
+
+
+class Subscription:
+    """One open stream: its events, waiting to be sent."""
+
+    def __init__(self, template_id: Optional[int], size: int):
+        self.template_id = template_id
+        self.events: "asyncio.Queue[bytes]" = asyncio.Queue(size)
+
+    def wants(self, template_id: Optional[int]) -> bool:
+        return self.template_id is None or template_id is None or template_id == self.template_id
+
+
+async def _load_logs(messages: List[Dict[str, Any]]) -> Dict[int, dict]:
+    """Newly created logs with their details, by id, in one query on the primary."""
+    keys = [(message["log_id"], date.fromisoformat(message["practice_date"])) for message in messages]
+    async with async_session() as session:
+        result = await session.execute(
+            select(PracticeLog)
+            .where(tuple_(PracticeLog.id, PracticeLog.practice_date).in_(keys), LIVE_LOGS)  # type: ignore[arg-type]
+            .options(LIVE_DETAILS)
+        )
+        return {log.id: practice_log_dict(log) for log in result.scalars()}
+
+
+class Broadcaster:
+    """Copies events to every subscription on this worker."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.published = 0
+        self.overflows = 0
+        self._subscriptions: Set[Subscription] = set()
+        # Notifications in arrival order; None stands for a reset
+        self._inbox: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        self._pump: Optional[asyncio.Task] = None
+
+    def subscribe(self, template_id: Optional[int]) -> Subscription:
+        if self._pump is None:
+            self._pump = asyncio.create_task(self._run())
+        subscription = Subscription(template_id, self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def on_message(self, message: Dict[str, Any]) -> None:
+        # Nobody to tell: skip loading the log altogether
+        if message["entity"] == "logs" and self._subscriptions:
+            self._inbox.put_nowait(message)
+
+    def on_reset(self) -> None:
+        if self._subscriptions:
+            self._inbox.put_nowait(None)
+
+    def publish(self, template_id: Optional[int], event: bytes) -> None:
+        """Queue an event for every subscription that wants the template's events."""
+        self.published += 1
+        for subscription in list(self._subscriptions):
+            if not subscription.wants(template_id):
+                continue
+            try:
+                subscription.events.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop its backlog and have it re-fetch
+                self.overflows += 1
+                while not subscription.events.empty():
+                    subscription.events.get_nowait()
+                subscription.events.put_nowait(server_event("reset", {"template_id": subscription.template_id}))
+
+    async def _deliver(self, messages: List[Optional[Dict[str, Any]]]) -> None:
+        created = [message for message in messages if message is not None and "log_id" in message]
+        try:
+            logs = await _load_logs(created) if created else {}
+        except Exception:
+            logger.warning("Could not load logs for the live feed", exc_info=True)
+            logs = {}
+
+        for message in messages:
+            if message is None:
+                self.publish(None, server_event("reset", {"template_id": None}))
+                continue
+            template_id = message["id"]
+            if "log_id" not in message or message["log_id"] not in logs:
+                # A bulk import, or a log that could not be loaded
+                self.publish(template_id, server_event("reset", {"template_id": template_id}))
+                continue
+            self.publish(template_id, server_event("log", logs[message["log_id"]]))
+            self.publish(template_id, server_event("analytics", {
+                "template_id": template_id,
+                "day_number": message["day_number"],
+                "sessions": 1,
+                "minutes": message["duration_minutes"],
+            }))
+
+    async def _run(self) -> None:
+        while True:
+            # Whatever arrived meanwhile is loaded in the same query
+            messages = [await self._inbox.get()]
+            while not self._inbox.empty():
+                messages.append(self._inbox.get_nowait())
+            await self._deliver(messages)
+
+    async def stop(self) -> None:
+        if self._pump is None:
+            return
+        self._pump.cancel()
+        try:
+            await self._pump
+        except asyncio.CancelledError:
+            pass
+        self._pump = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscriptions),
+            "published": self.published,
+            "overflows": self.overflows,
+        }
+
+
+broadcaster = Broadcaster(get_settings().stream_queue_size)
+listener.subscribe(broadcaster.on_message, broadcaster.on_reset)
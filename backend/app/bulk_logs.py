@@ -0,0 +1,189 @@
+"""
+Batched ingestion of many practice logs at once
+
+Logs are validated one by one, then written a batch at a time: one multi-row
+INSERT ... RETURNING for the logs, one multi-row INSERT for their details and
+one rollup upsert, committed together. A bad row is reported by its position
+in the input and never blocks the rest of the import; a batch the database
+rejects is retried a row at a time to find the rows at fault.
+"""
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import Request
+
+from app.models import (
+    BulkLogError,
+    BulkLogResult,
+    PracticeLog,
+    PracticeLogCreate,
+    PracticeLogDetail,
+    PracticeTemplate,
+)
+from app.notifications import notify, payload
+from app.partitions import ensure_partitions
+from app.rollups import record_practice_logs
+from app.template_cursors import advance_cursors
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class BulkPayloadError(ValueError):
+    """The request body as a whole could not be read"""
+
+
+async def iter_payloads(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (index, decoded object) for each log in a JSON array or NDJSON body.
+
+    NDJSON is decoded while it streams in, so the raw body is never held in
+    memory at once. Lines that are not valid JSON are yielded as the
+    exception instead of an object.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_MEDIA_TYPES:
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _decode_line(line)
+                    index += 1
+        if buffer.strip():
+            yield index, _decode_line(buffer)
+        return
+
+    try:
+        payload = json.loads(await request.body())
+    except ValueError as e:
+        raise BulkPayloadError(f"Body is not valid JSON: {e}")
+    if not isinstance(payload, list):
+        raise BulkPayloadError("Body must be a JSON array of practice logs")
+    for index, item in enumerate(payload):
+        yield index, item
+
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+
+async def ingest(session: AsyncSession, payloads: AsyncIterator[Tuple[int, Any]], batch_size: int) -> BulkLogResult:
+    """Validate and insert every payload, committing once per batch."""
+    result = BulkLogResult()
+    batch: List[Tuple[int, PracticeLogCreate]] = []
+
+    async for index, item in payloads:
+        result.received += 1
+        if isinstance(item, ValueError):
+            result.errors.append(BulkLogError(index=index, error=f"Invalid JSON: {item}"))
+            continue
+        try:
+            batch.append((index, PracticeLogCreate.model_validate(item)))
+        except ValidationError as e:
+            result.errors.append(BulkLogError(index=index, error=_describe(e)))
+            continue
+
+        if len(batch) >= batch_size:
+            await _insert_batch(session, batch, result)
+            batch = []
+
+    if batch:
+        await _insert_batch(session, batch, result)
+
+    result.errors.sort(key=lambda e: e.index)
+    return result
+
+
+async def _insert_batch(session: AsyncSession, batch: List[Tuple[int, PracticeLogCreate]], result: BulkLogResult) -> None:
+    # Before the batch's transaction writes anything: the DDL commits on its own
+    await ensure_partitions(session, [log.practice_date for _, log in batch])
+
+    # Reject unknown templates up front rather than failing the whole batch on the FK
+    template_ids = {log.template_id for _, log in batch}
+    known = await session.execute(
+        select(PracticeTemplate.id).where(PracticeTemplate.id.in_(template_ids))  # type: ignore[union-attr]
+    )
+    known_ids = set(known.scalars())
+
+    rows: List[Tuple[int, PracticeLogCreate]] = []
+    for index, log in batch:
+        if log.template_id in known_ids:
+            rows.append((index, log))
+        else:
+            result.errors.append(BulkLogError(index=index, error="Template not found"))
+    if not rows:
+        return
+
+    created_at = datetime.utcnow()
+    try:
+        await _write_rows(session, rows, created_at)
+        await session.commit()
+    except DBAPIError:
+        await session.rollback()
+    else:
+        result.inserted += len(rows)
+        return
+
+    # Something in the batch was rejected: write it again a row at a time,
+    # each in a savepoint, so only the offending rows are left out
+    for index, log in rows:
+        try:
+            async with session.begin_nested():
+                await _write_rows(session, [(index, log)], created_at)
+        except DBAPIError as e:
+            result.errors.append(BulkLogError(index=index, error=f"Rejected by database: {e.orig}"))
+        else:
+            result.inserted += 1
+    await session.commit()
+
+
+async def _write_rows(session: AsyncSession, rows: List[Tuple[int, PracticeLogCreate]], created_at: datetime) -> None:
+    """Insert the logs, their details and rollups, and advance the cursors, without committing."""
+    inserted = await session.execute(
+        insert(PracticeLog).returning(PracticeLog.id, sort_by_parameter_order=True),  # type: ignore[call-overload]
+        [
+            {
+                "template_id": log.template_id,
+                "day_number": log.day_number,
+                "practice_date": log.practice_date,
+                "duration_minutes": log.duration_minutes,
+                "notes": log.notes,
+                "created_at": created_at,
+            }
+            for _, log in rows
+        ],
+    )
+    log_ids = inserted.scalars().all()
+
+    detail_rows = [
+        {
+            "log_id": log_id,
+            "practice_date": log.practice_date,
+            "section_type": detail.section_type,
+            "content": detail.content,
+        }
+        for log_id, (_, log) in zip(log_ids, rows)
+        for detail in log.log_details
+    ]
+    if detail_rows:
+        await session.execute(insert(PracticeLogDetail), detail_rows)
+
+    await record_practice_logs(session, [log for _, log in rows])
+    await advance_cursors(session, [log for _, log in rows])
+    await notify(session, (payload("logs", template_id) for template_id in {log.template_id for _, log in rows}))
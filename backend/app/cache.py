@@ -0,0 +1,97 @@
+"""
+Small in-process caches for rarely changing API responses
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.config import get_settings
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with hit/miss counters.
+
+    Not thread-safe; it is only touched from the event loop.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def evict(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches, returning how many were dropped."""
+        stale = [key for key in self._entries if predicate(key)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class KnownVersions:
+    """Latest version of each template a worker has seen.
+
+    Versions only go up, so a lookup that raced a newer notification can never
+    move an entry backwards.
+    """
+
+    def __init__(self):
+        self._versions: Dict[int, int] = {}
+
+    def get(self, template_id: int) -> Optional[int]:
+        return self._versions.get(template_id)
+
+    def observe(self, template_id: int, version: int) -> None:
+        if version > self._versions.get(template_id, 0):
+            self._versions[template_id] = version
+
+    def forget(self, template_id: int) -> None:
+        self._versions.pop(template_id, None)
+
+    def clear(self) -> None:
+        self._versions.clear()
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+
+# Serialized template trees and practice days, keyed by
+# ("template", template_id, version) or ("day", template_id, version, day_number)
+template_cache = LRUCache(get_settings().template_cache_size)
+
+# Template versions as last notified or read; only trusted while this worker
+# is listening for invalidations (see app/notifications.py)
+known_versions = KnownVersions()
+
+# Responses with no version to key them by: ("instruments",),
+# ("instrument", instrument_id) and ("analytics", template_id). Only filled
+# and read while this worker is listening for invalidations.
+response_cache = LRUCache(get_settings().response_cache_size)
@@ -0,0 +1,232 @@
+"""
+Columnar snapshots of practice logs and their details, as Arrow IPC or Parquet
+
+For offline analysis. Each table becomes one file of fixed-size record
+batches, read off a server-side cursor a batch at a time and encoded as it
+arrives, so memory use depends on the batch size and not on how much
+history is exported. section_type is dictionary encoded and practice_date
+is date32, and pandas, Polars or DuckDB read the files without parsing.
+
+Deleted logs and details are left out. pyarrow is imported on first use,
+so workers that never export do not load it at startup.
+"""
+import asyncio
+from datetime import date
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import async_session
+from app.models import PracticeLog, PracticeLogDetail
+
+_LOGS = PracticeLog.__table__  # type: ignore[attr-defined]
+_DETAILS = PracticeLogDetail.__table__  # type: ignore[attr-defined]
+
+SnapshotTable = Literal["logs", "details"]
+SnapshotFormat = Literal["arrow", "parquet"]
+
+BATCH_ROWS = 65536
+
+TABLE_NAMES: Dict[str, str] = {"logs": "practice_logs", "details": "practice_log_details"}
+SUFFIXES: Dict[str, str] = {"arrow": ".arrow", "parquet": ".parquet"}
+MEDIA_TYPES: Dict[str, str] = {
+    "arrow": "application/vnd.apache.arrow.file",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def snapshot_filename(table: SnapshotTable, format: SnapshotFormat) -> str:
+    return TABLE_NAMES[table] + SUFFIXES[format]
+
+
+def _schema(table: SnapshotTable):
+    import pyarrow as pa
+
+    if table == "logs":
+        return pa.schema([
+            ("id", pa.int32()),
+            ("template_id", pa.int32()),
+            ("day_number", pa.int32()),
+            ("practice_date", pa.date32()),
+            ("duration_minutes", pa.int32()),
+            ("notes", pa.string()),
+            ("created_at", pa.timestamp("us")),
+            ("updated_at", pa.timestamp("us")),
+        ])
+    return pa.schema([
+        ("id", pa.int32()),
+        ("log_id", pa.int32()),
+        ("practice_date", pa.date32()),
+        ("section_type", pa.dictionary(pa.int32(), pa.string())),
+        ("content", pa.string()),
+    ])
+
+
+def snapshot_statement(
+    table: SnapshotTable,
+    template_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Select:
+    """Rows of one table, columns in schema order; start and end are inclusive practice dates."""
+    if table == "logs":
+        statement = (
+            select(*(_LOGS.c[field] for field in _schema(table).names))
+            .where(_LOGS.c.deleted_at.is_(None))
+            # Date order follows the partitions and gives each Parquet row
+            # group a narrow practice_date range for readers to skip on
+            .order_by(_LOGS.c.practice_date, _LOGS.c.id)
+        )
+        if template_id:
+            statement = statement.where(_LOGS.c.template_id == template_id)
+        practice_date = _LOGS.c.practice_date
+    else:
+        statement = (
+            select(*(_DETAILS.c[field] for field in _schema(table).names))
+            .where(_DETAILS.c.deleted_at.is_(None))
+        )
+        if template_id:
+            statement = statement.join(
+                _LOGS,
+                (_LOGS.c.id == _DETAILS.c.log_id)
+                & (_LOGS.c.practice_date == _DETAILS.c.practice_date)
+            ).where(_LOGS.c.template_id == template_id)
+        practice_date = _DETAILS.c.practice_date
+
+    # Bounds on the partition key keep other years' partitions out of the scan
+    if start:
+        statement = statement.where(practice_date >= start)
+    if end:
+        statement = statement.where(practice_date <= end)
+    return statement.execution_options(yield_per=BATCH_ROWS)
+
+
+class _Sink:
+    """Write-only file object handing over what the writer wrote since the last take()."""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class SnapshotEncoder:
+    """Encodes batches of rows into one Arrow IPC or Parquet file, returning its bytes as they are written."""
+
+    def __init__(self, table: SnapshotTable, format: SnapshotFormat):
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+
+        self.schema = _schema(table)
+        self.rows = 0
+        self._sink = _Sink()
+        # One dictionary per file that only ever grows, so each batch adds
+        # the section types it introduces instead of repeating them all
+        self._codes: Dict[str, Dict[Any, int]] = {
+            field.name: {} for field in self.schema if pa.types.is_dictionary(field.type)
+        }
+        if format == "parquet":
+            self._writer = pq.ParquetWriter(self._sink, self.schema, compression="zstd")
+        else:
+            self._writer = ipc.new_file(
+                self._sink,
+                self.schema,
+                options=ipc.IpcWriteOptions(compression="zstd", emit_dictionary_deltas=True),
+            )
+
+    def _column(self, field, values: Sequence[Any]):
+        import pyarrow as pa
+
+        codes = self._codes.get(field.name)
+        if codes is None:
+            return pa.array(values, type=field.type)
+        indices = [codes.setdefault(value, len(codes)) for value in values]
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=field.type.index_type),
+            pa.array(list(codes), type=field.type.value_type),
+        )
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        import pyarrow as pa
+
+        columns = list(zip(*rows))
+        batch = pa.record_batch(
+            [self._column(field, values) for field, values in zip(self.schema, columns)], schema=self.schema
+        )
+        self._writer.write_batch(batch)
+        self.rows += len(rows)
+        return self._sink.take()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.take()
+
+
+async def _encoded(
+    encoder: SnapshotEncoder, statement: Select, sessionmaker: async_sessionmaker
+) -> AsyncIterator[bytes]:
+    # Encoding and compression run off the event loop; pyarrow releases
+    # the GIL for most of it
+    async with sessionmaker() as session:
+        result = await session.stream(statement)
+        async for rows in result.partitions(BATCH_ROWS):
+            chunk = await asyncio.to_thread(encoder.write, rows)
+            if chunk:
+                yield chunk
+    yield await asyncio.to_thread(encoder.close)
+
+
+async def snapshot_chunks(
+    table: SnapshotTable,
+    format: SnapshotFormat,
+    template_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    sessionmaker: async_sessionmaker = async_session,
+) -> AsyncIterator[bytes]:
+    """Yield a snapshot file of one table as it is written.
+
+    Opens its own session from `sessionmaker`, like the row exports in
+    app/exports.py.
+    """
+    encoder = await asyncio.to_thread(SnapshotEncoder, table, format)
+    async for chunk in _encoded(encoder, snapshot_statement(table, template_id, start, end), sessionmaker):
+        yield chunk
+
+
+async def write_snapshot(
+    path: Path,
+    table: SnapshotTable,
+    format: SnapshotFormat,
+    template_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> int:
+    """Write a snapshot file of one table to `path`, returning the number of rows."""
+    encoder = await asyncio.to_thread(SnapshotEncoder, table, format)
+    with open(path, "wb") as file:
+        async for chunk in _encoded(encoder, snapshot_statement(table, template_id, start, end), async_session):
+            file.write(chunk)
+    return encoder.rows
@@ -1,26 +1,201 @@
-from typing import AsyncGenerator
+import asyncio
+import math
+import time
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List
+from uuid import uuid4
+from fastapi import Request
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from app.config import get_settings
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import Settings, get_settings
+from app.metrics import instrument_engine
+from app import template_versions  # noqa: F401  (registers template version flush listeners)
 
 settings = get_settings()
 
+
+def _connect_args(settings: Settings, url: str) -> Dict[str, Any]:
+    """asyncpg connection arguments for the statement cache settings."""
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    if settings.db_pgbouncer_mode:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    }
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    created = create_async_engine(
+        url,
+        echo=settings.db_echo,
+        future=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(settings, url)
+    )
+    instrument_engine(created)
+    return created
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=True if settings.environment == "development" else False,
-    future=True
-)
+engine = _create_engine(settings.database_url)
 
-# Create async session factory
+# Read-only engine; the primary doubles as it when no replica is configured
+read_engine = _create_engine(settings.database_read_url) if settings.database_read_url else engine
+
+# Create async session factories
 async_session = async_sessionmaker(
     engine, 
     class_=AsyncSession, 
     expire_on_commit=False
 )
+read_session = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+
+class PoolWaitStats:
+    """How long requests wait to get a connection from the pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "mean_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+def _pool_snapshot(pool: Any) -> Dict[str, Any]:
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def pool_status() -> Dict[str, Any]:
+    """Snapshot of the engine's connection pool, and the replica's if there is one."""
+    status = {
+        **_pool_snapshot(engine.pool),
+        "max_overflow": settings.db_max_overflow,
+        "pgbouncer_mode": settings.db_pgbouncer_mode,
+        **pool_wait_stats.as_dict(),
+    }
+    if read_engine is not engine:
+        status["replica"] = _pool_snapshot(read_engine.pool)
+    return status
+
+
+async def _open_session(factory: async_sessionmaker) -> AsyncGenerator[AsyncSession, None]:
+    async with factory() as session:
+        # Check out the connection up front so pool waits are measured
+        started = time.perf_counter()
+        try:
+            await session.connection()
+        except PoolTimeoutError:
+            pool_wait_stats.timeouts += 1
+            raise
+        pool_wait_stats.record(time.perf_counter() - started)
+        yield session
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get async database session."""
-    async with async_session() as session:
+    async for session in _open_session(async_session):
+        yield session
+
+
+# Set on responses to writes; reads carrying it stay on the primary until it expires
+LAST_WRITE_COOKIE = "pj_last_write"
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def read_session_factory(request: Request) -> async_sessionmaker:
+    """The replica's session factory, or the primary's for a client that just wrote."""
+    if read_engine is engine:
+        return async_session
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return read_session
+    if time.time() - last_write < settings.db_read_your_writes_window:
+        return async_session
+    return read_session
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Dependency to get a session for read-only handlers, routed to the replica when possible."""
+    async for session in _open_session(read_session_factory(request)):
         yield session
+
+
+async def gather_sessions(
+    factory: async_sessionmaker, *loads: Callable[[AsyncSession], Awaitable[Any]]
+) -> List[Any]:
+    """Run each load concurrently, each on a session (and pool connection) of its own.
+
+    A session runs one statement at a time, so this is how a request's
+    independent queries overlap. Results come back in the order of `loads`.
+    """
+    async def run(load: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        async with factory() as session:
+            return await load(session)
+
+    return list(await asyncio.gather(*(run(load) for load in loads)))
+
+
+class ReadYourWritesMiddleware:
+    """Mark clients whose write succeeded so their next reads go to the primary.
+
+    The replica may not have replayed the write yet; the cookie expires once
+    db_read_your_writes_window has passed and reads return to the replica.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in _READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{LAST_WRITE_COOKIE}={time.time():.3f}; "
+                    f"Max-Age={math.ceil(settings.db_read_your_writes_window)}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,54 @@
+"""
+Strong ETags and conditional GET for rarely changing resources
+
+Clients revalidate on every use (Cache-Control: no-cache) and get an empty
+304 while their copy is current, so a repeat view costs a version lookup
+instead of a full body.
+"""
+import hashlib
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+CACHE_CONTROL = "no-cache"
+
+
+def version_etag(*parts: object) -> str:
+    """ETag built from identifiers and a row version, e.g. "template-3-v7"."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def content_etag(body: bytes) -> str:
+    """ETag built from a hash of the serialized body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the client already holds this ETag, otherwise None."""
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_headers(etag))
+    return None
+
+
+def json_response(body: bytes, etag: str) -> Response:
+    return Response(content=body, media_type="application/json", headers=_headers(etag))
@@ -0,0 +1,108 @@
+"""
+Streaming exports of the full practice log history
+
+Rows come off a server-side cursor a batch at a time and are encoded as they
+arrive, so memory use does not depend on how much history is exported.
+"""
+import csv
+import io
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import async_session
+from app.models import PracticeLog, PracticeLogDetail
+
+EXPORT_BATCH_SIZE = 1000
+
+_LOGS = PracticeLog.__table__  # type: ignore[attr-defined]
+_DETAILS = PracticeLogDetail.__table__  # type: ignore[attr-defined]
+
+LOG_COLUMNS = ["id", "template_id", "day_number", "practice_date", "duration_minutes", "notes", "created_at"]
+
+
+async def iter_logs(
+    template_id: Optional[int] = None, sessionmaker: async_sessionmaker = async_session
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield every log as a plain dict with its details inlined, oldest id first.
+
+    Opens its own session from `sessionmaker`: the request's session is
+    already closed by the time a streaming response body is produced.
+    """
+    statement = (
+        select(
+            *(_LOGS.c[name] for name in LOG_COLUMNS),
+            _DETAILS.c.id.label("detail_id"),
+            _DETAILS.c.section_type,
+            _DETAILS.c.content,
+        )
+        .outerjoin(
+            _DETAILS,
+            (_DETAILS.c.log_id == _LOGS.c.id)
+            & (_DETAILS.c.practice_date == _LOGS.c.practice_date)
+            & _DETAILS.c.deleted_at.is_(None)
+        )
+        .where(_LOGS.c.deleted_at.is_(None))
+        .order_by(_LOGS.c.id, _DETAILS.c.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if template_id:
+        statement = statement.where(_LOGS.c.template_id == template_id)
+
+    async with sessionmaker() as session:
+        result = await session.stream(statement)
+        current: Optional[Dict[str, Any]] = None
+        async for row in result:
+            if current is None or current["id"] != row.id:
+                if current is not None:
+                    yield current
+                current = {name: getattr(row, name) for name in LOG_COLUMNS}
+                current["log_details"] = []
+            if row.detail_id is not None:
+                current["log_details"].append(
+                    {"id": row.detail_id, "section_type": row.section_type, "content": row.content}
+                )
+        if current is not None:
+            yield current
+
+
+async def ndjson_lines(
+    template_id: Optional[int] = None, sessionmaker: async_sessionmaker = async_session
+) -> AsyncIterator[bytes]:
+    chunk: List[bytes] = []
+    async for log in iter_logs(template_id, sessionmaker):
+        chunk.append(orjson.dumps(log))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def _csv_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+async def csv_lines(
+    template_id: Optional[int] = None, sessionmaker: async_sessionmaker = async_session
+) -> AsyncIterator[bytes]:
+    """CSV with one row per log; details are inlined as a JSON array column."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(LOG_COLUMNS + ["log_details"])
+    rows = 0
+    async for log in iter_logs(template_id, sessionmaker):
+        writer.writerow(
+            [_csv_value(log[name]) for name in LOG_COLUMNS]
+            + [orjson.dumps(log["log_details"]).decode("utf-8")]
+        )
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,191 @@
+"""
+Evicting this worker's caches as other workers write
+
+Every worker keeps one dedicated connection LISTENing on the channel that
+app/notifications.py publishes to, and evicts the affected entries as
+notifications arrive. A notification sent while a worker is not listening is
+lost, so the caches that depend on them (known template versions and the
+response cache) are cleared whenever the connection is (re)established and
+bypassed while it is down. Caches keyed by template version stay valid
+either way.
+
+A read that started before an invalidation arrived may still return what was
+just invalidated. Reads therefore take a token before they query and only
+fill a cache if no notification arrived in between (see cached_response).
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import asyncpg
+import orjson
+from sqlalchemy.engine import make_url
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.cache import known_versions, response_cache, template_cache
+from app.config import get_settings
+from app.database import engine, read_engine
+from app.notifications import CHANNEL
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[Dict[str, Any]], None]
+ResetHandler = Callable[[], None]
+
+# Without traffic, how often the listening connection is checked for life
+_KEEPALIVE_SECONDS = 30.0
+_MAX_RECONNECT_DELAY = 30.0
+
+
+def evict(entity: str, entity_id: int, version: Optional[int] = None) -> None:
+    """Drop everything a change to the given entity makes stale."""
+    if entity == "template":
+        if version is None:
+            known_versions.forget(entity_id)
+            template_cache.evict(lambda k: k[1] == entity_id)  # type: ignore[index]
+        else:
+            known_versions.observe(entity_id, version)
+            template_cache.evict(lambda k: k[1] == entity_id and k[2] < version)  # type: ignore[index]
+    elif entity == "instrument":
+        response_cache.evict(lambda k: k == ("instruments",) or k == ("instrument", entity_id))
+    elif entity == "logs":
+        response_cache.evict(lambda k: k[0] == "analytics" and k[1] in (entity_id, None))  # type: ignore[index]
+
+
+class InvalidationListener:
+    """Background task holding the LISTEN connection, reconnecting as needed."""
+
+    def __init__(self):
+        self.live = False
+        self.received = 0
+        self.connects = 0
+        # Bumped by every notification and reconnect; see fill_token
+        self.epoch = 0
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self._subscribers: List[Tuple[MessageHandler, ResetHandler]] = []
+
+    def subscribe(self, on_message: MessageHandler, on_reset: ResetHandler) -> None:
+        """Also pass every notification to `on_message`, after eviction.
+
+        `on_reset` is called whenever notifications may have been missed:
+        when the connection is (re)established and when it is lost.
+        """
+        self._subscribers.append((on_message, on_reset))
+
+    def fill_token(self, session: AsyncSession) -> Optional[int]:
+        """Token to take before reading from `session` to fill a notified cache; None if it must not.
+
+        A replica can lag behind notifications already received from the
+        primary, so only reads on the primary fill these caches.
+        """
+        if not self.live or (read_engine is not engine and session.bind is not engine):
+            return None
+        return self.epoch
+
+    def still_current(self, token: Optional[int]) -> bool:
+        """Whether nothing was invalidated since the token was taken."""
+        return token is not None and self.live and token == self.epoch
+
+    def _reset(self) -> None:
+        self.epoch += 1
+        known_versions.clear()
+        response_cache.clear()
+        for _, on_reset in self._subscribers:
+            on_reset()
+
+    def _receive(self, connection, pid: int, channel: str, payload: str) -> None:
+        self.epoch += 1
+        self.received += 1
+        try:
+            message = orjson.loads(payload)
+            evict(message["entity"], message["id"], message.get("version"))
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning("Ignoring malformed invalidation: %r", payload)
+            return
+        for on_message, _ in self._subscribers:
+            on_message(message)
+
+    async def _listen(self, dsn: str) -> None:
+        connection = await asyncpg.connect(dsn)
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        try:
+            await connection.add_listener(CHANNEL, self._receive)
+            # Whatever was cached before now may have missed notifications
+            self._reset()
+            self.live = True
+            self.connects += 1
+            self._connected.set()
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), _KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    await connection.execute("SELECT 1")
+            logger.warning("Cache invalidation listener lost its connection; reconnecting")
+        finally:
+            self.live = False
+            self._reset()
+            await connection.close()
+
+    async def _run(self, dsn: str) -> None:
+        delay = 1.0
+        while True:
+            try:
+                await self._listen(dsn)
+                delay = 1.0
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("Cache invalidation listener lost its connection (%s); retrying in %.0fs", e, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _MAX_RECONNECT_DELAY)
+
+    async def start(self, timeout: float = 5.0) -> None:
+        """Start listening, waiting up to `timeout` seconds for the first connection."""
+        settings = get_settings()
+        if not settings.cache_invalidation or self._task is not None:
+            return
+        url = make_url(settings.database_listen_url or settings.database_url)
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._task = asyncio.create_task(self._run(dsn))
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Cache invalidation listener not connected yet; caching without versions is off")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._connected.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listening": self.live,
+            "notifications": self.received,
+            "connects": self.connects,
+            "known_versions": len(known_versions),
+        }
+
+
+listener = InvalidationListener()
+
+
+async def cached_response(session: AsyncSession, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+    """response_cache[key], or the result of load(), cached when it safely can be.
+
+    `load` reads through `session`; a None result is never cached.
+    """
+    token = listener.fill_token(session)
+    if token is not None:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+    value = await load()
+    if value is not None and listener.still_current(token):
+        response_cache.set(key, value)
+    return value
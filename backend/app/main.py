@@ -1,38 +1,99 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.config import get_settings
-from app.api import instruments, templates, logs, analytics
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import ORJSONResponse  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from app import startup  # noqa: E402
+from app.broadcast import broadcaster  # noqa: E402
+from app.cache import response_cache, template_cache  # noqa: E402
+from app.config import get_settings  # noqa: E402
+from app.database import ReadYourWritesMiddleware, engine, pool_status, read_engine  # noqa: E402
+from app.invalidation import listener  # noqa: E402
+from app.metrics import MetricsMiddleware, metrics_response  # noqa: E402
+from app.api import instruments, templates, logs, analytics, stream  # noqa: E402
 
 settings = get_settings()
 
-app = FastAPI(
-    title="Practice Journal API",
-    description="API for tracking music practice sessions across multiple instruments",
-    version="0.1.0",
-)
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup.start(IMPORT_SECONDS)
+    yield
+    await startup.stop()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title="Practice Journal API",
+        description="API for tracking music practice sessions across multiple instruments",
+        version="0.1.0",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
+    )
+
+    # CORS middleware for frontend
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # Pages of GET /api/logs/ carry their next cursor in a header
+        expose_headers=[logs.NEXT_CURSOR_HEADER],
+    )
+
+    # Per-route latency and SQL cost, served on /metrics
+    app.add_middleware(MetricsMiddleware)
+
+    # Keep clients on the primary for a moment after they write, while the replica catches up
+    if read_engine is not engine:
+        app.add_middleware(ReadYourWritesMiddleware)
+
+    # Include API routers
+    app.include_router(instruments.router, prefix="/api")
+    app.include_router(templates.router, prefix="/api")
+    app.include_router(logs.router, prefix="/api")
+    app.include_router(analytics.router, prefix="/api")
+    app.include_router(stream.router, prefix="/api")
+
+    @app.get("/")
+    def root():
+        return {"message": "Practice Journal API", "version": "0.1.0"}
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "healthy"}
+
+    @app.get("/health/cache")
+    def cache_stats():
+        return {
+            "templates": template_cache.stats(),
+            "responses": response_cache.stats(),
+            "invalidation": listener.stats(),
+        }
 
-# CORS middleware for frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    @app.get("/health/stream")
+    def stream_stats():
+        return broadcaster.stats()
 
-# Include API routers
-app.include_router(instruments.router, prefix="/api")
-app.include_router(templates.router, prefix="/api")
-app.include_router(logs.router, prefix="/api")
-app.include_router(analytics.router, prefix="/api")
+    @app.get("/health/pool")
+    def database_pool():
+        return pool_status()
 
+    @app.get("/health/startup")
+    def startup_timings():
+        return startup.startup_report.as_dict()
 
-@app.get("/")
-def root():
-    return {"message": "Practice Journal API", "version": "0.1.0"}
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return metrics_response()
 
+    return app
 
-@app.get("/health")
-def health_check():
-    return {"status": "healthy"}
 
+app = create_app()
@@ -0,0 +1,127 @@
+"""
+Prometheus metrics: per-route request latency and the SQL cost of each request
+
+Cursor events on the engine attribute every statement to the request that
+issued it, so a slow route can be split into time spent in the database and
+time spent in Python.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route"],
+)
+REQUESTS = Counter(
+    "http_requests_total",
+    "Requests by route template and status code",
+    ["method", "route", "status"],
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55, 89, float("inf")),
+)
+REQUEST_SQL_DURATION = Histogram(
+    "http_request_sql_duration_seconds",
+    "Time spent executing SQL per request",
+    ["method", "route"],
+)
+SQL_STATEMENTS = Counter(
+    "db_statements_total",
+    "SQL statements executed, including those outside requests",
+)
+SQL_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Duration of individual SQL statements",
+)
+
+
+class RequestSqlStats:
+    """SQL statements and database time accumulated by one request."""
+
+    __slots__ = ("statements", "duration")
+
+    def __init__(self):
+        self.statements = 0
+        self.duration = 0.0
+
+
+_request_sql: ContextVar[Optional[RequestSqlStats]] = ContextVar("request_sql", default=None)
+
+
+def current_sql_stats() -> Optional[RequestSqlStats]:
+    return _request_sql.get()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement the engine executes.
+
+    The start time is kept on the statement's execution context rather than
+    the pooled connection, so a statement that fails (and never reaches
+    after_cursor_execute) leaves nothing behind to skew later timings.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        SQL_STATEMENTS.inc()
+        SQL_DURATION.observe(elapsed)
+        stats = _request_sql.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.duration += elapsed
+
+
+class MetricsMiddleware:
+    """Record latency and SQL cost per route template (e.g. /api/templates/{template_id})."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSqlStats()
+        token = _request_sql.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_sql.reset(token)
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route_path).observe(elapsed)
+            REQUESTS.labels(method, route_path, str(status)).inc()
+            REQUEST_SQL_STATEMENTS.labels(method, route_path).observe(stats.statements)
+            REQUEST_SQL_DURATION.labels(method, route_path).observe(stats.duration)
+
+
+def metrics_response() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
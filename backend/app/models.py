@@ -4,6 +4,8 @@ These models serve as both database tables AND API schemas
 """
 from typing import Optional, List
 from datetime import datetime, date
+from sqlalchemy import BigInteger, CheckConstraint, Column, ForeignKeyConstraint, Index, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlmodel import Field, SQLModel, Relationship
 
 
@@ -23,6 +25,15 @@ class Instrument(SQLModel, table=True):
 class PracticeTemplate(SQLModel, table=True):
     """Practice rotation template"""
     __tablename__ = "practice_templates"  # type: ignore[assignment]
+    __table_args__ = (
+        # The whole ordered tree as get_template returns it, rebuilt whenever
+        # the tree changes (see app/template_snapshots.py). Not mapped, so
+        # loading templates never drags the tree along.
+        Column("snapshot", JSONB, nullable=True),
+        # The next rotation day wraps around it (see app/template_cursors.py)
+        CheckConstraint("days_count > 0", name="ck_practice_templates_days_count_positive"),
+    )
+    __mapper_args__ = {"exclude_properties": ["snapshot"]}
     
     id: Optional[int] = Field(default=None, primary_key=True)
     instrument_id: int = Field(foreign_key="instruments.id")
@@ -30,6 +41,7 @@ class PracticeTemplate(SQLModel, table=True):
     days_count: int
     description: Optional[str] = None
     is_active: bool = True
+    version: int = 1  # Bumped on every change to the template tree
     
     # Relationships
     instrument: Optional[Instrument] = Relationship(back_populates="practice_templates")
@@ -42,7 +54,7 @@ class PracticeDay(SQLModel, table=True):
     __tablename__ = "practice_days"  # type: ignore[assignment]
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    template_id: int = Field(foreign_key="practice_templates.id")
+    template_id: int = Field(foreign_key="practice_templates.id", index=True)
     day_number: int
     title: str = Field(max_length=200)
     warmup: Optional[str] = None
@@ -59,7 +71,7 @@ class ExerciseBlock(SQLModel, table=True):
     __tablename__ = "exercise_blocks"  # type: ignore[assignment]
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    practice_day_id: int = Field(foreign_key="practice_days.id")
+    practice_day_id: int = Field(foreign_key="practice_days.id", index=True)
     block_type: str = Field(max_length=50)  # e.g., "blockA", "blockB"
     display_order: int
     
@@ -73,7 +85,7 @@ class Exercise(SQLModel, table=True):
     __tablename__ = "exercises"  # type: ignore[assignment]
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    block_id: int = Field(foreign_key="exercise_blocks.id")
+    block_id: int = Field(foreign_key="exercise_blocks.id", index=True)
     exercise_text: str
     display_order: int
     
@@ -82,35 +94,113 @@ class Exercise(SQLModel, table=True):
 
 
 class PracticeLog(SQLModel, table=True):
-    """Log entry for a practice session"""
+    """Log entry for a practice session.
+
+    Range partitioned by practice_date, one partition per year (see
+    app/partitions.py), so practice_date is part of the primary key.
+    """
     __tablename__ = "practice_logs"  # type: ignore[assignment]
+    __table_args__ = (
+        # Keyset pagination order: newest first, id as tiebreaker
+        Index("ix_practice_logs_template_date_id", "template_id", text("practice_date DESC"), text("id DESC")),
+        Index("ix_practice_logs_date_id", text("practice_date DESC"), text("id DESC")),
+        # Transaction that last wrote the log, stamped by a database trigger;
+        # the change feed order for delta sync (GET /api/logs/changes). Not
+        # mapped, like search_vector below.
+        Column("change_xid", BigInteger, nullable=False),
+        Index("ix_practice_logs_change_xid_id", "change_xid", "id"),
+        # Full-text document over notes and detail content, kept current by
+        # database triggers (see the practice_log_search migration). Not
+        # mapped on the model, so ORM loads and writes never touch it.
+        Column("search_vector", TSVECTOR, nullable=True),
+        Index("ix_practice_logs_search_vector", "search_vector", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (practice_date)"},
+    )
+    __mapper_args__ = {"exclude_properties": ["change_xid", "search_vector"]}
     
-    id: Optional[int] = Field(default=None, primary_key=True)
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
     template_id: int = Field(foreign_key="practice_templates.id")
     day_number: int
-    practice_date: date
+    practice_date: date = Field(primary_key=True)
     duration_minutes: int
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Stamped by a database trigger on every insert and update; deleted logs
+    # stay behind as tombstones so sync clients hear about them
+    updated_at: Optional[datetime] = Field(default=None, nullable=False)
+    deleted_at: Optional[datetime] = None
     
     # Relationships
     template: Optional[PracticeTemplate] = Relationship(back_populates="practice_logs")
-    log_details: List["PracticeLogDetail"] = Relationship(back_populates="log", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
+    log_details: List["PracticeLogDetail"] = Relationship(back_populates="log", sa_relationship_kwargs={"cascade": "all, delete-orphan", "order_by": "PracticeLogDetail.id"})
 
 
 class PracticeLogDetail(SQLModel, table=True):
-    """Detailed notes for sections of a practice log"""
+    """Detailed notes for sections of a practice log.
+
+    Carries its log's practice_date so it is partitioned the same way and
+    lands in the matching year; the ORM copies it from the parent log.
+    """
     __tablename__ = "practice_log_details"  # type: ignore[assignment]
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["log_id", "practice_date"],
+            ["practice_logs.id", "practice_logs.practice_date"],
+            onupdate="CASCADE",
+        ),
+        Index("ix_practice_log_details_log_id", "log_id", "practice_date"),
+        {"postgresql_partition_by": "RANGE (practice_date)"},
+    )
     
-    id: Optional[int] = Field(default=None, primary_key=True)
-    log_id: int = Field(foreign_key="practice_logs.id")
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
+    log_id: int
+    practice_date: date = Field(primary_key=True)
     section_type: str = Field(max_length=50)  # e.g., "warmup", "scales", "techA"
     content: Optional[str] = None
+    updated_at: Optional[datetime] = Field(default=None, nullable=False)  # stamped like the log's
+    deleted_at: Optional[datetime] = None
     
     # Relationships
     log: Optional[PracticeLog] = Relationship(back_populates="log_details")
 
 
+class PracticeLogRollup(SQLModel, table=True):
+    """Sessions and minutes per template, rotation day and date.
+
+    Maintained in the same transaction as practice_logs writes so analytics
+    never has to scan the full log history.
+    """
+    __tablename__ = "practice_log_rollups"  # type: ignore[assignment]
+    
+    __table_args__ = (
+        # Date-ordered scans per template for time series and streaks
+        Index(
+            "ix_practice_log_rollups_template_date",
+            "template_id", "practice_date",
+            postgresql_include=["sessions", "total_minutes"],
+        ),
+    )
+
+    template_id: int = Field(foreign_key="practice_templates.id", primary_key=True)
+    day_number: int = Field(primary_key=True)
+    practice_date: date = Field(primary_key=True)
+    sessions: int = 0
+    total_minutes: int = 0
+
+
+class PracticeTemplateCursor(SQLModel, table=True):
+    """Where a template's rotation stands: the latest practiced day and its date.
+
+    Maintained in the same transaction as practice_logs writes so the next
+    day is a primary key lookup however long the history is.
+    """
+    __tablename__ = "practice_template_cursors"  # type: ignore[assignment]
+    
+    template_id: int = Field(foreign_key="practice_templates.id", primary_key=True)
+    last_day_number: int
+    last_practice_date: date
+
+
 # API-specific models (for requests/responses that differ from DB models)
 
 class PracticeLogDetailCreate(SQLModel):
@@ -129,6 +219,164 @@ class PracticeLogCreate(SQLModel):
     log_details: List[PracticeLogDetailCreate] = []
 
 
+class PracticeLogDetailRead(SQLModel):
+    """Log detail as returned by the API"""
+    id: int
+    section_type: str
+    content: Optional[str] = None
+
+
+class PracticeLogRead(SQLModel):
+    """Practice log as returned by the API, with its details"""
+    id: int
+    template_id: int
+    day_number: int
+    practice_date: date
+    duration_minutes: int
+    notes: Optional[str] = None
+    created_at: datetime
+    log_details: List[PracticeLogDetailRead] = []
+
+
+class PracticeLogSearchResult(PracticeLogRead):
+    """A practice log matching a search, with its relevance"""
+    rank: float
+
+
+class PracticeLogSearchPage(SQLModel):
+    """One page of search results, best match first"""
+    items: List[PracticeLogSearchResult]
+    next_cursor: Optional[str] = None
+
+
+class PracticeLogPage(SQLModel):
+    """One page of practice logs; pass next_cursor back as cursor for the next page"""
+    items: List[PracticeLogRead]
+    next_cursor: Optional[str] = None
+
+
+class PracticeLogChanges(SQLModel):
+    """Logs changed since a sync token; pass next_token back as since on the next sync"""
+    items: List[PracticeLogRead]  # created, each with its details
+    deleted: List[int]  # ids of deleted logs
+    next_token: str
+    has_more: bool  # another page is ready right away
+
+
+# Read models for the template tree. Handlers serialize these responses
+# themselves; the models document the shape in the OpenAPI schema.
+
+class ExerciseRead(SQLModel):
+    id: int
+    block_id: int
+    exercise_text: str
+    display_order: int
+
+
+class ExerciseBlockRead(SQLModel):
+    id: int
+    practice_day_id: int
+    block_type: str
+    display_order: int
+    exercises: List[ExerciseRead] = []
+
+
+class PracticeDayRead(SQLModel):
+    id: int
+    template_id: int
+    day_number: int
+    title: str
+    warmup: Optional[str] = None
+    scales: Optional[str] = None
+    repertoire: Optional[str] = None
+    exercise_blocks: List[ExerciseBlockRead] = []
+
+
+class PracticeTemplateSummary(SQLModel):
+    """A template as lists show it; leaves out the tree and the internal cache version"""
+    id: int
+    instrument_id: int
+    name: str
+    days_count: int
+    description: Optional[str] = None
+    is_active: bool
+
+
+class PracticeTemplateRead(PracticeTemplateSummary):
+    practice_days: List[PracticeDayRead] = []
+
+
+class NextPracticeDay(SQLModel):
+    """The rotation day due next for a template, with its full content"""
+    day_number: int
+    last_day_number: Optional[int] = None
+    last_practice_date: Optional[date] = None
+    practice_day: PracticeDayRead
+
+
+class BulkLogError(SQLModel):
+    """A rejected entry in a bulk import, by position in the input"""
+    index: int
+    error: str
+
+
+class BulkLogResult(SQLModel):
+    """Outcome of a bulk practice log import"""
+    received: int = 0
+    inserted: int = 0
+    errors: List[BulkLogError] = []
+
+
+class TemplateImportInstrument(SQLModel):
+    """Instrument a template document belongs to; created on import if new"""
+    name: str = Field(min_length=1, max_length=100)
+    description: Optional[str] = None
+
+
+class TemplateImportBlock(SQLModel):
+    """Exercise block in a template document; exercises in display order"""
+    block_type: str = Field(min_length=1, max_length=50)
+    exercises: List[str] = []
+
+
+class TemplateImportDay(SQLModel):
+    """Practice day in a template document; days are numbered by position"""
+    title: str = Field(min_length=1, max_length=200)
+    warmup: Optional[str] = None
+    scales: Optional[str] = None
+    repertoire: Optional[str] = None
+    exercise_blocks: List[TemplateImportBlock] = []
+
+
+class TemplateImport(SQLModel):
+    """A whole template tree as it appears in a JSON or YAML import document"""
+    instrument: TemplateImportInstrument
+    name: str = Field(min_length=1, max_length=200)
+    description: Optional[str] = None
+    is_active: bool = True
+    practice_days: List[TemplateImportDay] = Field(min_length=1)
+
+
+class TemplateImportDocumentError(SQLModel):
+    """A template document rejected by validation, by position in the import"""
+    index: int
+    error: str
+
+
+class ImportedTemplate(SQLModel):
+    id: int
+    instrument_id: int
+    name: str
+
+
+class TemplateImportResult(SQLModel):
+    """Outcome of a template import; templates whose name already exists
+    for the instrument are skipped, not duplicated"""
+    received: int = 0
+    created: List[ImportedTemplate] = []
+    skipped: List[ImportedTemplate] = []
+
+
 class AnalyticsSummary(SQLModel):
     """Analytics summary response"""
     total_sessions: int
@@ -136,3 +384,49 @@ class AnalyticsSummary(SQLModel):
     average_duration: float
     sessions_by_day: dict = {}
 
+
+class TimeseriesBucket(SQLModel):
+    """Sessions and minutes for one day, week or month.
+
+    The rolling averages are minutes per calendar day over the 7 and 30 days
+    up to the bucket's last day, with days off counted as zero.
+    """
+    period_start: date
+    sessions: int
+    minutes: int
+    rolling_7_day_minutes: float
+    rolling_30_day_minutes: float
+
+
+class TemplateTrend(SQLModel):
+    """Streaks for one template.
+
+    A streak counts consecutive practice days; the current streak is still
+    alive if the last practice was today or yesterday.
+    """
+    template_id: int
+    current_streak: int
+    longest_streak: int
+    last_practice_date: date
+
+
+class AnalyticsTimeseries(SQLModel):
+    """Time series analytics response"""
+    bucket: str
+    series: List[TimeseriesBucket] = []
+    templates: List[TemplateTrend] = []
+
+
+class InstrumentDashboard(SQLModel):
+    """Everything an instrument page shows, in one response.
+
+    templates lists the instrument's active templates, like /api/templates/.
+    The active template is the first of them; the sections about it are null
+    when there is none.
+    """
+    instrument: Instrument
+    templates: List[PracticeTemplateSummary] = []
+    active_template_id: Optional[int] = None
+    next_day: Optional[NextPracticeDay] = None
+    recent_logs: Optional[PracticeLogPage] = None
+    analytics: Optional[AnalyticsSummary] = None
@@ -0,0 +1,65 @@
+"""
+Publishing cache invalidations over Postgres NOTIFY
+
+Writes announce what they changed on one channel, in their own transaction:
+Postgres delivers a notification to every listening worker when, and only
+if, the transaction commits. Payloads are JSON objects:
+
+    {"entity": "template", "id": <template id>, "version": <new version>}
+    {"entity": "instrument", "id": <instrument id>}
+    {"entity": "logs", "id": <template id>}
+
+A log written on its own adds what live feeds need to the "logs" payload:
+"log_id", "day_number", "practice_date" and "duration_minutes".
+
+app/invalidation.py listens, evicts and hands notifications on to the live
+feed in app/broadcast.py. This module only builds statements, so the flush
+listeners in app/template_versions.py can use it too.
+"""
+from typing import Any, Iterable, List, Literal, Optional
+
+import orjson
+from sqlalchemy import ARRAY, Select, Text, bindparam, cast, func, literal_column, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+CHANNEL = "practice_journal_cache"
+
+Entity = Literal["template", "instrument", "logs"]
+
+_PAYLOADS = (
+    func.unnest(bindparam("payloads", type_=ARRAY(Text)))
+    .table_valued("payload")
+    .render_derived(name="payloads")
+)
+
+# One pg_notify per payload; identical payloads in one transaction arrive once
+NOTIFY = select(func.pg_notify(CHANNEL, _PAYLOADS.c.payload))
+
+
+def payload(entity: Entity, entity_id: int, version: Optional[int] = None) -> str:
+    content = {"entity": entity, "id": entity_id}
+    if version is not None:
+        content["version"] = version
+    return orjson.dumps(content).decode()
+
+
+async def notify(session: AsyncSession, payloads: Iterable[str]) -> None:
+    """Queue notifications in the session's transaction; they go out on commit."""
+    payloads = list(payloads)
+    if payloads:
+        await session.execute(NOTIFY, {"payloads": payloads})
+
+
+def notify_from(entity: Entity, rows: Select) -> Select:
+    """SELECT notifying once per row of `rows`, to run as a CTE of a write.
+
+    `rows` selects the entity id labelled "id"; any other columns it selects
+    are added to the payload under their labels. A plain SELECT in a CTE only
+    runs if the statement reads from it, so the caller has to join it in.
+    """
+    source = rows.subquery()
+    fields: List[Any] = [literal_column("'entity'"), literal_column(f"'{entity}'")]
+    for column in source.c:
+        fields += [literal_column(f"'{column.key}'"), column]
+    message = cast(func.json_build_object(*fields), Text)
+    return select(func.pg_notify(CHANNEL, message).label("notified")).select_from(source)
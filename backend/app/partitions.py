@@ -0,0 +1,52 @@
+"""
+Yearly range partitions of practice_logs and practice_log_details
+
+Both tables are partitioned by practice_date, one partition per calendar
+year, named practice_logs_y2026 / practice_log_details_y2026. Partitions are
+created by the ensure_practice_log_partition() database function. Each
+worker creates this year's and next year's at startup; writers call
+ensure_partitions() with the dates they are about to insert, which only
+reaches the database for a year this process has not seen (older history,
+mostly).
+
+Creating a partition locks the parent tables against every reader and
+writer, so the DDL always commits on its own, in a short transaction before
+the write that needed it, and never holds those locks for the length of a
+write.
+"""
+import re
+from datetime import date
+from typing import Iterable, Set
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import async_session
+
+PARTITION_NAME = re.compile(r"^practice_(logs|log_details)_y\d{4}$")
+
+_known_years: Set[int] = set()
+
+
+async def ensure_partitions(session: AsyncSession, dates: Iterable[date]) -> None:
+    """Make sure partitions exist for every year in `dates`.
+
+    Missing years are created on the session's connection, so no second pool
+    connection is taken, and committed straight away. Call this before the
+    session writes anything: whatever its transaction holds is committed
+    with the DDL.
+    """
+    missing = {practice_date.year for practice_date in dates} - _known_years
+    if not missing:
+        return
+    for year in sorted(missing):
+        await session.execute(text("SELECT ensure_practice_log_partition(:year)"), {"year": year})
+    await session.commit()
+    _known_years.update(missing)
+
+
+async def ensure_current_partitions() -> None:
+    """Partitions for this year and next, so writes around New Year never wait on DDL."""
+    this_year = date.today().year
+    async with async_session() as session:
+        await ensure_partitions(session, [date(this_year, 1, 1), date(this_year + 1, 1, 1)])
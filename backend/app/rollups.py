@@ -0,0 +1,105 @@
+"""
+Maintenance of the practice_log_rollups aggregate table
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from sqlalchemy import Select, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import Insert, insert as pg_insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import PracticeLog, PracticeLogCreate, PracticeLogRollup
+
+_LOGS = PracticeLog.__table__  # type: ignore[attr-defined]
+
+
+async def record_practice_logs(
+    session: AsyncSession, logs: Iterable[Union[PracticeLog, PracticeLogCreate]]
+) -> None:
+    """Add newly created logs to the rollup table.
+
+    Runs inside the caller's transaction so the rollups commit (or roll back)
+    together with the logs themselves.
+    """
+    totals: Dict[Tuple[int, int, date], list] = defaultdict(lambda: [0, 0])
+    for log in logs:
+        key = (log.template_id, log.day_number, log.practice_date)
+        totals[key][0] += 1
+        totals[key][1] += log.duration_minutes
+
+    if not totals:
+        return
+
+    rows = [
+        {
+            "template_id": template_id,
+            "day_number": day_number,
+            "practice_date": practice_date,
+            "sessions": sessions,
+            "total_minutes": minutes,
+        }
+        for (template_id, day_number, practice_date), (sessions, minutes) in totals.items()
+    ]
+    await session.execute(_accumulate_on_conflict(pg_insert(PracticeLogRollup).values(rows)))
+
+
+def rollup_upsert_from(source: Select) -> Insert:
+    """Upsert statement adding the rows of `source` to the rollups.
+
+    `source` must select (template_id, day_number, practice_date, sessions,
+    total_minutes); useful for folding the rollup update into a CTE.
+    """
+    statement = pg_insert(PracticeLogRollup).from_select(
+        ["template_id", "day_number", "practice_date", "sessions", "total_minutes"],
+        source,
+    )
+    return _accumulate_on_conflict(statement)
+
+
+async def prune_rollups(session: AsyncSession, template_id: int) -> None:
+    """Delete the template's rollup rows that deleted logs have emptied."""
+    await session.execute(
+        delete(PracticeLogRollup).where(
+            PracticeLogRollup.template_id == template_id,  # type: ignore[arg-type]
+            PracticeLogRollup.sessions <= 0,  # type: ignore[operator]
+        )
+    )
+
+
+def _accumulate_on_conflict(statement: Insert) -> Insert:
+    return statement.on_conflict_do_update(
+        index_elements=["template_id", "day_number", "practice_date"],
+        set_={
+            "sessions": PracticeLogRollup.sessions + statement.excluded.sessions,
+            "total_minutes": PracticeLogRollup.total_minutes + statement.excluded.total_minutes,
+        },
+    )
+
+
+async def rebuild_rollups(session: AsyncSession, template_id: Optional[int] = None) -> int:
+    """Recompute rollups from practice_logs, returning the number of rollup rows written."""
+    delete_statement = delete(PracticeLogRollup)
+    source = (
+        select(
+            _LOGS.c.template_id,
+            _LOGS.c.day_number,
+            _LOGS.c.practice_date,
+            func.count(_LOGS.c.id),
+            func.sum(_LOGS.c.duration_minutes),
+        )
+        .where(_LOGS.c.deleted_at.is_(None))
+        .group_by(_LOGS.c.template_id, _LOGS.c.day_number, _LOGS.c.practice_date)
+    )
+    if template_id:
+        delete_statement = delete_statement.where(PracticeLogRollup.template_id == template_id)  # type: ignore[arg-type]
+        source = source.where(_LOGS.c.template_id == template_id)
+
+    await session.execute(delete_statement)
+    result = await session.execute(
+        insert(PracticeLogRollup).from_select(
+            ["template_id", "day_number", "practice_date", "sessions", "total_minutes"],
+            source,
+        )
+    )
+    return result.rowcount  # type: ignore[attr-defined]
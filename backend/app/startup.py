@@ -0,0 +1,157 @@
+"""
+Startup work that would otherwise land on the first requests
+
+A fresh worker has an empty connection pool, an empty SQLAlchemy compiled
+statement cache and no prepared statements on any connection, so its first
+requests each pay for a connection handshake, statement compilation and a
+server-side prepare. warm_up() opens pool connections concurrently and runs
+the hot read handlers on every one of them, so all of that is done before the
+worker takes traffic.
+
+Warm-up never writes. The log insert is only planned, with EXPLAIN (no
+ANALYZE), which loads the catalog entries, partitions and indexes it touches
+into the connection without inserting a row, using up an id or locking the
+rollup and cursor rows real writers need.
+"""
+import asyncio
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import Request
+
+from app.api import analytics, logs, templates
+from app.broadcast import broadcaster
+from app.config import get_settings
+from app.database import async_session, engine, read_engine, read_session
+from app.invalidation import listener
+from app.models import PracticeTemplate
+from app.partitions import ensure_current_partitions
+
+
+class StartupReport:
+    """Where a worker's startup time went, in seconds."""
+
+    def __init__(self):
+        self.import_seconds = 0.0
+        self.partitions_seconds = 0.0
+        self.warmup_seconds = 0.0
+        self.warmed_connections = 0
+        self.ready_at: Optional[datetime] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "import_ms": round(self.import_seconds * 1000, 1),
+            "partitions_ms": round(self.partitions_seconds * 1000, 1),
+            "warmup_ms": round(self.warmup_seconds * 1000, 1),
+            "warmed_connections": self.warmed_connections,
+            "ready_at": self.ready_at.isoformat() if self.ready_at else None,
+        }
+
+
+startup_report = StartupReport()
+
+logger = logging.getLogger(__name__)
+
+
+def _read_calls(session: AsyncSession, template_id: int) -> List[Callable[[], Awaitable[Any]]]:
+    """The hot GET handlers, called directly so they compile exactly the statements requests do."""
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+    return [
+        lambda: templates.get_template(template_id, request, session),
+        lambda: templates.get_practice_day(template_id, 1, request, session),
+        lambda: templates.get_next_practice_day(template_id, request, session),
+        lambda: logs.list_practice_logs(template_id=template_id, limit=50, cursor=None, session=session),
+        lambda: analytics.get_analytics(template_id=template_id, session=session),
+        lambda: analytics.get_timeseries(template_id=template_id, bucket="week", start=None, end=None, session=session),
+    ]
+
+
+def _explain_create_log(dialect: Dialect, template_id: int) -> Tuple[str, Tuple[Any, ...]]:
+    """EXPLAIN of the log insert, as driver SQL and positional parameters."""
+    compiled = logs.CREATE_LOG.compile(dialect=dialect)
+    params = compiled.construct_params({
+        "template_id": template_id,
+        "day_number": 1,
+        "practice_date": date.today(),
+        "duration_minutes": 0,
+        "notes": None,
+        "created_at": datetime.utcnow(),
+        "section_types": ["warmup"],
+        "contents": [None],
+    })
+    return f"EXPLAIN {compiled.string}", tuple(params[name] for name in compiled.positiontup or ())
+
+
+async def _prime(sessionmaker: async_sessionmaker, template_id: Optional[int], writes: bool) -> None:
+    async with sessionmaker() as session:
+        # A missing template still primes the version lookup every read starts with
+        for call in _read_calls(session, template_id or 0):
+            try:
+                await call()
+            except HTTPException:
+                pass
+        if writes and template_id is not None:
+            # Plans the insert without running it
+            connection = await session.connection()
+            await connection.exec_driver_sql(*_explain_create_log(connection.dialect, template_id))
+        await session.rollback()
+
+
+async def warm_up(connections: int) -> int:
+    """Open and prime up to `connections` connections per engine; returns how many were primed."""
+    if connections <= 0:
+        return 0
+    connections = min(connections, get_settings().db_pool_size)
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(PracticeTemplate.id)
+            .where(PracticeTemplate.is_active == True)
+            .order_by(PracticeTemplate.id)  # type: ignore[arg-type]
+            .limit(1)
+        )
+        template_id = result.scalar_one_or_none()
+
+    # Concurrent sessions each hold their own connection, so every one of
+    # them is opened and gets its own prepared statements
+    primers = [_prime(async_session, template_id, writes=True) for _ in range(connections)]
+    if read_engine is not engine:
+        primers += [_prime(read_session, template_id, writes=False) for _ in range(connections)]
+    await asyncio.gather(*primers)
+    return len(primers)
+
+
+async def start(import_seconds: float) -> None:
+    """Everything a worker does before serving: partitions, the cache
+    invalidation listener, then warm-up."""
+    startup_report.import_seconds = import_seconds
+
+    started = time.perf_counter()
+    await ensure_current_partitions()
+    startup_report.partitions_seconds = time.perf_counter() - started
+
+    # Before warm-up, so its reads may already fill the invalidated caches
+    await listener.start()
+
+    started = time.perf_counter()
+    try:
+        startup_report.warmed_connections = await warm_up(get_settings().db_warmup_connections)
+    except Exception:
+        # Only an optimization: serve anyway and let requests open connections
+        logger.warning("Connection warm-up failed", exc_info=True)
+    startup_report.warmup_seconds = time.perf_counter() - started
+    startup_report.ready_at = datetime.utcnow()
+    logger.info("Started: %s", startup_report.as_dict())
+
+
+async def stop() -> None:
+    """Everything a worker does after serving."""
+    await broadcaster.stop()
+    await listener.stop()
@@ -0,0 +1,94 @@
+"""
+Maintenance of the practice_template_cursors table
+
+A template's cursor follows its most recent log: the latest practice date,
+and among logs on that date the one written last.
+"""
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Select, delete, insert, select
+from sqlalchemy.dialects.postgresql import Insert, insert as pg_insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import PracticeLog, PracticeLogCreate, PracticeTemplateCursor
+
+_LOGS = PracticeLog.__table__  # type: ignore[attr-defined]
+
+
+def next_day_number(last_day_number: Optional[int], days_count: int) -> int:
+    """The rotation day after `last_day_number`, wrapping around; day 1 if nothing
+    was practiced or the template has no days to rotate through."""
+    if last_day_number is None or days_count < 1:
+        return 1
+    return last_day_number % days_count + 1
+
+
+async def advance_cursors(session: AsyncSession, logs: Iterable[PracticeLogCreate]) -> None:
+    """Move cursors forward for logs just inserted, given in insertion order.
+
+    Runs inside the caller's transaction, like the rollup update.
+    """
+    latest: Dict[int, Tuple[int, date]] = {}
+    for log in logs:
+        current = latest.get(log.template_id)
+        if current is None or log.practice_date >= current[1]:
+            latest[log.template_id] = (log.day_number, log.practice_date)
+
+    if not latest:
+        return
+
+    rows = [
+        {"template_id": template_id, "last_day_number": day_number, "last_practice_date": practice_date}
+        for template_id, (day_number, practice_date) in latest.items()
+    ]
+    await session.execute(_advance_on_conflict(pg_insert(PracticeTemplateCursor).values(rows)))
+
+
+def cursor_upsert_from(source: Select) -> Insert:
+    """Upsert statement moving cursors to the rows of `source`.
+
+    `source` must select (template_id, day_number, practice_date) with at most
+    one row per template; useful for folding the update into a CTE.
+    """
+    statement = pg_insert(PracticeTemplateCursor).from_select(
+        ["template_id", "last_day_number", "last_practice_date"],
+        source,
+    )
+    return _advance_on_conflict(statement)
+
+
+def _advance_on_conflict(statement: Insert) -> Insert:
+    # Logs for earlier dates (backfilled history) leave the cursor alone
+    return statement.on_conflict_do_update(
+        index_elements=["template_id"],
+        set_={
+            "last_day_number": statement.excluded.last_day_number,
+            "last_practice_date": statement.excluded.last_practice_date,
+        },
+        where=PracticeTemplateCursor.last_practice_date <= statement.excluded.last_practice_date,
+    )
+
+
+async def rebuild_cursors(session: AsyncSession, template_id: Optional[int] = None) -> int:
+    """Recompute cursors from practice_logs, returning the number of cursors written."""
+    delete_statement = delete(PracticeTemplateCursor)
+    source = (
+        select(_LOGS.c.template_id, _LOGS.c.day_number, _LOGS.c.practice_date)
+        .where(_LOGS.c.deleted_at.is_(None))
+        .distinct(_LOGS.c.template_id)
+        .order_by(_LOGS.c.template_id, _LOGS.c.practice_date.desc(), _LOGS.c.id.desc())
+    )
+    if template_id:
+        delete_statement = delete_statement.where(PracticeTemplateCursor.template_id == template_id)  # type: ignore[arg-type]
+        # One row at most: stop at the newest log instead of reading the whole history
+        source = source.where(_LOGS.c.template_id == template_id).limit(1)
+
+    await session.execute(delete_statement)
+    result = await session.execute(
+        insert(PracticeTemplateCursor).from_select(
+            ["template_id", "last_day_number", "last_practice_date"],
+            source,
+        )
+    )
+    return result.rowcount  # type: ignore[attr-defined]
@@ -0,0 +1,241 @@
+"""
+Import whole practice template trees from JSON or YAML documents
+
+Every document is validated before anything is written. The import then runs
+in the caller's transaction with one multi-row INSERT ... RETURNING per level
+of the tree (templates, days, blocks) and one for the exercises, so the number
+of round trips does not grow with the number of templates or days imported.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Literal, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import (
+    Exercise,
+    ExerciseBlock,
+    ImportedTemplate,
+    Instrument,
+    PracticeDay,
+    PracticeTemplate,
+    TemplateImport,
+    TemplateImportDocumentError,
+    TemplateImportResult,
+)
+from app.notifications import notify, payload
+from app.template_snapshots import rebuild_snapshots
+
+DocumentFormat = Literal["json", "yaml"]
+
+YAML_MEDIA_TYPES = ("application/yaml", "application/x-yaml", "text/yaml", "text/x-yaml")
+_SUFFIX_FORMATS: Dict[str, DocumentFormat] = {".json": "json", ".yaml": "yaml", ".yml": "yaml"}
+
+
+class TemplateDocumentError(ValueError):
+    """An import source could not be parsed at all"""
+
+
+class TemplateImportError(ValueError):
+    """One or more documents failed validation; nothing was imported"""
+
+    def __init__(self, errors: List[TemplateImportDocumentError]):
+        super().__init__(f"{len(errors)} invalid template document(s)")
+        self.errors = errors
+
+
+def format_for_media_type(content_type: str) -> DocumentFormat:
+    return "yaml" if content_type.split(";")[0].strip() in YAML_MEDIA_TYPES else "json"
+
+
+def parse_documents(raw: bytes, format: DocumentFormat) -> List[Any]:
+    """Decode a JSON or YAML source into a flat list of template documents.
+
+    A source may hold a single document or a list of them; a YAML source may
+    also hold several `---` separated documents.
+    """
+    if format == "yaml":
+        # Imported here so the API does not load it at startup just for this
+        import yaml
+
+        try:
+            loaded = [doc for doc in yaml.safe_load_all(raw) if doc is not None]
+        except yaml.YAMLError as e:
+            raise TemplateDocumentError(f"Not valid YAML: {e}")
+    else:
+        try:
+            loaded = [json.loads(raw)]
+        except ValueError as e:
+            raise TemplateDocumentError(f"Not valid JSON: {e}")
+
+    documents: List[Any] = []
+    for doc in loaded:
+        documents.extend(doc if isinstance(doc, list) else [doc])
+    return documents
+
+
+def load_files(paths: Iterable[Path]) -> List[Any]:
+    """Documents from the given files, and from every .json/.yaml/.yml file in given directories."""
+    documents: List[Any] = []
+    for path in paths:
+        files = sorted(p for p in path.iterdir() if p.suffix in _SUFFIX_FORMATS) if path.is_dir() else [path]
+        for file in files:
+            format = _SUFFIX_FORMATS.get(file.suffix)
+            if format is None:
+                raise TemplateDocumentError(f"{file}: expected a .json, .yaml or .yml file")
+            try:
+                documents.extend(parse_documents(file.read_bytes(), format))
+            except TemplateDocumentError as e:
+                raise TemplateDocumentError(f"{file}: {e}")
+    return documents
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+
+def validate_documents(documents: List[Any]) -> List[TemplateImport]:
+    """Validate every document, raising TemplateImportError listing all failures by position."""
+    valid: List[TemplateImport] = []
+    errors: List[TemplateImportDocumentError] = []
+    for index, document in enumerate(documents):
+        try:
+            valid.append(TemplateImport.model_validate(document))
+        except ValidationError as e:
+            errors.append(TemplateImportDocumentError(index=index, error=_describe(e)))
+    if errors:
+        raise TemplateImportError(errors)
+    return valid
+
+
+async def _instrument_ids(session: AsyncSession, documents: List[TemplateImport]) -> Dict[str, int]:
+    """Ids of the documents' instruments by name, creating the ones that do not exist yet."""
+    instruments: Dict[str, Dict[str, Any]] = {}
+    for doc in documents:
+        instruments.setdefault(doc.instrument.name, {
+            "name": doc.instrument.name,
+            "description": doc.instrument.description,
+            "created_at": datetime.utcnow(),
+        })
+
+    created = await session.execute(
+        pg_insert(Instrument)
+        .values(list(instruments.values()))
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(Instrument.id)  # type: ignore[call-overload]
+    )
+    await notify(session, (payload("instrument", instrument_id) for instrument_id in created.scalars()))
+    result = await session.execute(
+        select(Instrument.id, Instrument.name).where(Instrument.name.in_(instruments))  # type: ignore[attr-defined]
+    )
+    return {name: instrument_id for instrument_id, name in result}
+
+
+async def _insert_returning_ids(session: AsyncSession, model: Any, rows: List[Dict[str, Any]]) -> List[int]:
+    if not rows:
+        return []
+    # Against the Core table: the ORM bulk insert path costs more per row
+    # than the database does
+    table = model.__table__
+    result = await session.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows)
+    return list(result.scalars())
+
+
+async def import_templates(session: AsyncSession, documents: List[TemplateImport]) -> TemplateImportResult:
+    """Insert validated template documents. The caller commits.
+
+    A template whose name already exists for its instrument, in the database
+    or earlier in the same import, is skipped, so re-running an import is safe.
+    """
+    outcome = TemplateImportResult(received=len(documents))
+    if not documents:
+        return outcome
+
+    instrument_ids = await _instrument_ids(session, documents)
+    keys: List[Tuple[int, str]] = [(instrument_ids[doc.instrument.name], doc.name) for doc in documents]
+    result = await session.execute(
+        select(PracticeTemplate.id, PracticeTemplate.instrument_id, PracticeTemplate.name)  # type: ignore[call-overload]
+        .where(tuple_(PracticeTemplate.instrument_id, PracticeTemplate.name).in_(set(keys)))  # type: ignore[arg-type]
+    )
+    existing = {(instrument_id, name): template_id for template_id, instrument_id, name in result}
+
+    new: List[Tuple[Tuple[int, str], TemplateImport]] = []
+    repeated: List[Tuple[int, str]] = []
+    pending: Set[Tuple[int, str]] = set()
+    for key, doc in zip(keys, documents):
+        if key in existing:
+            outcome.skipped.append(ImportedTemplate(id=existing[key], instrument_id=key[0], name=key[1]))
+        elif key in pending:
+            repeated.append(key)
+        else:
+            pending.add(key)
+            new.append((key, doc))
+
+    # Each level's RETURNING ids come back in row order, which is what lets
+    # the next level's rows point at their parents without another query
+    template_ids = await _insert_returning_ids(session, PracticeTemplate, [
+        {
+            "instrument_id": instrument_id,
+            "name": name,
+            "days_count": len(doc.practice_days),
+            "description": doc.description,
+            "is_active": doc.is_active,
+            "version": 1,
+        }
+        for (instrument_id, name), doc in new
+    ])
+
+    days = [
+        (template_id, day_number, day)
+        for template_id, (_, doc) in zip(template_ids, new)
+        for day_number, day in enumerate(doc.practice_days, start=1)
+    ]
+    day_ids = await _insert_returning_ids(session, PracticeDay, [
+        {
+            "template_id": template_id,
+            "day_number": day_number,
+            "title": day.title,
+            "warmup": day.warmup,
+            "scales": day.scales,
+            "repertoire": day.repertoire,
+        }
+        for template_id, day_number, day in days
+    ])
+
+    blocks = [
+        (day_id, order, block)
+        for day_id, (_, _, day) in zip(day_ids, days)
+        for order, block in enumerate(day.exercise_blocks, start=1)
+    ]
+    block_ids = await _insert_returning_ids(session, ExerciseBlock, [
+        {"practice_day_id": day_id, "block_type": block.block_type, "display_order": order}
+        for day_id, order, block in blocks
+    ])
+
+    exercises = [
+        {"block_id": block_id, "exercise_text": text, "display_order": position}
+        for block_id, (_, _, block) in zip(block_ids, blocks)
+        for position, text in enumerate(block.exercises, start=1)
+    ]
+    # The ids are not needed, but with RETURNING the rows go out as multi-row
+    # VALUES batches instead of one prepared-statement execution per exercise
+    await _insert_returning_ids(session, Exercise, exercises)
+
+    await rebuild_snapshots(session, template_ids)
+    await notify(session, (payload("template", template_id, 1) for template_id in template_ids))
+
+    created = {key: template_id for template_id, (key, _) in zip(template_ids, new)}
+    outcome.created = [
+        ImportedTemplate(id=template_id, instrument_id=instrument_id, name=name)
+        for (instrument_id, name), template_id in created.items()
+    ]
+    outcome.skipped.extend(
+        ImportedTemplate(id=created[key], instrument_id=key[0], name=key[1]) for key in repeated
+    )
+    return outcome
@@ -0,0 +1,57 @@
+"""
+JSONB snapshots of whole template trees
+
+practice_templates.snapshot holds a template exactly as get_template returns
+it, every level already in order. The database builds it with the
+practice_template_snapshot() function (see the practice_template_snapshot
+migration), so reading a template, or one day of it through a JSON path, is a
+single-row, single-column read instead of four tables sorted in Python.
+
+The flush listeners in app/template_versions.py rebuild the snapshot of every
+template whose tree an ORM flush changed; code that writes the tree with Core
+statements calls rebuild_snapshots() itself.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import ColumnElement, Text, Update, cast, func, literal, update
+from sqlalchemy.dialects.postgresql import JSONPATH
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import PracticeTemplate
+
+_TEMPLATES = PracticeTemplate.__table__  # type: ignore[attr-defined]
+_SNAPSHOT = _TEMPLATES.c.snapshot
+
+# Templates written outside the ORM and not yet rebuilt are built on the fly
+_CURRENT_SNAPSHOT = func.coalesce(_SNAPSHOT, func.practice_template_snapshot(_TEMPLATES.c.id))
+
+_DAY_PATH = "$.practice_days[*] ? (@.day_number == $day_number)"
+
+
+def snapshot_update(template_ids: Optional[Iterable[int]] = None) -> Update:
+    """UPDATE rebuilding the snapshots of the given templates, or of all of them."""
+    statement = update(_TEMPLATES).values(snapshot=func.practice_template_snapshot(_TEMPLATES.c.id))
+    if template_ids is not None:
+        statement = statement.where(_TEMPLATES.c.id.in_(list(template_ids)))
+    return statement
+
+
+async def rebuild_snapshots(session: AsyncSession, template_ids: Optional[Iterable[int]] = None) -> int:
+    """Rebuild snapshots in the session's transaction, returning how many were written."""
+    result = await session.execute(snapshot_update(template_ids))
+    return result.rowcount  # type: ignore[attr-defined]
+
+
+def template_json() -> ColumnElement:
+    """A template's snapshot as JSON text, ready to send as the response body."""
+    return cast(_CURRENT_SNAPSHOT, Text)
+
+
+def practice_day_json(day_number: int) -> ColumnElement:
+    """One day of a template's snapshot as JSON text; NULL if there is no such day."""
+    day = func.jsonb_path_query_first(
+        _CURRENT_SNAPSHOT,
+        cast(literal(_DAY_PATH), JSONPATH),
+        func.jsonb_build_object("day_number", day_number),
+    )
+    return cast(day, Text)
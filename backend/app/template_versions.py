@@ -0,0 +1,105 @@
+"""
+Bump PracticeTemplate.version whenever anything in a template tree changes
+
+Cached template responses are keyed by version, so a bump is all it takes to
+invalidate them. The same listeners rebuild the JSONB snapshot of every
+template they touch, new ones included, and notify other workers of the new
+versions (see app/notifications.py). They run for every ORM flush;
+importing this module registers them.
+"""
+from typing import Dict, Iterable, Set
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app.models import PracticeTemplate, PracticeDay, ExerciseBlock, Exercise
+from app.notifications import NOTIFY, payload
+from app.template_snapshots import snapshot_update
+
+_PENDING_KEY = "template_versions_pending"
+
+
+def _affected_template_ids(session: Session, objects: Iterable[object]) -> Set[int]:
+    """Resolve the templates owning the given tree objects.
+
+    Uses the foreign key values on the objects and looks up parents by id, so
+    it never triggers relationship lazy loads.
+    """
+    template_ids: Set[int] = set()
+    day_ids: Set[int] = set()
+    block_ids: Set[int] = set()
+
+    for obj in objects:
+        if isinstance(obj, PracticeTemplate) and obj.id is not None:
+            template_ids.add(obj.id)
+        elif isinstance(obj, PracticeDay) and obj.template_id is not None:
+            template_ids.add(obj.template_id)
+        elif isinstance(obj, ExerciseBlock) and obj.practice_day_id is not None:
+            day_ids.add(obj.practice_day_id)
+        elif isinstance(obj, Exercise) and obj.block_id is not None:
+            block_ids.add(obj.block_id)
+
+    if block_ids:
+        result = session.execute(
+            select(ExerciseBlock.practice_day_id).where(ExerciseBlock.id.in_(block_ids))  # type: ignore[union-attr]
+        )
+        day_ids.update(result.scalars())
+
+    if day_ids:
+        result = session.execute(
+            select(PracticeDay.template_id).where(PracticeDay.id.in_(day_ids))  # type: ignore[union-attr]
+        )
+        template_ids.update(result.scalars())
+
+    return template_ids
+
+
+def _is_tree_object(obj: object) -> bool:
+    return isinstance(obj, (PracticeTemplate, PracticeDay, ExerciseBlock, Exercise))
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_templates(session: Session, flush_context, instances) -> None:
+    # Rows about to be deleted can only be resolved before they are gone
+    changed = [
+        obj for obj in list(session.dirty) + list(session.deleted)
+        if _is_tree_object(obj) and (obj in session.deleted or session.is_modified(obj))
+    ]
+    if changed:
+        pending = session.info.setdefault(_PENDING_KEY, set())
+        pending.update(_affected_template_ids(session, changed))
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_template_versions(session: Session, flush_context) -> None:
+    pending: Set[int] = session.info.pop(_PENDING_KEY, set())
+
+    # New rows only have their foreign keys populated once flushed; a brand
+    # new template starts at version 1 and needs no bump of its own
+    created = [
+        obj for obj in session.new
+        if _is_tree_object(obj) and not isinstance(obj, PracticeTemplate)
+    ]
+    if created:
+        pending.update(_affected_template_ids(session, created))
+
+    versions: Dict[int, int] = {}
+    if pending:
+        result = session.execute(
+            update(PracticeTemplate)
+            .where(PracticeTemplate.id.in_(pending))  # type: ignore[union-attr]
+            .values(version=PracticeTemplate.version + 1)
+            .returning(PracticeTemplate.id, PracticeTemplate.version)  # type: ignore[arg-type]
+        )
+        versions.update(result.tuples().all())
+
+    for obj in session.new:
+        if isinstance(obj, PracticeTemplate) and obj.id is not None:
+            versions[obj.id] = obj.version
+
+    if versions:
+        session.execute(snapshot_update(versions))
+        # Other workers evict their copies once this commits
+        session.execute(NOTIFY, {
+            "payloads": [payload("template", template_id, version) for template_id, version in versions.items()]
+        })
@@ -0,0 +1,118 @@
+"""
+Latency of create_practice_log: single-statement path vs. the previous ORM path
+
+The previous implementation (flush for the id, one INSERT per detail,
+commit, refresh, re-select with selectinload) is kept here as the baseline.
+Both run the same payloads, interleaved, against a throwaway local database.
+
+    cd backend
+    python -m benchmarks.bench_create_log --runs 2000 --output create_log.json
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.common import print_table, summarize, throwaway_database, write_results
+
+
+def _payload(i: int, template_id: int, details: int):
+    from app.models import PracticeLogCreate, PracticeLogDetailCreate
+
+    return PracticeLogCreate(
+        template_id=template_id,
+        day_number=i % 14 + 1,
+        practice_date=date(2020, 1, 1) + timedelta(days=i % 1500),
+        duration_minutes=30 + i % 60,
+        notes=f"Session {i}",
+        log_details=[
+            PracticeLogDetailCreate(section_type=f"section{n}", content=f"Notes for section {n}")
+            for n in range(details)
+        ],
+    )
+
+
+async def _legacy_create(log_data, session):
+    """create_practice_log as it was before the single-statement write path."""
+    from sqlalchemy.orm import selectinload
+    from sqlmodel import select
+
+    from app.models import PracticeLog, PracticeLogDetail
+    from app.rollups import record_practice_logs
+
+    practice_log = PracticeLog(
+        template_id=log_data.template_id,
+        day_number=log_data.day_number,
+        practice_date=log_data.practice_date,
+        duration_minutes=log_data.duration_minutes,
+        notes=log_data.notes,
+    )
+    session.add(practice_log)
+    await session.flush()
+    for detail in log_data.log_details:
+        session.add(PracticeLogDetail(
+            log_id=practice_log.id,  # type: ignore[arg-type]
+            practice_date=practice_log.practice_date,
+            section_type=detail.section_type,
+            content=detail.content,
+        ))
+    await record_practice_logs(session, [practice_log])
+    await session.commit()
+    await session.refresh(practice_log)
+    statement = (
+        select(PracticeLog)
+        .where(PracticeLog.id == practice_log.id)
+        .options(selectinload(PracticeLog.log_details))  # type: ignore[arg-type]
+    )
+    result = await session.execute(statement)
+    return result.scalar_one()
+
+
+async def _run(runs: int, details: int) -> Dict[str, Dict[str, float]]:
+    from app.api.logs import create_practice_log
+    from app.database import async_session, engine
+    from seed_data import seed_database
+
+    await seed_database()
+    template_id = 1
+
+    candidates: Dict[str, Callable[..., Awaitable[object]]] = {
+        "create_log.orm_baseline": _legacy_create,
+        "create_log.single_statement": create_practice_log,
+    }
+    samples: Dict[str, List[float]] = {name: [] for name in candidates}
+
+    # Warm the pool and statement caches before measuring
+    for i in range(20):
+        for create in candidates.values():
+            async with async_session() as session:
+                await create(_payload(i, template_id, details), session)
+
+    for i in range(runs):
+        payload = _payload(i, template_id, details)
+        for name, create in candidates.items():
+            async with async_session() as session:
+                started = time.perf_counter()
+                await create(payload, session)
+                samples[name].append((time.perf_counter() - started) * 1000)
+
+    await engine.dispose()
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="create_practice_log latency benchmark")
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--details", type=int, default=6, help="PracticeLogDetail rows per log")
+    parser.add_argument("--output", default="bench_create_log.json")
+    args = parser.parse_args()
+
+    with throwaway_database():
+        results = asyncio.run(_run(args.runs, args.details))
+    print_table(results)
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+CPU time per response: orjson fast path vs. the previous serialization
+
+Baselines are the paths the endpoints used before:
+- template trees: hand-built dicts encoded with the stdlib json module
+- log pages: FastAPI's response_model handling (validate the ORM objects
+  into the model, encode to JSON-compatible data, then json.dumps)
+
+    cd backend
+    python -m benchmarks.bench_serialization --runs 2000 --output serialization.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.common import print_table, summarize, throwaway_database, write_results
+
+
+def _cpu_samples(fn: Callable[[], object], runs: int, warmup: int = 50):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(runs):
+        started = time.process_time()
+        fn()
+        samples.append((time.process_time() - started) * 1000)
+    return samples
+
+
+async def _run(runs: int, scale: int) -> Dict[str, Dict[str, float]]:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from app.api.logs import practice_log_dict
+    from app.database import engine
+    from app.models import PracticeLogRead
+    from benchmarks.data import seed
+    from benchmarks.run import _load_log_page, _load_template, template_dict
+
+    template_ids = await seed(templates=1, scale=scale, logs_per_template=200)
+    template = await _load_template(template_ids[0])
+    logs = await _load_log_page(template_ids[0])
+    page_field = create_response_field(name="page", type_=List[PracticeLogRead])
+
+    def template_baseline():
+        body = json.dumps(template_dict(template), ensure_ascii=False, separators=(",", ":"))
+        return body.encode("utf-8")
+
+    def template_orjson():
+        return ORJSONResponse(template_dict(template)).body
+
+    def page_baseline():
+        # serialize_response is a coroutine only for the sake of async validators
+        coroutine = serialize_response(field=page_field, response_content=logs)
+        try:
+            coroutine.send(None)
+        except StopIteration as done:
+            return JSONResponse(jsonable_encoder(done.value)).body
+        raise RuntimeError("serialize_response awaited something")
+
+    def page_orjson():
+        return ORJSONResponse([practice_log_dict(log) for log in logs]).body
+
+    assert json.loads(template_baseline()) == json.loads(template_orjson())
+    assert json.loads(page_baseline()) == json.loads(page_orjson())
+
+    results = {
+        "template.stdlib_json_baseline": summarize(_cpu_samples(template_baseline, runs)),
+        "template.orjson": summarize(_cpu_samples(template_orjson, runs)),
+        "log_page.response_model_baseline": summarize(_cpu_samples(page_baseline, runs)),
+        "log_page.orjson": summarize(_cpu_samples(page_orjson, runs)),
+    }
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response serialization CPU time benchmark")
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--scale", type=int, default=1, help="Multiplier for the seeded rotation size")
+    parser.add_argument("--output", default="bench_serialization.json")
+    args = parser.parse_args()
+
+    with throwaway_database():
+        results = asyncio.run(_run(args.runs, args.scale))
+    print_table(results)
+    write_results(args.output, results, {"runs": args.runs, "scale": args.scale})
+
+
+if __name__ == "__main__":
+    main()
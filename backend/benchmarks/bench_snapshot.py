@@ -0,0 +1,70 @@
+"""
+Size and time of a full history export: NDJSON vs. Parquet and Arrow IPC snapshots
+
+The NDJSON export inlines details into each log; a snapshot is two files,
+practice_logs and practice_log_details, and both are counted.
+
+    cd backend
+    python -m benchmarks.bench_snapshot --logs 100000 --output snapshot.json
+"""
+import argparse
+import asyncio
+import time
+from typing import AsyncIterator, Callable, Dict, List
+
+from benchmarks.common import throwaway_database, write_results
+
+
+async def _drain(chunks: Callable[[], List[AsyncIterator[bytes]]], runs: int) -> Dict[str, float]:
+    """Best-of-`runs` wall time and the total size of the chunks produced."""
+    best = float("inf")
+    size = 0
+    for _ in range(runs):
+        size = 0
+        started = time.perf_counter()
+        for stream in chunks():
+            async for chunk in stream:
+                size += len(chunk)
+        best = min(best, time.perf_counter() - started)
+    return {"seconds": round(best, 3), "mb": round(size / 1e6, 2)}
+
+
+async def _run(logs: int, runs: int) -> Dict[str, Dict[str, float]]:
+    from app import columnar, exports
+    from app.database import engine
+    from benchmarks.data import seed
+
+    print(f"Seeding {logs} logs...")
+    await seed(templates=1, scale=1, logs_per_template=logs)
+
+    results = {
+        "ndjson_export_baseline": await _drain(lambda: [exports.ndjson_lines()], runs),
+        "parquet_snapshot": await _drain(
+            lambda: [columnar.snapshot_chunks("logs", "parquet"), columnar.snapshot_chunks("details", "parquet")], runs
+        ),
+        "arrow_snapshot": await _drain(
+            lambda: [columnar.snapshot_chunks("logs", "arrow"), columnar.snapshot_chunks("details", "arrow")], runs
+        ),
+    }
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Full history export size and time")
+    parser.add_argument("--logs", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=3, help="Exports per format; the fastest is reported")
+    parser.add_argument("--output", default="bench_snapshot.json")
+    args = parser.parse_args()
+
+    with throwaway_database():
+        results = asyncio.run(_run(args.logs, args.runs))
+    baseline = results["ndjson_export_baseline"]
+    print(f"{'export':<24} {'seconds':>8} {'MB':>8} {'vs NDJSON':>10}")
+    for name, row in results.items():
+        print(f"{name:<24} {row['seconds']:>8.3f} {row['mb']:>8.2f} {baseline['mb'] / row['mb']:>9.1f}x")
+    write_results(args.output, results, {"logs": args.logs, "runs": args.runs})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Cold start: import time, startup time and the first requests of a fresh worker
+
+Each sample is a new Python process, as a freshly started uvicorn worker
+would be. It imports app.main, runs the app's startup, then sends the first
+request of each hot route once, in-process. Samples alternate between
+connection warm-up on (the configured DB_WARMUP_CONNECTIONS) and off (0) so
+both see the same machine state.
+
+    cd backend
+    python -m benchmarks.bench_startup --samples 10 --output startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import date
+from typing import Dict, List
+
+from benchmarks.common import BACKEND_DIR, print_table, summarize, throwaway_database, write_results
+
+
+async def _child(template_id: int) -> Dict[str, float]:
+    """One cold worker: timings in milliseconds, by phase and by first request."""
+    started = time.perf_counter()
+    from app.main import app
+    timings = {"import": (time.perf_counter() - started) * 1000}
+
+    import httpx
+
+    from app.database import engine
+
+    requests = [
+        ("GET", f"/api/templates/{template_id}", None),
+        ("GET", f"/api/templates/{template_id}/days/1", None),
+        ("GET", f"/api/templates/{template_id}/next", None),
+        ("GET", f"/api/logs/?template_id={template_id}", None),
+        ("GET", f"/api/analytics/?template_id={template_id}", None),
+        ("POST", "/api/logs/", {
+            "template_id": template_id,
+            "day_number": 1,
+            "practice_date": date.today().isoformat(),
+            "duration_minutes": 30,
+            "log_details": [{"section_type": "warmup", "content": "Open strings"}],
+        }),
+    ]
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["startup"] = (time.perf_counter() - started) * 1000
+
+        transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for method, url, body in requests:
+                started = time.perf_counter()
+                response = await client.request(method, url, json=body)
+                response.raise_for_status()
+                timings[f"first {method} {url.split('?')[0]}"] = (time.perf_counter() - started) * 1000
+
+    await engine.dispose()
+    return timings
+
+
+def _sample(template_id: int, warmup_connections: int) -> Dict[str, float]:
+    environment = dict(os.environ, DB_WARMUP_CONNECTIONS=str(warmup_connections))
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", str(template_id)],
+        cwd=BACKEND_DIR,
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker cold start benchmark")
+    parser.add_argument("--samples", type=int, default=10, help="Fresh processes per configuration")
+    parser.add_argument("--warmup-connections", type=int, default=5)
+    parser.add_argument("--logs", type=int, default=20000, help="Practice logs in the seeded template")
+    parser.add_argument("--output", default="startup.json")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(asyncio.run(_child(args.child))))
+        return
+
+    with throwaway_database():
+        from benchmarks.data import seed
+
+        async def _seed() -> int:
+            from app.database import engine
+
+            template_ids = await seed(1, 1, args.logs)
+            await engine.dispose()
+            return template_ids[0]
+
+        print(f"Seeding 1 template with {args.logs} logs...")
+        template_id = asyncio.run(_seed())
+
+        samples: Dict[str, List[float]] = {}
+        configurations = {"warm": args.warmup_connections, "cold": 0}
+        for n in range(args.samples):
+            print(f"  sample {n + 1}/{args.samples}")
+            for label, connections in configurations.items():
+                for name, elapsed in _sample(template_id, connections).items():
+                    samples.setdefault(f"{label}: {name}", []).append(elapsed)
+
+    results = {name: summarize(values) for name, values in samples.items()}
+    print_table(results)
+    parameters = {"samples": args.samples, "warmup_connections": args.warmup_connections, "logs": args.logs}
+    write_results(args.output, results, parameters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Shared setup for the backend benchmarks
+
+Every benchmark runs against a throwaway database created next to the
+configured one (same server, same credentials), migrated to head and dropped
+again afterwards. Call `throwaway_database()` before importing anything from
+`app` so the engine binds to the throwaway database.
+"""
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _dsn(url) -> str:
+    """asyncpg DSN for a SQLAlchemy URL."""
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def _admin(url, statement: str) -> None:
+    connection = await asyncpg.connect(_dsn(url.set(database="postgres")))
+    try:
+        await connection.execute(statement)
+    finally:
+        await connection.close()
+
+
+@contextmanager
+def throwaway_database() -> Iterator[str]:
+    """Create and migrate a scratch database, yielding its URL."""
+    from app.config import Settings  # Settings only; nothing that opens connections
+
+    base_url = make_url(Settings().database_url)
+    url = base_url.set(database=f"{base_url.database}_bench_{os.getpid()}")
+
+    asyncio.run(_admin(url, f'CREATE DATABASE "{url.database}"'))
+    try:
+        os.environ["DATABASE_URL"] = url.render_as_string(hide_password=False)
+        os.environ.setdefault("ENVIRONMENT", "benchmark")
+        subprocess.run(
+            ["alembic", "upgrade", "head"],
+            cwd=BACKEND_DIR,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        yield os.environ["DATABASE_URL"]
+    finally:
+        asyncio.run(_admin(url, f'DROP DATABASE IF EXISTS "{url.database}" WITH (FORCE)'))
+
+
+def summarize(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    ordered = sorted(samples_ms)
+    percentiles = statistics.quantiles(ordered, n=100, method="inclusive")
+    return {
+        "runs": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(percentiles[49], 3),
+        "p99_ms": round(percentiles[98], 3),
+        "min_ms": round(ordered[0], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+async def measure(run: Callable[[], Awaitable[object]], runs: int, warmup: int = 10) -> List[float]:
+    """Call `run` repeatedly, returning per-call latencies in milliseconds."""
+    for _ in range(warmup):
+        await run()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(path: str, results: Mapping[str, Any], parameters: Optional[Mapping[str, Any]] = None) -> None:
+    """Write results as JSON together with enough context to compare runs."""
+    document = {
+        "revision": git_revision(),
+        "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parameters": parameters or {},
+        "results": results,
+    }
+    Path(path).write_text(json.dumps(document, indent=2) + "\n")
+    print(f"Results written to {path}")
+
+
+def print_table(results: Dict[str, Dict[str, float]]) -> None:
+    names: List[str] = list(results)
+    width = max(len(name) for name in names)
+    print(f"{'benchmark':<{width}}  {'p50 ms':>9}  {'p99 ms':>9}  {'mean ms':>9}")
+    for name in names:
+        row = results[name]
+        print(f"{name:<{width}}  {row['p50_ms']:>9.3f}  {row['p99_ms']:>9.3f}  {row['mean_ms']:>9.3f}")
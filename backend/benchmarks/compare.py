@@ -0,0 +1,48 @@
+"""
+Compare two benchmark result files
+
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+from pathlib import Path
+
+
+def _load(path: str) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    before, after = _load(args.before), _load(args.after)
+    print(f"before: {before['revision']} ({before['recorded_at']})  after: {after['revision']} ({after['recorded_at']})")
+    if before.get("parameters") != after.get("parameters"):
+        print(f"warning: parameters differ: {before.get('parameters')} vs {after.get('parameters')}")
+
+    names = [name for name in after["results"] if name in before["results"]]
+    width = max((len(name) for name in names), default=10)
+    print(f"{'benchmark':<{width}}  {'p50 before':>10}  {'p50 after':>10}  {'change':>8}  {'p99 change':>10}")
+    for name in names:
+        old, new = before["results"][name], after["results"][name]
+        print(
+            f"{name:<{width}}  {old['p50_ms']:>10.3f}  {new['p50_ms']:>10.3f}  "
+            f"{_change(old['p50_ms'], new['p50_ms']):>8}  {_change(old['p99_ms'], new['p99_ms']):>10}"
+        )
+
+    for name in sorted(set(after["results"]) ^ set(before["results"])):
+        side = "after" if name in after["results"] else "before"
+        print(f"{name}: only in {side}")
+
+
+if __name__ == "__main__":
+    main()
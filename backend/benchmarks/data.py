@@ -0,0 +1,112 @@
+"""
+Benchmark data: scaled-up copies of the violin rotation plus synthetic history
+
+`scale` multiplies both the rotation length and the number of exercises per
+block, so a scale-4 template has 56 days with four times the exercises of
+the seeded 14-day rotation.
+"""
+import random
+from datetime import date, datetime, timedelta
+from typing import List
+
+from sqlalchemy import insert, text
+
+from app.database import async_session, engine
+from app.models import (
+    PracticeLog,
+    PracticeLogDetail,
+    TemplateImport,
+    TemplateImportBlock,
+    TemplateImportDay,
+    TemplateImportInstrument,
+)
+from app.partitions import ensure_partitions
+from app.rollups import rebuild_rollups
+from app.template_cursors import rebuild_cursors
+from app.template_import import import_templates, load_files, validate_documents
+from seed_data import ROTATION_FILE
+
+SECTIONS = ["warmup", "scales", "techA", "techB", "repertoire"]
+
+
+def scaled_rotation(scale: int) -> List[TemplateImportDay]:
+    """The seeded rotation repeated `scale` times, with `scale` times the exercises per block."""
+    (rotation,) = validate_documents(load_files([ROTATION_FILE]))
+    return [
+        TemplateImportDay(
+            title=f"{day.title} ({repeat + 1})",
+            warmup=day.warmup,
+            scales=day.scales,
+            repertoire=day.repertoire,
+            exercise_blocks=[
+                TemplateImportBlock(block_type=block.block_type, exercises=block.exercises * scale)
+                for block in day.exercise_blocks
+            ],
+        )
+        for repeat in range(scale)
+        for day in rotation.practice_days
+    ]
+
+
+def template_document(index: int, scale: int, instrument: str = "Benchmark Violin") -> TemplateImport:
+    return TemplateImport(
+        instrument=TemplateImportInstrument(name=instrument, description="Generated for benchmarks"),
+        name=f"Benchmark rotation {index} (scale {scale})",
+        description="Generated for benchmarks",
+        practice_days=scaled_rotation(scale),
+    )
+
+
+async def seed(
+    templates: int, scale: int, logs_per_template: int, seed: int = 42, instrument: str = "Benchmark Violin"
+) -> List[int]:
+    """Create benchmark templates and practice history, returning the template ids."""
+    rng = random.Random(seed)
+    today = date.today()
+
+    first_year = (today - timedelta(days=logs_per_template // 2)).year
+
+    async with async_session() as session:
+        await ensure_partitions(session, [date(year, 1, 1) for year in range(first_year, today.year + 1)])
+        documents = [template_document(index, scale, instrument) for index in range(templates)]
+        imported = await import_templates(session, documents)
+        template_ids = [template.id for template in imported.created]
+
+        for template_id, document in zip(template_ids, documents):
+            days_count = len(document.practice_days)
+            rows = [
+                {
+                    "template_id": template_id,
+                    "day_number": n % days_count + 1,
+                    "practice_date": today - timedelta(days=(logs_per_template - n) // 2),
+                    "duration_minutes": rng.randint(15, 120),
+                    "notes": f"Session {n}: worked on shifts and tone",
+                    "created_at": datetime.utcnow(),
+                }
+                for n in range(logs_per_template)
+            ]
+            for start in range(0, len(rows), 5000):
+                batch = rows[start:start + 5000]
+                result = await session.execute(
+                    insert(PracticeLog).returning(  # type: ignore[call-overload]
+                        PracticeLog.id, PracticeLog.practice_date, sort_by_parameter_order=True  # type: ignore[arg-type]
+                    ),
+                    batch,
+                )
+                details = [
+                    {"log_id": log_id, "practice_date": practice_date, "section_type": section, "content": f"{section} notes"}
+                    for log_id, practice_date in result
+                    for section in SECTIONS
+                ]
+                await session.execute(insert(PracticeLogDetail), details)
+
+        await rebuild_rollups(session)
+        await rebuild_cursors(session)
+        await session.commit()
+
+    # Planner statistics and visibility map, as autovacuum would have them by now
+    async with engine.connect() as connection:
+        autocommit = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await autocommit.execute(text("VACUUM ANALYZE"))
+
+    return template_ids
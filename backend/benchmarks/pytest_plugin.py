@@ -0,0 +1,25 @@
+"""
+pytest fixtures for counting the SQL a test makes the app run
+
+tests/conftest.py loads this plugin and provides the `client` fixture:
+
+    async def test_template_detail(client, sql_statements):
+        await client.get("/api/templates/1")
+        assert len(sql_statements) <= 2, sql_statements.statements
+
+Counts cover the app's engines, the same way benchmarks/query_budget.py
+counts them per route.
+"""
+from typing import Iterator
+
+import pytest
+
+from benchmarks.query_budget import StatementCounter, clear_caches
+
+
+@pytest.fixture
+def sql_statements() -> Iterator[StatementCounter]:
+    """Statements the app runs during the test, starting from empty caches."""
+    clear_caches()
+    with StatementCounter() as counter:
+        yield counter
@@ -0,0 +1,333 @@
+"""
+SQL statement budgets for every API route
+
+Runs each route in app/api against data seeded at several sizes, counting the
+statements the app's engines execute for one request. A route passes when it
+stays within its budget at every size and runs the same number of statements
+at all of them; N+1 loading (a lazy load per day, block, exercise or log)
+grows with the data, so it fails here instead of in production.
+
+    cd backend
+    python -m benchmarks.query_budget
+
+Exits non-zero on any failure, and for any route under /api that has no
+budget below, so a new endpoint has to get one. Caches are cleared before
+each counted request, so budgets cover the uncached path. The test suite
+runs the same checks (tests/test_query_budget.py), and tests can count
+statements the same way with the `sql_statements` fixture from
+benchmarks/pytest_plugin.py.
+"""
+import argparse
+import asyncio
+import itertools
+import sys
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.common import throwaway_database, write_results
+
+
+class StatementCounter:
+    """Records every statement the given engines (default: the app's) execute while active.
+
+    A bulk INSERT that SQLAlchemy sends in pages of rows (insertmanyvalues)
+    counts once: its page count grows with the rows inserted, not with how
+    many times the code goes back to the database.
+    """
+
+    def __init__(self, engines: Optional[Sequence[AsyncEngine]] = None):
+        if engines is None:
+            from app.database import engine, read_engine
+
+            engines = [engine, read_engine]
+        # The read engine is the primary itself unless a replica is configured
+        self._engines = list({id(e.sync_engine): e.sync_engine for e in engines}.values())
+        self.statements: List[str] = []
+        self._last_context = None
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None and context is self._last_context:
+            return
+        self._last_context = context
+        self.statements.append(statement)
+
+    def __enter__(self) -> "StatementCounter":
+        for sync_engine in self._engines:
+            event.listen(sync_engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for sync_engine in self._engines:
+            event.remove(sync_engine, "before_cursor_execute", self._record)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def reset(self) -> None:
+        self.statements.clear()
+        self._last_context = None
+
+
+class Size:
+    """One seeded data set: an instrument with one template and its history."""
+
+    def __init__(self, name: str, scale: int, logs: int):
+        self.name = name
+        self.scale = scale
+        self.logs = logs
+        self.instrument_id = 0
+        self.template_id = 0
+        self.log_id = 0
+        self.cursor = ""
+        self.change_token = ""
+        self.deletable: List[int] = []
+
+
+SIZES = [Size("small", scale=1, logs=60), Size("large", scale=4, logs=4000)]
+
+# A request to make: (method, url, httpx keyword arguments), for a size and
+# a number that is different on every call
+Request = Tuple[str, str, Dict[str, Any]]
+Case = Callable[[Size, int], Request]
+
+
+def _log_payload(size: Size, n: int) -> Dict[str, Any]:
+    return {
+        "template_id": size.template_id,
+        "day_number": n % 14 + 1,
+        "practice_date": (date.today() - timedelta(days=n % 30)).isoformat(),
+        "duration_minutes": 30,
+        "notes": "Budget run",
+        "log_details": [{"section_type": section, "content": "notes"} for section in ("warmup", "scales", "repertoire")],
+    }
+
+
+def _import_document(size: Size, n: int) -> Dict[str, Any]:
+    from benchmarks.data import template_document
+
+    document = template_document(n, size.scale, instrument=f"Budget Viola {size.name}")
+    document.name = f"Budget import {size.name} {n}"
+    return document.model_dump(mode="json")
+
+
+# Statements allowed per request, by route, with the requests that exercise it
+BUDGETS: Dict[Tuple[str, str], Tuple[int, List[Case]]] = {
+    ("GET", "/api/instruments/"): (1, [
+        lambda size, n: ("GET", "/api/instruments/", {}),
+    ]),
+    ("GET", "/api/instruments/{instrument_id}"): (1, [
+        lambda size, n: ("GET", f"/api/instruments/{size.instrument_id}", {}),
+    ]),
+    ("GET", "/api/instruments/{instrument_id}/dashboard"): (6, [
+        lambda size, n: ("GET", f"/api/instruments/{size.instrument_id}/dashboard", {}),
+    ]),
+    ("GET", "/api/templates/"): (1, [
+        lambda size, n: ("GET", f"/api/templates/?instrument_id={size.instrument_id}", {}),
+    ]),
+    ("POST", "/api/templates/import"): (9, [
+        lambda size, n: ("POST", "/api/templates/import", {"json": _import_document(size, n)}),
+    ]),
+    ("GET", "/api/templates/{template_id}"): (2, [
+        lambda size, n: ("GET", f"/api/templates/{size.template_id}", {}),
+    ]),
+    ("GET", "/api/templates/{template_id}/days/{day_number}"): (2, [
+        lambda size, n: ("GET", f"/api/templates/{size.template_id}/days/1", {}),
+    ]),
+    ("GET", "/api/templates/{template_id}/next"): (2, [
+        lambda size, n: ("GET", f"/api/templates/{size.template_id}/next", {}),
+    ]),
+    ("POST", "/api/logs/"): (1, [
+        lambda size, n: ("POST", "/api/logs/", {"json": _log_payload(size, n)}),
+    ]),
+    ("POST", "/api/logs/bulk"): (6, [
+        lambda size, n: ("POST", "/api/logs/bulk", {"json": [_log_payload(size, n + i) for i in range(20)]}),
+    ]),
+    ("GET", "/api/logs/"): (2, [
+        lambda size, n: ("GET", f"/api/logs/?template_id={size.template_id}", {}),
+        lambda size, n: ("GET", f"/api/logs/?template_id={size.template_id}&cursor={size.cursor}", {}),
+    ]),
+    ("GET", "/api/logs/export"): (1, [
+        lambda size, n: ("GET", f"/api/logs/export?format=ndjson&template_id={size.template_id}", {}),
+        lambda size, n: ("GET", f"/api/logs/export?format=csv&template_id={size.template_id}", {}),
+    ]),
+    ("GET", "/api/logs/snapshot"): (1, [
+        lambda size, n: ("GET", "/api/logs/snapshot", {}),
+        lambda size, n: ("GET", f"/api/logs/snapshot?table=details&format=arrow&template_id={size.template_id}", {}),
+    ]),
+    ("GET", "/api/logs/search"): (2, [
+        lambda size, n: ("GET", f"/api/logs/search?q=shifts&template_id={size.template_id}", {}),
+    ]),
+    ("GET", "/api/logs/changes"): (3, [
+        lambda size, n: ("GET", "/api/logs/changes", {}),
+        lambda size, n: ("GET", f"/api/logs/changes?since={size.change_token}", {}),
+    ]),
+    ("GET", "/api/logs/{log_id}"): (2, [
+        lambda size, n: ("GET", f"/api/logs/{size.log_id}", {}),
+    ]),
+    ("DELETE", "/api/logs/{log_id}"): (4, [
+        lambda size, n: ("DELETE", f"/api/logs/{size.deletable.pop()}", {}),
+    ]),
+    ("GET", "/api/analytics/"): (1, [
+        lambda size, n: ("GET", f"/api/analytics/?template_id={size.template_id}", {}),
+    ]),
+    ("GET", "/api/analytics/timeseries"): (2, [
+        lambda size, n: ("GET", f"/api/analytics/timeseries?template_id={size.template_id}&bucket=week", {}),
+        lambda size, n: ("GET", "/api/analytics/timeseries?bucket=day", {}),
+    ]),
+}
+
+# Routes that cannot be counted per request, and why
+EXEMPT: Dict[Tuple[str, str], str] = {
+    ("GET", "/api/stream/"): "runs no SQL of its own; events are loaded once per worker (app/broadcast.py)",
+}
+
+
+def uncovered_routes(app) -> List[Tuple[str, str]]:
+    """API routes with neither a budget nor an exemption."""
+    from fastapi.routing import APIRoute
+
+    routes = [
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.path.startswith("/api")
+        for method in route.methods
+    ]
+    return sorted(key for key in routes if key not in BUDGETS and key not in EXEMPT)
+
+
+def clear_caches() -> None:
+    from app.cache import known_versions, response_cache, template_cache
+
+    template_cache.clear()
+    response_cache.clear()
+    known_versions.clear()
+
+
+async def count_request(client, request: Request) -> List[str]:
+    """Statements one request runs with empty caches."""
+    method, url, kwargs = request
+    clear_caches()
+    with StatementCounter() as counter:
+        response = await client.request(method, url, **kwargs)
+    if response.status_code >= 400:
+        raise AssertionError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+    return counter.statements
+
+
+def cases() -> Iterator[Tuple[str, int, Case]]:
+    """(name, budget, case) for every request in BUDGETS."""
+    for (method, path), (budget, route_cases) in BUDGETS.items():
+        for index, case in enumerate(route_cases):
+            yield f"{method} {path}" + (f" #{index + 1}" if len(route_cases) > 1 else ""), budget, case
+
+
+# Makes every request distinct (import names, log dates)
+_numbers = itertools.count(1)
+
+
+async def count_case(client, case: Case) -> Dict[str, List[str]]:
+    """Statements one request of `case` runs at each seeded size."""
+    statements: Dict[str, List[str]] = {}
+    for size in SIZES:
+        # The first call warms what is cached per process for good
+        # (partitions, statement compilation)
+        method, url, kwargs = case(size, next(_numbers))
+        await client.request(method, url, **kwargs)
+        statements[size.name] = await count_request(client, case(size, next(_numbers)))
+    return statements
+
+
+def budget_failure(name: str, budget: int, counts: Dict[str, int]) -> Optional[str]:
+    """Why the counts break the budget, or None when they keep to it."""
+    if max(counts.values()) > budget:
+        return f"{name}: {counts} statements, budget {budget}"
+    if len(set(counts.values())) > 1:
+        return f"{name}: statement count grows with data size: {counts}"
+    return None
+
+
+async def seed_sizes(client) -> None:
+    """Seed every size in SIZES, through `client` where the cases need ids."""
+    for size in SIZES:
+        print(f"Seeding {size.name}: scale {size.scale}, {size.logs} logs...")
+        await _seed(size, client)
+
+
+async def _seed(size: Size, client) -> None:
+    from benchmarks.data import seed
+
+    (size.template_id,) = await seed(1, size.scale, size.logs, instrument=f"Budget Violin {size.name}")
+    template = (await client.get(f"/api/templates/{size.template_id}")).json()
+    size.instrument_id = template["instrument_id"]
+    response = await client.get(f"/api/logs/?template_id={size.template_id}&limit=20")
+    logs = response.json()
+    size.log_id = logs[0]["id"]
+    size.deletable = [log["id"] for log in logs[1:]]
+    size.cursor = response.headers["X-Next-Cursor"]
+    size.change_token = (await client.get("/api/logs/changes?limit=50")).json()["next_token"]
+
+
+async def _run(verbose: bool) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    import httpx
+
+    from app.database import engine
+    from app.main import app
+
+    failures = [f"{method} {path}: no statement budget" for method, path in uncovered_routes(app)]
+    results: Dict[str, Dict[str, Any]] = {}
+
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    async with httpx.AsyncClient(transport=transport, base_url="http://budget") as client:
+        await seed_sizes(client)
+
+        for name, budget, case in cases():
+            statements = await count_case(client, case)
+            counts = {size: len(sql) for size, sql in statements.items()}
+            for size, sql in statements.items():
+                if verbose or len(sql) > budget:
+                    for statement in sql:
+                        print(f"    {name} [{size}]: {' '.join(statement.split())[:150]}")
+
+            results[name] = {"budget": budget, **counts}
+            failure = budget_failure(name, budget, counts)
+            if failure:
+                failures.append(failure)
+
+    await engine.dispose()
+    return results, failures
+
+
+def print_budgets(results: Dict[str, Dict[str, Any]]) -> None:
+    width = max(len(name) for name in results)
+    header = "".join(f"  {size.name:>6}" for size in SIZES)
+    print(f"{'route':<{width}}  {'budget':>6}{header}")
+    for name, row in results.items():
+        counts = "".join(f"  {row[size.name]:>6}" for size in SIZES)
+        print(f"{name:<{width}}  {row['budget']:>6}{counts}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQL statement budgets per API route")
+    parser.add_argument("--verbose", action="store_true", help="Print every counted statement")
+    parser.add_argument("--output", help="Also write the counts as JSON")
+    args = parser.parse_args()
+
+    with throwaway_database():
+        results, failures = asyncio.run(_run(args.verbose))
+    print_budgets(results)
+    if args.output:
+        write_results(args.output, results, {"sizes": {size.name: [size.scale, size.logs] for size in SIZES}})
+
+    if failures:
+        print(f"\n❌ {len(failures)} statement budget failure(s):")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print(f"\n✅ {len(results)} request(s) within budget at every size")
+
+
+if __name__ == "__main__":
+    main()
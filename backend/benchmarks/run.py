@@ -0,0 +1,631 @@
+"""
+Micro-benchmark suite for the backend hot paths
+
+    cd backend
+    python -m benchmarks.run --output before.json
+    # ...change something...
+    python -m benchmarks.run --output after.json
+    python -m benchmarks.compare before.json after.json
+
+Covers the nested dict construction behind get_template/get_practice_day,
+practice log list serialization, the analytics queries and
+create_practice_log, each timed in isolation and, where it applies, as a
+full in-process HTTP request.
+"""
+import argparse
+import asyncio
+import fnmatch
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.common import measure, print_table, summarize, throwaway_database, write_results
+
+Benchmark = Callable[["Context", int], Awaitable[List[float]]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    def register(fn: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+class Context:
+    """State shared by the benchmarks: seeded ids and an in-process HTTP client."""
+
+    def __init__(self, template_ids: List[int], scale: int, client):
+        self.template_ids = template_ids
+        self.template_id = template_ids[0]
+        self.scale = scale
+        self.client = client
+
+
+async def _get(ctx: Context, url: str) -> None:
+    response = await ctx.client.get(url)
+    response.raise_for_status()
+
+
+# --- Templates -------------------------------------------------------------
+
+async def _load_template(template_id: int):
+    from sqlalchemy.orm import selectinload
+    from sqlmodel import select
+
+    from app.database import async_session
+    from app.models import ExerciseBlock, PracticeDay, PracticeTemplate
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(PracticeTemplate)
+            .where(PracticeTemplate.id == template_id)
+            .options(
+                selectinload(PracticeTemplate.practice_days)  # type: ignore[arg-type]
+                .selectinload(PracticeDay.exercise_blocks)  # type: ignore[arg-type]
+                .selectinload(ExerciseBlock.exercises)  # type: ignore[arg-type]
+            )
+        )
+        return result.scalar_one()
+
+
+# The ORM tree walk get_template served before the JSONB snapshot, kept as
+# the baseline for it
+
+def practice_day_dict(day) -> dict:
+    """Plain dict of a day with its blocks and exercises, in display order.
+
+    Relationships must already be eagerly loaded; built by hand to avoid
+    lazy loading issues.
+    """
+    day_data = {
+        "id": day.id,
+        "template_id": day.template_id,
+        "day_number": day.day_number,
+        "title": day.title,
+        "warmup": day.warmup,
+        "scales": day.scales,
+        "repertoire": day.repertoire,
+        "exercise_blocks": []
+    }
+    
+    for block in sorted(day.exercise_blocks, key=lambda x: x.display_order):
+        block_data = {
+            "id": block.id,
+            "practice_day_id": block.practice_day_id,
+            "block_type": block.block_type,
+            "display_order": block.display_order,
+            "exercises": []
+        }
+        
+        for ex in sorted(block.exercises, key=lambda x: x.display_order):
+            block_data["exercises"].append({
+                "id": ex.id,
+                "block_id": ex.block_id,
+                "exercise_text": ex.exercise_text,
+                "display_order": ex.display_order
+            })
+        
+        day_data["exercise_blocks"].append(block_data)
+    
+    return day_data
+
+
+def template_dict(template) -> dict:
+    """Plain dict of a template with every day, ordered by day number."""
+    return {
+        "id": template.id,
+        "instrument_id": template.instrument_id,
+        "name": template.name,
+        "days_count": template.days_count,
+        "description": template.description,
+        "is_active": template.is_active,
+        "practice_days": [
+            practice_day_dict(day)
+            for day in sorted(template.practice_days, key=lambda x: x.day_number)
+        ]
+    }
+
+
+@benchmark("templates.orm_tree_baseline")
+async def bench_orm_tree(ctx: Context, runs: int) -> List[float]:
+    """Load the tree over four tables, sort and serialize it in Python."""
+    import orjson
+
+    async def run():
+        orjson.dumps(template_dict(await _load_template(ctx.template_id)))
+
+    return await measure(run, runs)
+
+
+@benchmark("templates.snapshot_read")
+async def bench_snapshot_read(ctx: Context, runs: int) -> List[float]:
+    from sqlmodel import select
+
+    from app.database import async_session
+    from app.models import PracticeTemplate
+    from app.template_snapshots import template_json
+
+    statement = select(template_json()).where(PracticeTemplate.id == ctx.template_id)
+
+    async def run():
+        async with async_session() as session:
+            (await session.execute(statement)).scalar_one().encode()
+
+    return await measure(run, runs)
+
+
+@benchmark("templates.snapshot_day_path")
+async def bench_snapshot_day(ctx: Context, runs: int) -> List[float]:
+    from sqlmodel import select
+
+    from app.database import async_session
+    from app.models import PracticeTemplate
+    from app.template_snapshots import practice_day_json
+
+    statement = select(practice_day_json(1)).where(PracticeTemplate.id == ctx.template_id)
+
+    async def run():
+        async with async_session() as session:
+            (await session.execute(statement)).scalar_one().encode()
+
+    return await measure(run, runs)
+
+
+@benchmark("templates.import")
+async def bench_import_template(ctx: Context, runs: int) -> List[float]:
+    """Importing one benchmark-sized template tree, rolled back after each run."""
+    from app.database import async_session
+    from app.template_import import import_templates
+    from benchmarks.data import template_document
+
+    document = template_document(len(ctx.template_ids), ctx.scale)
+
+    async def run():
+        async with async_session() as session:
+            await import_templates(session, [document])
+            await session.rollback()
+
+    return await measure(run, runs)
+
+
+@benchmark("http.get_template.uncached")
+async def bench_get_template_uncached(ctx: Context, runs: int) -> List[float]:
+    from app.cache import template_cache
+
+    async def run():
+        template_cache.clear()
+        await _get(ctx, f"/api/templates/{ctx.template_id}")
+
+    return await measure(run, runs)
+
+
+@benchmark("http.get_template.cached")
+async def bench_get_template_cached(ctx: Context, runs: int) -> List[float]:
+    return await measure(lambda: _get(ctx, f"/api/templates/{ctx.template_id}"), runs)
+
+
+@benchmark("http.get_template.not_modified")
+async def bench_get_template_not_modified(ctx: Context, runs: int) -> List[float]:
+    url = f"/api/templates/{ctx.template_id}"
+    etag = (await ctx.client.get(url)).headers["etag"]
+
+    async def run():
+        response = await ctx.client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    return await measure(run, runs)
+
+
+@benchmark("http.get_practice_day.uncached")
+async def bench_get_day_uncached(ctx: Context, runs: int) -> List[float]:
+    from app.cache import template_cache
+
+    async def run():
+        template_cache.clear()
+        await _get(ctx, f"/api/templates/{ctx.template_id}/days/1")
+
+    return await measure(run, runs)
+
+
+@benchmark("http.get_practice_day.cached")
+async def bench_get_day_cached(ctx: Context, runs: int) -> List[float]:
+    return await measure(lambda: _get(ctx, f"/api/templates/{ctx.template_id}/days/1"), runs)
+
+
+@benchmark("http.get_next_practice_day")
+async def bench_get_next_day(ctx: Context, runs: int) -> List[float]:
+    return await measure(lambda: _get(ctx, f"/api/templates/{ctx.template_id}/next"), runs)
+
+
+# --- Practice logs ---------------------------------------------------------
+
+async def _load_log_page(template_id: int, limit: int = 50):
+    from sqlalchemy import desc
+    from sqlalchemy.orm import selectinload
+    from sqlmodel import select
+
+    from app.database import async_session
+    from app.models import PracticeLog
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(PracticeLog)
+            .where(PracticeLog.template_id == template_id)
+            .order_by(desc(PracticeLog.practice_date), desc(PracticeLog.id))  # type: ignore[arg-type]
+            .options(selectinload(PracticeLog.log_details))  # type: ignore[arg-type]
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+
+@benchmark("logs.serialize_page")
+async def bench_serialize_page(ctx: Context, runs: int) -> List[float]:
+    """Response serialization of a 50-log page, as list_practice_logs does it."""
+    from fastapi.responses import ORJSONResponse
+
+    from app.api.logs import practice_log_dict
+
+    logs = await _load_log_page(ctx.template_id)
+
+    async def run():
+        ORJSONResponse([practice_log_dict(log) for log in logs])
+
+    return await measure(run, runs)
+
+
+@benchmark("http.list_practice_logs.first_page")
+async def bench_list_first_page(ctx: Context, runs: int) -> List[float]:
+    return await measure(lambda: _get(ctx, f"/api/logs/?template_id={ctx.template_id}&limit=50"), runs)
+
+
+@benchmark("http.list_practice_logs.deep_page")
+async def bench_list_deep_page(ctx: Context, runs: int) -> List[float]:
+    # Walk most of the way through history once, then time fetching that page
+    cursor = None
+    for _ in range(50):
+        response = await ctx.client.get(
+            "/api/logs/", params={"template_id": ctx.template_id, "limit": 200, **({"cursor": cursor} if cursor else {})}
+        )
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+    params = {"template_id": ctx.template_id, "limit": 50, **({"cursor": cursor} if cursor else {})}
+
+    async def run():
+        response = await ctx.client.get("/api/logs/", params=params)
+        response.raise_for_status()
+
+    return await measure(run, runs)
+
+
+@benchmark("http.search_practice_logs.selective")
+async def bench_search_selective(ctx: Context, runs: int) -> List[float]:
+    # Seeded notes read "Session {n}: ...", so a session number matches a handful of logs
+    return await measure(lambda: _get(ctx, "/api/logs/search?q=session%201234"), runs)
+
+
+@benchmark("http.search_practice_logs.common_term")
+async def bench_search_common(ctx: Context, runs: int) -> List[float]:
+    """Worst case: the term is in every seeded log, so every match is ranked."""
+    return await measure(lambda: _get(ctx, f"/api/logs/search?q=shifts&template_id={ctx.template_id}"), runs)
+
+
+@benchmark("logs.create_practice_log")
+async def bench_create_log(ctx: Context, runs: int) -> List[float]:
+    from app.api.logs import create_practice_log
+    from app.database import async_session
+    from benchmarks.bench_create_log import _payload
+
+    counter = iter(range(10 ** 9))
+
+    async def run():
+        async with async_session() as session:
+            await create_practice_log(_payload(next(counter), ctx.template_id, 6), session)
+
+    return await measure(run, runs)
+
+
+# --- Analytics -------------------------------------------------------------
+
+@benchmark("analytics.rollup_query")
+async def bench_analytics(ctx: Context, runs: int) -> List[float]:
+    from app.api.analytics import get_analytics
+    from app.database import async_session
+
+    async def run():
+        async with async_session() as session:
+            await get_analytics(template_id=ctx.template_id, session=session)
+
+    return await measure(run, runs)
+
+
+@benchmark("analytics.three_log_scans_baseline")
+async def bench_analytics_baseline(ctx: Context, runs: int) -> List[float]:
+    """The COUNT, SUM and GROUP BY over practice_logs that analytics used to run."""
+    from sqlmodel import func, select
+
+    from app.database import async_session
+    from app.models import PracticeLog
+
+    template_id = ctx.template_id
+    statements = [
+        select(func.count(PracticeLog.id)).where(PracticeLog.template_id == template_id),  # type: ignore[arg-type]
+        select(func.sum(PracticeLog.duration_minutes)).where(PracticeLog.template_id == template_id),
+        select(PracticeLog.day_number, func.count(PracticeLog.id))  # type: ignore[arg-type]
+        .where(PracticeLog.template_id == template_id)
+        .group_by(PracticeLog.day_number),  # type: ignore[arg-type]
+    ]
+
+    async def run():
+        async with async_session() as session:
+            for statement in statements:
+                (await session.execute(statement)).all()
+
+    return await measure(run, runs)
+
+
+@benchmark("http.get_analytics")
+async def bench_http_analytics(ctx: Context, runs: int) -> List[float]:
+    return await measure(lambda: _get(ctx, f"/api/analytics/?template_id={ctx.template_id}"), runs)
+
+
+@benchmark("http.get_analytics_timeseries.week")
+async def bench_http_timeseries_week(ctx: Context, runs: int) -> List[float]:
+    return await measure(
+        lambda: _get(ctx, f"/api/analytics/timeseries?template_id={ctx.template_id}&bucket=week"), runs
+    )
+
+
+@benchmark("http.get_analytics_timeseries.day_all_templates")
+async def bench_http_timeseries_day(ctx: Context, runs: int) -> List[float]:
+    return await measure(lambda: _get(ctx, "/api/analytics/timeseries?bucket=day"), runs)
+
+
+# --- Cross-worker invalidation ----------------------------------------------
+# With the LISTEN connection up, template reads skip the version query and
+# analytics summaries are served from memory until a log is written.
+
+@asynccontextmanager
+async def _listening():
+    from app.invalidation import listener
+
+    await listener.start()
+    try:
+        yield listener
+    finally:
+        await listener.stop()
+
+
+@benchmark("http.get_template.cached_listening")
+async def bench_get_template_listening(ctx: Context, runs: int) -> List[float]:
+    async with _listening():
+        return await measure(lambda: _get(ctx, f"/api/templates/{ctx.template_id}"), runs)
+
+
+@benchmark("http.get_practice_day.cached_listening")
+async def bench_get_day_listening(ctx: Context, runs: int) -> List[float]:
+    async with _listening():
+        return await measure(lambda: _get(ctx, f"/api/templates/{ctx.template_id}/days/1"), runs)
+
+
+@benchmark("http.get_analytics.listening")
+async def bench_http_analytics_listening(ctx: Context, runs: int) -> List[float]:
+    async with _listening():
+        return await measure(lambda: _get(ctx, f"/api/analytics/?template_id={ctx.template_id}"), runs)
+
+
+@benchmark("invalidation.write_to_eviction")
+async def bench_write_to_eviction(ctx: Context, runs: int) -> List[float]:
+    """From sending a log write until this worker has received its invalidation."""
+    payload = {
+        "template_id": ctx.template_id,
+        "day_number": 1,
+        "practice_date": date.today().isoformat(),
+        "duration_minutes": 30,
+        "log_details": [],
+    }
+    async with _listening() as listener:
+        async def run():
+            received = listener.received
+            response = await ctx.client.post("/api/logs/", json=payload)
+            response.raise_for_status()
+            while listener.received == received:
+                await asyncio.sleep(0.0001)
+
+        return await measure(run, runs)
+
+
+# --- Live updates ----------------------------------------------------------
+# What it costs to bring many open dashboards up to date after one log write:
+# pushed over their streams, or each re-fetching logs and analytics.
+
+DASHBOARDS = 100
+
+
+def _log_payload(ctx: Context) -> dict:
+    return {
+        "template_id": ctx.template_id,
+        "day_number": 1,
+        "practice_date": date.today().isoformat(),
+        "duration_minutes": 30,
+        "log_details": [{"section_type": "scales", "content": "Three octaves"}],
+    }
+
+
+@benchmark("stream.fanout_100_dashboards")
+async def bench_stream_fanout(ctx: Context, runs: int) -> List[float]:
+    """From a log write until all subscriptions have its log and analytics events."""
+    from app.broadcast import broadcaster
+
+    async with _listening():
+        subscriptions = [broadcaster.subscribe(ctx.template_id) for _ in range(DASHBOARDS)]
+
+        async def run():
+            response = await ctx.client.post("/api/logs/", json=_log_payload(ctx))
+            response.raise_for_status()
+            for subscription in subscriptions:
+                await subscription.events.get()
+                await subscription.events.get()
+
+        try:
+            return await measure(run, runs)
+        finally:
+            for subscription in subscriptions:
+                broadcaster.unsubscribe(subscription)
+            await broadcaster.stop()
+
+
+@benchmark("stream.polling_100_dashboards_baseline")
+async def bench_polling_dashboards(ctx: Context, runs: int) -> List[float]:
+    """The same write, then every dashboard re-fetching its logs and analytics."""
+    async def run():
+        response = await ctx.client.post("/api/logs/", json=_log_payload(ctx))
+        response.raise_for_status()
+        for _ in range(DASHBOARDS):
+            await _get(ctx, f"/api/logs/?template_id={ctx.template_id}")
+            await _get(ctx, f"/api/analytics/?template_id={ctx.template_id}")
+
+    return await measure(run, runs, warmup=2)
+
+
+# --- Instrument dashboard --------------------------------------------------
+
+async def _instrument_id(ctx: Context) -> int:
+    response = await ctx.client.get(f"/api/templates/{ctx.template_id}")
+    return response.json()["instrument_id"]
+
+
+@benchmark("http.dashboard")
+async def bench_dashboard(ctx: Context, runs: int) -> List[float]:
+    url = f"/api/instruments/{await _instrument_id(ctx)}/dashboard"
+    return await measure(lambda: _get(ctx, url), runs)
+
+
+@benchmark("http.dashboard_separate_calls_baseline")
+async def bench_dashboard_separate_calls(ctx: Context, runs: int) -> List[float]:
+    """What the instrument page fetched before: one request per section, in turn."""
+    instrument_id = await _instrument_id(ctx)
+
+    async def run():
+        await _get(ctx, "/api/instruments/")
+        await _get(ctx, f"/api/templates/?instrument_id={instrument_id}")
+        await _get(ctx, f"/api/templates/{ctx.template_id}/next")
+        await _get(ctx, f"/api/logs/?template_id={ctx.template_id}&limit=10")
+        await _get(ctx, f"/api/analytics/?template_id={ctx.template_id}")
+
+    return await measure(run, runs)
+
+
+@benchmark("dashboard.sections_serial_baseline")
+async def bench_dashboard_serial(ctx: Context, runs: int) -> List[float]:
+    """The dashboard's three template sections on one session, one after another."""
+    from app.api.analytics import analytics_summary
+    from app.api.instruments import _next_day
+    from app.api.logs import log_page
+    from app.database import async_session
+
+    async def run():
+        async with async_session() as session:
+            await _next_day(session, ctx.template_id)
+            await log_page(session, ctx.template_id, 10)
+            await analytics_summary(session, ctx.template_id)
+
+    return await measure(run, runs)
+
+
+@benchmark("dashboard.sections_concurrent")
+async def bench_dashboard_concurrent(ctx: Context, runs: int) -> List[float]:
+    from app.api.analytics import analytics_summary
+    from app.api.instruments import _next_day
+    from app.api.logs import log_page
+    from app.database import async_session, gather_sessions
+
+    async def run():
+        await gather_sessions(
+            async_session,
+            lambda session: _next_day(session, ctx.template_id),
+            lambda session: log_page(session, ctx.template_id, 10),
+            lambda session: analytics_summary(session, ctx.template_id),
+        )
+
+    return await measure(run, runs)
+
+
+# --- Delta sync ------------------------------------------------------------
+# Bringing an offline client's copy of the logs up to date after a week of
+# practice: the changes since its token, or everything all over again.
+
+@benchmark("http.log_changes.week_offline")
+async def bench_log_changes(ctx: Context, runs: int) -> List[float]:
+    token = None
+    while True:
+        response = await ctx.client.get("/api/logs/changes", params={"limit": 500, **({"since": token} if token else {})})
+        page = response.json()
+        token = page["next_token"]
+        if not page["has_more"]:
+            break
+    # A week of practice, one session a day
+    for _ in range(7):
+        (await ctx.client.post("/api/logs/", json=_log_payload(ctx))).raise_for_status()
+
+    return await measure(lambda: _get(ctx, f"/api/logs/changes?since={token}"), runs)
+
+
+@benchmark("http.log_changes.full_download_baseline")
+async def bench_full_download(ctx: Context, runs: int) -> List[float]:
+    """What a client without a token does: page through the whole history."""
+    async def run():
+        cursor = None
+        while True:
+            response = await ctx.client.get("/api/logs/", params={"limit": 500, **({"cursor": cursor} if cursor else {})})
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+    return await measure(run, min(runs, 10), warmup=1)
+
+
+async def _run(args) -> Dict[str, Dict[str, float]]:
+    import httpx
+
+    from app.database import engine
+    from app.main import app
+    from benchmarks.data import seed
+
+    print(f"Seeding {args.templates} template(s) at scale {args.scale} with {args.logs} logs each...")
+    template_ids = await seed(args.templates, args.scale, args.logs)
+
+    selected = [name for name in BENCHMARKS if any(fnmatch.fnmatch(name, p) for p in args.only)]
+    results: Dict[str, Dict[str, float]] = {}
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        ctx = Context(template_ids, args.scale, client)
+        for name in selected:
+            print(f"  {name}")
+            results[name] = summarize(await BENCHMARKS[name](ctx, args.runs))
+
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backend hot path benchmarks")
+    parser.add_argument("--scale", type=int, default=4, help="Multiplier for the seeded rotation size")
+    parser.add_argument("--templates", type=int, default=2)
+    parser.add_argument("--logs", type=int, default=20000, help="Practice logs per template")
+    parser.add_argument("--runs", type=int, default=200, help="Timed runs per benchmark")
+    parser.add_argument("--only", nargs="*", default=["*"], help="Glob patterns of benchmarks to run")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    with throwaway_database():
+        results = asyncio.run(_run(args))
+    print_table(results)
+    parameters = {"scale": args.scale, "templates": args.templates, "logs": args.logs, "runs": args.runs}
+    write_results(args.output, results, parameters)
+
+
+if __name__ == "__main__":
+    main()
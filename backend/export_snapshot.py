@@ -0,0 +1,43 @@
+"""
+Export practice_logs and practice_log_details as Parquet or Arrow IPC files for offline analysis
+
+Each table is written to its own file in the output directory, a record
+batch at a time, so exports of any size run in bounded memory.
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add the backend directory to Python path to resolve app imports
+backend_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(backend_dir))
+
+from app.columnar import SnapshotFormat, snapshot_filename, write_snapshot
+from app.database import engine
+
+
+async def export(output_dir, format: SnapshotFormat = "parquet", template_id=None, start=None, end=None):
+    """Write both tables to output_dir"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Exporting practice logs as {format} to {output_dir}...")
+
+    try:
+        for table in ("logs", "details"):
+            path = output_dir / snapshot_filename(table, format)
+            rows = await write_snapshot(path, table, format, template_id, start, end)
+            print(f"✅ {path.name}: {rows} rows, {path.stat().st_size / 1e6:.1f} MB")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export practice logs as Parquet or Arrow IPC files")
+    parser.add_argument("output_dir", type=Path, help="Directory to write the files to")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--template-id", type=int, default=None, help="Only export this template's logs")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="First practice date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last practice date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    asyncio.run(export(args.output_dir, args.format, args.template_id, args.start, args.end))
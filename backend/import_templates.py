@@ -0,0 +1,73 @@
+"""
+Import practice templates from JSON or YAML documents
+
+    python import_templates.py template_library/
+    python import_templates.py rotations.yaml cello.json
+
+Directories are searched for .json, .yaml and .yml files. Every document is
+validated before anything is written, and the whole import is one transaction.
+Templates that already exist for their instrument are skipped.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add the backend directory to Python path to resolve app imports
+backend_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(backend_dir))
+
+from app.database import async_session
+from app.models import TemplateImportResult
+from app.template_import import (
+    TemplateDocumentError,
+    TemplateImportError,
+    import_templates,
+    load_files,
+    validate_documents,
+)
+
+
+async def import_paths(paths: List[Path]) -> TemplateImportResult:
+    """Validate and import every template document found under `paths`"""
+    try:
+        documents = validate_documents(load_files(paths))
+    except TemplateDocumentError as e:
+        print(f"❌ {e}")
+        raise
+    except TemplateImportError as e:
+        print(f"❌ {e}; nothing was imported")
+        for error in e.errors:
+            print(f"   - document {error.index}: {error.error}")
+        raise
+
+    print(f"Importing {len(documents)} template(s)...")
+    started = time.perf_counter()
+    async with async_session() as session:
+        try:
+            result = await import_templates(session, documents)
+            await session.commit()
+        except Exception as e:
+            print(f"\n❌ Error importing templates: {e}")
+            await session.rollback()
+            raise
+    elapsed = time.perf_counter() - started
+
+    for template in result.created:
+        print(f"  Added template {template.id}: {template.name}")
+    for template in result.skipped:
+        print(f"  Skipped existing template {template.id}: {template.name}")
+    print(f"\n✅ Imported {len(result.created)} template(s), skipped {len(result.skipped)} in {elapsed:.2f}s")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import practice templates from JSON or YAML documents")
+    parser.add_argument("paths", nargs="+", type=Path, help="Template documents or directories of them")
+    args = parser.parse_args()
+    try:
+        asyncio.run(import_paths(args.paths))
+    except (TemplateDocumentError, TemplateImportError):
+        sys.exit(1)
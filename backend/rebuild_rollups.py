@@ -0,0 +1,43 @@
+"""
+Rebuild the practice_log_rollups and practice_template_cursors tables from practice_logs
+
+Use this to backfill rollups and rotation cursors for existing history or to
+repair them after editing logs directly in the database.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path to resolve app imports
+backend_dir = Path(__file__).resolve().parent
+sys.path.insert(0, str(backend_dir))
+
+from app.database import async_session
+from app.rollups import rebuild_rollups
+from app.template_cursors import rebuild_cursors
+
+
+async def rebuild(template_id=None):
+    """Recompute rollups and cursors for one template, or for all of them"""
+    scope = f"template {template_id}" if template_id else "all templates"
+    print(f"Rebuilding practice log rollups and rotation cursors for {scope}...")
+    
+    async with async_session() as session:
+        try:
+            rows = await rebuild_rollups(session, template_id)
+            cursors = await rebuild_cursors(session, template_id)
+            await session.commit()
+            print(f"\n✅ Rollups rebuilt: {rows} rows written")
+            print(f"✅ Rotation cursors rebuilt: {cursors} templates")
+        except Exception as e:
+            print(f"\n❌ Error rebuilding: {e}")
+            await session.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the practice_log_rollups and practice_template_cursors tables from practice_logs")
+    parser.add_argument("--template-id", type=int, default=None, help="Only rebuild this template")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.template_id))
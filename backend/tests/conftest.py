@@ -0,0 +1,32 @@
+"""
+Fixtures for tests that run against the app
+
+The suite gets one throwaway database (see benchmarks/common.py), migrated to
+head when the first test that needs it starts and dropped at the end.
+"""
+from typing import AsyncIterator, Iterator
+
+import httpx
+import pytest
+
+from benchmarks.common import throwaway_database
+
+pytest_plugins = ["benchmarks.pytest_plugin"]
+
+
+@pytest.fixture(scope="session")
+def database() -> Iterator[str]:
+    with throwaway_database() as url:
+        yield url
+
+
+@pytest.fixture(scope="session")
+async def client(database: str) -> AsyncIterator[httpx.AsyncClient]:
+    # Imported only now so the engine binds to the throwaway database
+    from app.database import engine
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    await engine.dispose()
@@ -0,0 +1,38 @@
+"""
+Rolling averages in GET /api/analytics/timeseries
+"""
+
+
+def _log(template_id, practice_date, minutes):
+    return {
+        "template_id": template_id,
+        "day_number": 1,
+        "practice_date": practice_date,
+        "duration_minutes": minutes,
+        "log_details": [],
+    }
+
+
+def _averages(series):
+    return [
+        (bucket["period_start"], bucket["rolling_7_day_minutes"], bucket["rolling_30_day_minutes"])
+        for bucket in series
+    ]
+
+
+async def test_rolling_averages_per_bucket(client):
+    from benchmarks.data import seed
+
+    (template_id,) = await seed(1, 1, 0, instrument="Rolling Bassoon")
+    for practice_date, minutes in (("2025-03-03", 70), ("2025-03-10", 140)):
+        assert (await client.post("/api/logs/", json=_log(template_id, practice_date, minutes))).status_code == 201
+
+    async def series(**params):
+        response = await client.get("/api/analytics/timeseries", params={"template_id": template_id, **params})
+        return _averages(response.json()["series"])
+
+    assert await series(bucket="day") == [("2025-03-03", 10.0, 2.3), ("2025-03-10", 20.0, 7.0)]
+    # A week's averages are those of its last day; the second week so far has one day
+    assert await series(bucket="week") == [("2025-03-03", 10.0, 2.3), ("2025-03-10", 20.0, 7.0)]
+    # Days before start still count towards the windows
+    assert await series(bucket="day", start="2025-03-10") == [("2025-03-10", 20.0, 7.0)]
@@ -0,0 +1,70 @@
+"""
+Delta sync through GET /api/logs/changes
+"""
+from datetime import date
+
+from sqlalchemy import insert
+
+
+async def _catch_up(client, token=None):
+    items, deleted = [], []
+    while True:
+        page = (await client.get("/api/logs/changes", params={"limit": 500, **({"since": token} if token else {})})).json()
+        items += [item["id"] for item in page["items"]]
+        deleted += page["deleted"]
+        token = page["next_token"]
+        if not page["has_more"]:
+            return items, deleted, token
+
+
+def _payload(template_id):
+    return {
+        "template_id": template_id,
+        "day_number": 1,
+        "practice_date": date.today().isoformat(),
+        "duration_minutes": 20,
+        "log_details": [{"section_type": "warmup", "content": "long tones"}],
+    }
+
+
+async def test_creations_and_deletions(client):
+    from benchmarks.data import seed
+
+    (template_id,) = await seed(1, 1, 5, instrument="Changes Cello")
+    _, _, token = await _catch_up(client)
+
+    created = (await client.post("/api/logs/", json=_payload(template_id))).json()["id"]
+    items, deleted, token = await _catch_up(client, token)
+    assert (items, deleted) == ([created], [])
+
+    assert (await client.delete(f"/api/logs/{created}")).status_code == 204
+    items, deleted, token = await _catch_up(client, token)
+    assert (items, deleted) == ([], [created])
+
+    assert await _catch_up(client, token) == ([], [], token)
+
+
+async def test_late_commit_is_not_skipped(client):
+    from app.database import async_session
+    from app.models import PracticeLog
+    from benchmarks.data import seed
+
+    (template_id,) = await seed(1, 1, 5, instrument="Changes Viola")
+    _, _, token = await _catch_up(client)
+
+    async with async_session() as slow:
+        # Written first, committed last
+        result = await slow.execute(
+            insert(PracticeLog).returning(PracticeLog.id),  # type: ignore[call-overload]
+            {"template_id": template_id, "day_number": 2, "practice_date": date.today(), "duration_minutes": 5},
+        )
+        slow_id = result.scalar_one()
+
+        fast_id = (await client.post("/api/logs/", json=_payload(template_id))).json()["id"]
+        items, _, token = await _catch_up(client, token)
+        assert items == []  # held back behind the open transaction
+
+        await slow.commit()
+
+    items, _, token = await _catch_up(client, token)
+    assert sorted(items) == sorted([slow_id, fast_id])
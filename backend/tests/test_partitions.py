@@ -0,0 +1,40 @@
+"""
+Partition creation for years a writer has not seen
+"""
+from datetime import date
+
+from sqlalchemy import text
+
+EXCLUSIVE_LOCKS = text(
+    "SELECT count(*) FROM pg_locks WHERE pid = pg_backend_pid() AND mode = 'AccessExclusiveLock'"
+)
+
+
+async def test_partition_ddl_commits_before_the_write(database):
+    from app.database import async_session
+    from app.partitions import ensure_partitions
+
+    async with async_session() as session:
+        await ensure_partitions(session, [date(2011, 6, 1)])
+        assert (await session.execute(EXCLUSIVE_LOCKS)).scalar_one() == 0
+        await session.rollback()
+
+    async with async_session() as session:
+        partitions = await session.execute(text("SELECT to_regclass('practice_logs_y2011')::text"))
+        assert partitions.scalar_one() == "practice_logs_y2011"
+
+
+async def test_partition_outlives_a_rejected_write(client):
+    response = await client.post("/api/logs/", json={
+        "template_id": 999999,
+        "day_number": 1,
+        "practice_date": "2012-03-04",
+        "duration_minutes": 10,
+    })
+    assert response.status_code == 404
+
+    from app.database import async_session
+
+    async with async_session() as session:
+        partitions = await session.execute(text("SELECT to_regclass('practice_log_details_y2012')::text"))
+        assert partitions.scalar_one() == "practice_log_details_y2012"
@@ -0,0 +1,27 @@
+"""
+Statement budgets per route, as benchmarks/query_budget.py checks them
+"""
+import pytest
+
+from benchmarks.query_budget import budget_failure, cases, count_case, seed_sizes, uncovered_routes
+
+CASES = list(cases())
+
+
+@pytest.fixture(scope="session")
+async def seeded(client):
+    await seed_sizes(client)
+    return client
+
+
+def test_every_route_has_a_budget(database):
+    from app.main import app
+
+    assert uncovered_routes(app) == []
+
+
+@pytest.mark.parametrize("name,budget,case", CASES, ids=[name for name, _, _ in CASES])
+async def test_statement_budget(seeded, name, budget, case):
+    statements = await count_case(seeded, case)
+    counts = {size: len(sql) for size, sql in statements.items()}
+    assert budget_failure(name, budget, counts) is None, statements
@@ -0,0 +1,42 @@
+"""
+Template reads, the next rotation day and the days_count constraint
+"""
+import pytest
+
+SUMMARY_FIELDS = {"id", "instrument_id", "name", "days_count", "description", "is_active"}
+
+
+async def test_lists_leave_out_the_cache_version(client):
+    from benchmarks.data import seed
+
+    (template_id,) = await seed(1, 1, 3, instrument="Summary Oboe")
+    templates = (await client.get("/api/templates/")).json()
+    (template,) = [template for template in templates if template["id"] == template_id]
+    assert set(template) == SUMMARY_FIELDS
+
+    dashboard = (await client.get(f"/api/instruments/{template['instrument_id']}/dashboard")).json()
+    assert [set(template) for template in dashboard["templates"]] == [SUMMARY_FIELDS]
+
+
+def test_next_day_without_days():
+    from app.template_cursors import next_day_number
+
+    assert next_day_number(3, 4) == 4
+    assert next_day_number(4, 4) == 1
+    assert next_day_number(3, 0) == 1
+
+
+async def test_days_count_must_be_positive(client):
+    from sqlalchemy.exc import IntegrityError
+
+    from app.database import async_session
+    from app.models import PracticeTemplate
+    from benchmarks.data import seed
+
+    (template_id,) = await seed(1, 1, 0, instrument="Empty Horn")
+    async with async_session() as session:
+        template = await session.get(PracticeTemplate, template_id)
+        assert template is not None
+        template.days_count = 0
+        with pytest.raises(IntegrityError, match="ck_practice_templates_days_count_positive"):
+            await session.commit()